@@ -1,4 +1,5 @@
 import streamlit as st
+from src.page_profiler import profile_page, profiling_enabled, render_profile
 
 # Page configuration
 
@@ -19,7 +20,14 @@ pg = st.navigation({
 with st.sidebar:
     if st.button("Actualizar Datos 🔄", use_container_width=True, help="Forzar la recarga de datos desde Google Sheets"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
 
-pg.run()
+if profiling_enabled():
+    # Sampling profiler around the page run; the profile is saved to PROFILE_DIR
+    with profile_page(pg.title) as profiler:
+        pg.run()
+    render_profile(profiler, pg.title)
+else:
+    pg.run()
 
@@ -0,0 +1,55 @@
+# benchmark_parallel.py
+# Scaling benchmark of the hash-partitioned pipeline.
+# Run from the repo root: python -m data_scripts.benchmark_parallel --locales 100000
+
+import argparse
+import time
+
+import pandas as pd
+from src.data_preparation import prepare_dataframes
+from src.parallel import prepare_dataframes_parallel
+from src.synthetic_data import make_synthetic_sources
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+parser = argparse.ArgumentParser(description="Serial vs parallel pipeline benchmark on synthetic data.")
+parser.add_argument("--locales", type=int, default=50_000, help="Number of synthetic venues")
+parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best time is reported)")
+args = parser.parse_args()
+
+sources = make_synthetic_sources(args.locales)
+print(f"Synthetic data: {args.locales} locales, " + ", ".join(
+    f"{name}={len(df)} rows" for name, df in zip(["locales", "censos", "nominas", "contratos"], sources)
+))
+
+
+def run(workers):
+    """Runs the pipeline on fresh copies of the sources; returns (seconds, frames)."""
+    frames = tuple(df.copy() for df in sources)
+    start = time.perf_counter()
+    if workers == 0:
+        result = prepare_dataframes(*frames)
+    else:
+        # min_rows=0: measure the pool even on small sources
+        result = prepare_dataframes_parallel(*frames, workers=workers, min_rows=0)
+    return time.perf_counter() - start, result
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+baseline_time, baseline = min((run(0) for _ in range(args.repeat)), key=lambda r: r[0])
+print("-" * 50)
+print(f"{'serial':>10}: {baseline_time:8.3f} s")
+
+for workers in args.workers:
+    elapsed, result = min((run(workers) for _ in range(args.repeat)), key=lambda r: r[0])
+
+    # Output must be identical to the serial run
+    for name, expected, actual in zip(["locales", "censos", "activos", "nominas", "contratos"], baseline, result):
+        pd.testing.assert_frame_equal(expected, actual, obj=name)
+
+    print(f"{workers:>3} workers: {elapsed:8.3f} s  speedup x{baseline_time / elapsed:.2f}  (identical output)")
+print("-" * 50)
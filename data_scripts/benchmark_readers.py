@@ -0,0 +1,147 @@
+# benchmark_readers.py
+# Parse time and peak memory of plain pd.read_csv vs readers.read_source.
+# Every read runs in a fresh subprocess so peak RSS is not shared between runs.
+# Run from the repo root: python -m data_scripts.benchmark_readers --locales 200000
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# RAW INPUTS
+# =============================================================================
+# Raw sheets carry many columns we never use; FILLER_COLUMNS mimics them
+FILLER_COLUMNS = 20
+
+
+def _with_fillers(df, rng):
+    fillers = {
+        f"Observación {i}": rng.choice(["", "pendiente", "revisar con agencia", "ok"], len(df))
+        for i in range(FILLER_COLUMNS)
+    }
+    return df.assign(**fillers)
+
+
+def _us_date(values):
+    """ISO dates -> M/D/YYYY text, as exported by the contracts sheet."""
+    dates = pd.to_datetime(values)
+    return dates.dt.month.astype(str) + "/" + dates.dt.day.astype(str) + "/" + dates.dt.year.astype(str)
+
+
+def write_raw_inputs(directory, n_locales, seed=42):
+    """Writes synthetic locales / censo_2024 / contratos CSVs with the raw headers of the real inputs."""
+    from src.synthetic_data import make_synthetic_sources
+
+    rng = np.random.default_rng(seed)
+    locales, censos, _, contratos = make_synthetic_sources(n_locales, seed=seed)
+    directory = Path(directory)
+
+    _with_fillers(locales.rename(columns={
+        "razon_social": "Razón Social",
+        "rut": "RUT",
+        "direccion": "Dirección",
+        "ciudad": "Ciudad",
+        "region": "Región",
+        "comuna": "Comuna",
+        "nombre_fantasia": "Nombre de Fantasia",
+        "nota_interna": "Nota Interna",
+    }), rng).to_csv(directory / "locales.csv", index=False)
+
+    censo = censos[censos["periodo"] == 2024]
+    _with_fillers(pd.DataFrame({
+        "id": censo["local_id"],
+        "fecha": censo["fecha"],
+        "agencia": censo["agencia"],
+        "CANTIDAD DE SCHOPERAS CCU": censo["schoperas_total"],
+        "CANTIDAD DE SALIDAS": censo["salidas_total"],
+        "CANTIDAD DE SHOPERAS COMPETENCIA ": censo["salidas_otras"],
+    }), rng).to_csv(directory / "censo_2024.csv", index=False)
+
+    _with_fillers(pd.DataFrame({
+        "id": contratos["local_id"],
+        "Fecha Inicio": _us_date(contratos["fecha_inicio"]),
+        "Fecha Fin": _us_date(contratos["fecha_fin"]),
+        "VIGENTE/NO VIGENTE": np.where(contratos["vigente"] == 1, "VIGENTE", "NO VIGENTE"),
+        "Folio": contratos["folio"],
+        "Activos/No Activos Según CCU (sin detalle)": rng.choice(["Activos", "No Activos"], len(contratos)),
+    }), rng).to_csv(directory / "contratos.csv", index=False)
+
+
+# =============================================================================
+# READS (run inside the child process)
+# =============================================================================
+def read_pandas(path, source):
+    """Current reads: infer every column, parse contract dates afterwards."""
+    df = pd.read_csv(path)
+    if source == "contratos":
+        df["Fecha Inicio"] = pd.to_datetime(df["Fecha Inicio"], errors="coerce")
+        df["Fecha Fin"] = pd.to_datetime(df["Fecha Fin"], errors="coerce")
+    return df
+
+
+def peak_rss_mib():
+    """Peak RSS of this process. VmHWM is reset on exec; ru_maxrss (KiB) survives it, so it is only a fallback."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, source, path):
+    # Both modes import the same modules before reading, so peak RSS only differs by the read
+    from data_scripts.readers import read_source
+
+    start = time.perf_counter()
+    df = read_pandas(path, source) if mode == "pandas" else read_source(path, source)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mib()
+    print(f"{elapsed:.6f} {peak:.1f} {df.memory_usage(deep=True).sum() / 2**20:.1f} {df.shape[1]}")
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="pd.read_csv vs dtype-explicit Arrow readers.")
+    parser.add_argument("--locales", type=int, default=100_000, help="Number of synthetic venues")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best time is reported)")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "SOURCE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_raw_inputs(tmp, args.locales)
+        print(f"Synthetic raw inputs: {args.locales} locales, {FILLER_COLUMNS} unused columns per file")
+        print("-" * 78)
+        print(f"{'source':<12}{'reader':<8}{'seconds':>10}{'peak RSS MiB':>15}{'frame MiB':>12}{'columns':>9}")
+        for source in ["locales", "censo_2024", "contratos"]:
+            path = Path(tmp) / f"{source}.csv"
+            for mode in ["pandas", "arrow"]:
+                runs = []
+                for _ in range(args.repeat):
+                    out = subprocess.run(
+                        [sys.executable, "-m", "data_scripts.benchmark_readers", "--child", mode, source, str(path)],
+                        check=True, capture_output=True, text=True,
+                    ).stdout.split()
+                    runs.append((float(out[0]), float(out[1]), float(out[2]), int(out[3])))
+                elapsed, rss, frame_mib, n_cols = min(runs)
+                print(f"{source:<12}{mode:<8}{elapsed:>10.3f}{rss:>15.1f}{frame_mib:>12.1f}{n_cols:>9}")
+        print("-" * 78)
+
+
+if __name__ == "__main__":
+    main()
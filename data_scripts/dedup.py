@@ -0,0 +1,228 @@
+# dedup.py
+# Venue deduplication used by transform_base.py: normalizes RUTs and names,
+# builds candidate pairs only inside blocks (same RUT, same city + name
+# prefix) and scores them with vectorized trigram similarity.
+
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+# Legal forms and filler words ignored when comparing names
+LEGAL_FORMS = r"\b(spa|s p a|ltda|limitada|eirl|e i r l|sa|s a|cia|y cia|sociedad|comercial|inversiones)\b"
+
+# Blocks bigger than this are skipped (too generic to be a useful key)
+MAX_BLOCK_SIZE = 200
+
+# Pairs at or above this score are merged
+MATCH_THRESHOLD = 0.75
+
+SIGNATURE_BITS = 256
+
+# Byte -> trigram alphabet code (0 = space / other, then a-z, 0-9); names are normalized first
+_ALPHABET = " abcdefghijklmnopqrstuvwxyz0123456789"
+_CODE = np.zeros(256, dtype=np.int64)
+_CODE[np.frombuffer(_ALPHABET.encode(), dtype=np.uint8)] = np.arange(len(_ALPHABET))
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+def strip_accents(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+def normalize_rut(ruts):
+    """'12.345.678-k' / '012345678K' -> '12345678K' ('' when not usable)."""
+    ruts = ruts.fillna("").astype(str).str.upper().str.replace(r"[^0-9K]", "", regex=True).str.lstrip("0")
+    return ruts.where(ruts.str.len() >= 2, "")
+
+
+def normalize_name(names):
+    """Lowercase, accent-free names without legal forms or punctuation."""
+    names = names.fillna("").astype(str).map(strip_accents).str.lower()
+    names = names.str.replace(r"[^a-z0-9 ]+", " ", regex=True)
+    names = names.str.replace(LEGAL_FORMS, " ", regex=True)
+    return names.str.split().str.join(" ")
+
+
+# =============================================================================
+# BLOCKING
+# =============================================================================
+def candidate_pairs(keys):
+    """
+    Returns (left, right) row positions of rows sharing a non-empty blocking key.
+
+    keys: list of Series aligned with the frame. Only pairs inside a block
+    are generated, so the cost is sum(block_size^2) instead of n^2.
+    """
+    left, right = [], []
+    for key in keys:
+        key = key.reset_index(drop=True)
+        groups = key[key != ""].groupby(key[key != ""], sort=False).indices
+        for rows in groups.values():
+            if 1 < len(rows) <= MAX_BLOCK_SIZE:
+                i, j = np.triu_indices(len(rows), k=1)
+                left.append(rows[i])
+                right.append(rows[j])
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    pairs = np.unique(np.column_stack([np.concatenate(left), np.concatenate(right)]), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+def trigram_signatures(texts):
+    """
+    Hashed trigram bitsets (n x SIGNATURE_BITS/8 bytes) for vectorized Jaccard.
+
+    Every text is padded as "  text " and all texts are encoded in one NumPy
+    pass over their concatenated bytes (same scheme as src/search.py).
+    """
+    n_bytes = SIGNATURE_BITS // 8
+    signatures = np.zeros((len(texts), n_bytes), dtype=np.uint8)
+    padded = [f"  {text} " for text in texts]
+    if not padded:
+        return signatures
+    lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+    encoded = "".join(padded).encode("ascii", "replace")
+    chars = _CODE[np.frombuffer(encoded, dtype=np.uint8)]
+    owner = np.repeat(np.arange(len(padded)), lengths)
+
+    base = len(_ALPHABET)
+    codes = chars[:-2] * base * base + chars[1:-1] * base + chars[2:]
+    inside = owner[:-2] == owner[2:]
+    owner, codes = owner[:-2][inside], codes[inside]
+
+    # Multiplicative hash of the trigram code -> bit of the signature
+    bit = (codes * 2654435761 >> 7) % SIGNATURE_BITS
+    np.bitwise_or.at(signatures, (owner, bit // 8), (1 << (bit % 8)).astype(np.uint8))
+    return signatures
+
+
+def jaccard(signatures, left, right):
+    """Approximate trigram Jaccard similarity of row pairs."""
+    a, b = signatures[left], signatures[right]
+    inter = np.unpackbits(a & b, axis=1).sum(axis=1)
+    union = np.unpackbits(a | b, axis=1).sum(axis=1)
+    return np.where(union > 0, inter / np.maximum(union, 1), 0.0)
+
+
+def score_pairs(rut, name, address, left, right):
+    """Match score in [0, 1] per candidate pair."""
+    rut = rut.to_numpy()
+    same_rut = (rut[left] == rut[right]) & (rut[left] != "")
+    name_sim = jaccard(trigram_signatures(name.tolist()), left, right)
+    address_sim = jaccard(trigram_signatures(address.tolist()), left, right)
+
+    # Same RUT is strong evidence; otherwise names and addresses must agree
+    return np.where(
+        same_rut,
+        0.6 + 0.4 * np.maximum(name_sim, address_sim),
+        0.7 * name_sim + 0.3 * address_sim,
+    )
+
+
+# =============================================================================
+# CANONICAL IDS
+# =============================================================================
+def _connected_components(n, left, right):
+    """
+    Component label (lowest row position) per row of the graph of matched pairs.
+
+    Vectorized min-label propagation with pointer jumping: every round each
+    pair takes the smaller label of its ends, then labels follow their own
+    label; the rounds grow with the log of the component diameter.
+    """
+    labels = np.arange(n)
+    if len(left) == 0:
+        return labels
+    while True:
+        smaller = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smaller)
+        np.minimum.at(updated, right, smaller)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def build_canonical_ids(locales_df, id_col="local_id", threshold=MATCH_THRESHOLD):
+    """
+    Returns a DataFrame (local_id, canonical_id, score) for every venue.
+
+    Duplicates are linked through blocks on the normalized RUT and on
+    ciudad + first 4 characters of the normalized name; the canonical id of a
+    cluster is the id of its first row (lowest position in locales_df).
+    """
+    df = locales_df.reset_index(drop=True)
+    rut = normalize_rut(df["rut"]) if "rut" in df else pd.Series("", index=df.index)
+    name = normalize_name(df["razon_social"])
+    address = normalize_name(df["direccion"]) if "direccion" in df else pd.Series("", index=df.index)
+    city = normalize_name(df["ciudad"]) if "ciudad" in df else pd.Series("", index=df.index)
+
+    left, right = candidate_pairs([
+        rut,
+        (city + "|" + name.str[:4]).where(name.str.len() >= 4, ""),
+    ])
+    scores = score_pairs(rut, name, address, left, right)
+    matched = scores >= threshold
+
+    component = _connected_components(len(df), left[matched], right[matched])
+    ids = df[id_col].astype(str).to_numpy()
+
+    best_score = np.zeros(len(df))
+    np.maximum.at(best_score, left[matched], scores[matched])
+    np.maximum.at(best_score, right[matched], scores[matched])
+
+    return pd.DataFrame({
+        "local_id": ids,
+        "canonical_id": ids[component],
+        "score": best_score.round(3),
+    })
+
+
+def apply_id_map(df, id_map, column="local_id"):
+    """Replaces venue ids in df[column] with their canonical id (as string)."""
+    mapping = id_map.set_index("local_id")["canonical_id"]
+    ids = df[column].astype("string")
+    return df.assign(**{column: ids.map(mapping).fillna(ids)})
+
+
+# =============================================================================
+# AFTER REMAPPING
+# =============================================================================
+# Rows of merged venues end up under the same canonical id: keep one census
+# per venue and periodo, and one row per contract.
+
+def _keep_last(df, subset, order_by):
+    """Rows of df without duplicates on subset, keeping the last one by order_by (stable)."""
+    order = df[subset + [order_by]].assign(_pos=np.arange(len(df)))
+    order = order.sort_values(order_by, kind="stable", na_position="first")
+    keep = order["_pos"].to_numpy()[~order.duplicated(subset, keep="last").to_numpy()]
+    return df.iloc[np.sort(keep)]
+
+
+def dedupe_censos(censos_df):
+    """One census per (local_id, periodo): the latest fecha (last row on ties)."""
+    return _keep_last(censos_df, ["local_id", "periodo"], "fecha")
+
+
+def dedupe_contratos(contratos_df):
+    """
+    One row per contract of a canonical venue: same folio, or same dates when
+    the folio is missing. The vigente row is kept when the copies disagree.
+    """
+    dates = contratos_df["fecha_inicio"].astype("string").fillna("") + "|" + contratos_df["fecha_fin"].astype("string").fillna("")
+    keyed = contratos_df.assign(
+        _contrato=contratos_df["folio"].astype("string").fillna(dates),
+        _vigente=contratos_df["vigente"].fillna(False).astype(bool),
+    )
+    return _keep_last(keyed, ["local_id", "_contrato"], "_vigente").drop(columns=["_contrato", "_vigente"])
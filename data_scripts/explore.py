@@ -1,40 +1,43 @@
-import pandas as pd
+import sys
 from pathlib import Path
 
+import pandas as pd
+
+from profiling import profile_csv
+
 # Define the input directory relative to this script
 input_dir = Path(__file__).parent / "inputs"
 
-# Load DataFrames with ad-hoc names
-print("Loading dataframes...")
+input_files = [
+    "censo_2023.csv",
+    "censo_2024.csv",
+    "censo_2025.csv",
+    "contratos.csv",
+    "locales.csv",
+    "nominas_2025_q2.csv",
+    "nominas_2025_q3.csv",
+]
 
-df_censo_2023 = pd.read_csv(input_dir / "censo_2023.csv")
-df_censo_2024 = pd.read_csv(input_dir / "censo_2024.csv")
-df_censo_2025 = pd.read_csv(input_dir / "censo_2025.csv")
-df_contratos = pd.read_csv(input_dir / "contratos.csv")
-df_locales = pd.read_csv(input_dir / "locales.csv")
-df_nominas_2025_q2 = pd.read_csv(input_dir / "nominas_2025_q2.csv")
-df_nominas_2025_q3 = pd.read_csv(input_dir / "nominas_2025_q3.csv")
+# Optional: profile only the files given as arguments (python explore.py locales.csv)
+if len(sys.argv) > 1:
+    input_files = sys.argv[1:]
 
-print("Done. Loaded:")
-print("-" * 50)
-print(f"- df_censo_2023: {len(df_censo_2023)} rows")
-print(f"  Columns: {list(df_censo_2023.columns)}")
-print("-" * 50)
-print(f"- df_censo_2024: {len(df_censo_2024)} rows")
-print(f"  Columns: {list(df_censo_2024.columns)}")
-print("-" * 50)
-print(f"- df_censo_2025: {len(df_censo_2025)} rows")
-print(f"  Columns: {list(df_censo_2025.columns)}")
-print("-" * 50)
-print(f"- df_contratos: {len(df_contratos)} rows")
-print(f"  Columns: {list(df_contratos.columns)}")
-print("-" * 50)
-print(f"- df_locales: {len(df_locales)} rows")
-print(f"  Columns: {list(df_locales.columns)}")
-print("-" * 50)
-print(f"- df_nominas_2025_q2: {len(df_nominas_2025_q2)} rows")
-print(f"  Columns: {list(df_nominas_2025_q2.columns)}")
+# One streaming pass per file: null rates, approximate distinct counts,
+# numeric ranges / quantiles and top values with bounded memory
+print("Profiling input files...")
+
+pd.set_option("display.width", 250)
+pd.set_option("display.max_columns", 20)
+pd.set_option("display.max_colwidth", 60)
+
+for file_name in input_files:
+    path = input_dir / file_name
+    if not path.exists():
+        print(f"- {file_name}: not found")
+        continue
+
+    profile = profile_csv(path)
+    print("-" * 50)
+    print(f"- {file_name}: {profile['filas'].max() if len(profile) else 0} rows, {len(profile)} columns")
+    print(profile.to_string(index=False))
 print("-" * 50)
-print(f"- df_nominas_2025_q3: {len(df_nominas_2025_q3)} rows")
-print(f"  Columns: {list(df_nominas_2025_q3.columns)}")
-print("-" * 50)
\ No newline at end of file
@@ -0,0 +1,187 @@
+# load_test.py
+# Concurrent-session load test of app.py with Streamlit's headless AppTest.
+# Every simulated analyst is a thread with its own AppTest session; all of them
+# share this process (and its st.cache_resource store), like sessions on a dyno.
+# Run from the repo root: python -m data_scripts.load_test --sessions 20 --actions 15
+
+import argparse
+import os
+import random
+import threading
+import time
+import traceback
+from pathlib import Path
+
+# The app reads its settings at import time: use the local synthetic source
+os.environ.setdefault("CCU_DATA_SOURCE", "synthetic")
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+PAGES = {
+    "general": "reports/1_general.py",
+    "locales": "reports/2_locales.py",
+    "explorador": "tools/data_explorer.py",
+}
+
+# Relative weight of each interaction in a session
+ACTIONS = {
+    "general": 3,
+    "locales": 3,
+    "seleccion_local": 4,
+    "busqueda_local": 2,
+    "explorador": 2,
+    "refresh": 0.2,
+}
+
+
+def rss_mib():
+    """Current resident memory of this process (Linux /proc; 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+# =============================================================================
+# SESSION
+# =============================================================================
+class Session:
+    """One simulated analyst: a random walk over pages and interactions."""
+
+    def __init__(self, session_id, seed, timeout):
+        self.session_id = session_id
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.page = None
+
+    def _run(self, action, page, step):
+        rss_before = rss_mib()
+        start = time.perf_counter()
+        error = None
+        try:
+            step()
+            if len(self.at.exception):
+                error = self.at.exception[0].value[:200]
+        except Exception as e:  # timeouts and widget lookups that fail under load
+            error = f"{type(e).__name__}: {e}"[:200]
+            if os.environ.get("LOAD_TEST_TRACEBACK"):
+                traceback.print_exc()
+        return {
+            "session": self.session_id,
+            "action": action,
+            "page": page,
+            "seconds": time.perf_counter() - start,
+            "rss_delta_mib": rss_mib() - rss_before,
+            "error": error,
+        }
+
+    def go_to(self, page):
+        self.page = page
+        return self._run(page, page, lambda: self.at.switch_page(PAGES[page]).run())
+
+    def act(self, action):
+        if action in PAGES:
+            return self.go_to(action)
+
+        if action == "refresh":
+            return self._run(action, self.page, lambda: self.at.sidebar.button[0].click().run())
+
+        # Venue interactions happen on the Locales page
+        if self.page != "locales":
+            self.go_to("locales")
+        if action == "seleccion_local":
+            def step():
+                if not len(self.at.selectbox):
+                    # Last search had no matches: clear it, as an analyst would
+                    self.at.text_input[0].input("").run()
+                selector = self.at.selectbox[0]
+                selector.select_index(self.rng.randrange(len(selector.options))).run()
+        else:
+            def step():
+                query = self.rng.choice(["bar", "comercial", "santiago", "roble", "av principal", "spa", "sin resultados xyz"])
+                self.at.text_input[0].input(query).run()
+        return self._run(action, "locales", step)
+
+
+def run_session(session_id, args, results, lock):
+    rng = random.Random(args.seed + session_id)
+    session = Session(session_id, args.seed + session_id, args.timeout)
+    records = [session.go_to("general")]
+    names, weights = zip(*ACTIONS.items())
+    for _ in range(args.actions):
+        records.append(session.act(rng.choices(names, weights)[0]))
+    with lock:
+        results.extend(records)
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+def summarize(records):
+    df = pd.DataFrame(records)
+    grouped = df.groupby("action")
+    report = pd.DataFrame({
+        "runs": grouped.size(),
+        "errores": grouped["error"].count(),
+        "p50_s": grouped["seconds"].quantile(0.50),
+        "p95_s": grouped["seconds"].quantile(0.95),
+        "p99_s": grouped["seconds"].quantile(0.99),
+        "max_s": grouped["seconds"].max(),
+        # Process-wide RSS: with concurrent sessions the deltas of overlapping runs mix
+        "rss_delta_sum_mib": grouped["rss_delta_mib"].sum(),
+    })
+    return report.round(3).sort_values("p95_s", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent AppTest sessions against app.py (synthetic data).")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated analysts")
+    parser.add_argument("--actions", type=int, default=10, help="Interactions per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds before a script run is abandoned")
+    args = parser.parse_args()
+
+    print(f"Data source: {os.environ['CCU_DATA_SOURCE']} ({os.environ.get('CCU_SYNTHETIC_LOCALES', 'default')} locales)")
+    rss_start = rss_mib()
+
+    # Cold start: first session builds the shared store
+    cold = Session(-1, args.seed, args.timeout).go_to("general")
+    print(f"Cold start (General): {cold['seconds']:.2f} s, RSS +{cold['rss_delta_mib']:.0f} MiB"
+          + (f", error: {cold['error']}" if cold["error"] else ""))
+    rss_warm = rss_mib()
+
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=run_session, args=(i, args, results, lock))
+        for i in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print("-" * 90)
+    print(f"{args.sessions} sessions x {args.actions} actions in {elapsed:.1f} s "
+          f"({len(results) / elapsed:.1f} script runs/s)")
+    print(summarize(results).to_string())
+    print("-" * 90)
+    print(f"RSS: start {rss_start:.0f} MiB, after cold start {rss_warm:.0f} MiB, end {rss_mib():.0f} MiB")
+
+    errors = [r for r in results if r["error"]]
+    for record in errors[:5]:
+        print(f"  error in {record['action']} (session {record['session']}): {record['error']}")
+    if errors:
+        print(f"  {len(errors)} runs with errors")
+
+
+if __name__ == "__main__":
+    main()
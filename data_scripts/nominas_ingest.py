@@ -0,0 +1,236 @@
+# nominas_ingest.py
+# Append-only ingest of the quarterly nominations files (nominas_YYYY_qN.csv).
+# Each file is normalized once into its own parquet partition; a manifest
+# records the size, mtime and hash of every ingested file so re-runs only
+# touch new or changed quarters. Unchanged files are recognized by size and
+# mtime without reading them; the id mapping is checked only for the venue
+# ids each partition contains (stored next to it in ids.parquet).
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from dedup import apply_id_map
+from readers import read_source
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+FILE_PATTERN = re.compile(r"nominas_(\d{4})_q([1-4])\.csv$", re.IGNORECASE)
+MANIFEST_NAME = "_manifest.json"
+IDS_NAME = "ids.parquet"
+
+# Explicit format: appended quarters and full exports must write dates alike
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Target schema (same columns the app reads from the nominas worksheet)
+NOMINAS_SCHEMA = {
+    "local_id": "string",
+    "fecha": "datetime64[us]",
+    "periodo": "string",
+    "situacion": "string",
+    "motivo": "string",
+    "delta_schoperas": "Int64",
+    "delta_salidas": "Int64",
+}
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+def normalize_nominas(raw_df, year, quarter, id_map=None):
+    """read_source(..., "nominas") frame -> NOMINAS_SCHEMA frame (missing columns are filled with NA)."""
+    df = raw_df.copy()
+    fin_trimestre = pd.Period(f"{year}Q{quarter}", freq="Q").end_time.normalize()
+
+    if "fecha" in df.columns:
+        df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce").fillna(fin_trimestre)
+    else:
+        df["fecha"] = fin_trimestre
+    df["periodo"] = f"{year}-Q{quarter}"
+    if "situacion" in df.columns:
+        df["situacion"] = df["situacion"].astype("string").str.strip().str.lower()
+
+    for col in NOMINAS_SCHEMA:
+        if col not in df.columns:
+            df[col] = pd.NA
+    df = df[list(NOMINAS_SCHEMA)].astype(NOMINAS_SCHEMA)
+
+    if id_map is not None:
+        df = apply_id_map(df, id_map)
+    return df
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+def file_sha1(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def id_map_sha1(id_map, ids):
+    """
+    Hash of the canonical ids of the given raw venue ids. A partition is only
+    re-ingested when the dedup result changes for its own venues, not when an
+    unrelated venue is added to the mapping.
+    """
+    if id_map is None:
+        return None
+    local_ids = id_map["local_id"].astype("string")
+    scoped = (
+        pd.DataFrame({"local_id": local_ids, "canonical_id": id_map["canonical_id"].astype("string")})
+        [local_ids.isin(pd.Series(ids, dtype="string")).to_numpy(bool)]
+        .sort_values("local_id")
+    )
+    return hashlib.sha1(pd.util.hash_pandas_object(scoped, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def read_manifest(output_dir):
+    path = Path(output_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _write_atomic(path, write):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# INGEST & READ
+# =============================================================================
+def partition_path(output_dir, periodo):
+    return Path(output_dir) / f"periodo={periodo}" / "part.parquet"
+
+
+def _partition_ids(target):
+    """Raw venue ids of an ingested partition (before the id mapping)."""
+    ids_path = target.with_name(IDS_NAME)
+    return pd.read_parquet(ids_path)["local_id"] if ids_path.exists() else None
+
+
+def ingest_nominas(input_dir, output_dir, id_map=None, force=False):
+    """
+    Normalizes every nominas_YYYY_qN.csv of input_dir not yet in the manifest.
+
+    A file is skipped when its size and mtime (or, if touched, its content
+    hash) and the mapping of its own venue ids are unchanged, so adding a new
+    quarter only reads that file. Returns the list of periodos written in this run.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(output_dir)
+
+    def save_manifest():
+        _write_atomic(
+            output_dir / MANIFEST_NAME,
+            lambda p: p.write_text(json.dumps(manifest, indent=2, sort_keys=True)),
+        )
+
+    written = []
+    for path in sorted(Path(input_dir).glob("nominas_*.csv")):
+        match = FILE_PATTERN.search(path.name)
+        if not match:
+            continue
+        year, quarter = int(match.group(1)), int(match.group(2))
+        periodo = f"{year}-Q{quarter}"
+        target = partition_path(output_dir, periodo)
+        entry = manifest.get(path.name, {})
+        stat = path.stat()
+
+        if not force and target.exists() and entry:
+            same_stat = entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+            # Only files whose size or mtime changed are read to compare the content
+            same_content = same_stat or entry.get("sha1") == file_sha1(path)
+            ids = _partition_ids(target)
+            if same_content and ids is not None and entry.get("id_map") == id_map_sha1(id_map, ids):
+                if not same_stat:
+                    manifest[path.name] = {**entry, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                    save_manifest()
+                continue
+
+        raw = read_source(path, "nominas")
+        ids = raw["local_id"].astype("string").dropna().drop_duplicates() if "local_id" in raw else pd.Series([], dtype="string")
+        df = normalize_nominas(raw, year, quarter, id_map)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(target, lambda p: df.to_parquet(p, index=False))
+        _write_atomic(target.with_name(IDS_NAME), lambda p: ids.to_frame("local_id").to_parquet(p, index=False))
+
+        manifest[path.name] = {
+            "sha1": file_sha1(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "id_map": id_map_sha1(id_map, ids),
+            "periodo": periodo,
+            "rows": len(df),
+        }
+        save_manifest()
+        written.append(periodo)
+    return written
+
+
+def available_quarters(output_dir):
+    """Sorted periodos ('YYYY-Qn') present in the manifest."""
+    return sorted({entry["periodo"] for entry in read_manifest(output_dir).values()})
+
+
+def read_nominas(output_dir, quarters=None, local_ids=None):
+    """Concatenates the partitions of the selected quarters (all when None), optionally only some venues."""
+    quarters = available_quarters(output_dir) if quarters is None else list(quarters)
+    filters = None if local_ids is None else [("local_id", "in", pd.Series(local_ids).astype(str).tolist())]
+    frames = [
+        pd.read_parquet(partition_path(output_dir, periodo), filters=filters)
+        for periodo in quarters
+        if partition_path(output_dir, periodo).exists()
+    ]
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in NOMINAS_SCHEMA.items()})
+    return pd.concat(frames, ignore_index=True).astype(NOMINAS_SCHEMA)
+
+
+# =============================================================================
+# CSV EXPORT
+# =============================================================================
+def _partition_fingerprints(output_dir):
+    """{periodo: content + mapping hash} of every ingested partition."""
+    return {entry["periodo"]: f"{entry['sha1']}:{entry['id_map']}" for entry in read_manifest(output_dir).values()}
+
+
+def export_nominas_csv(output_dir, csv_path):
+    """
+    Brings csv_path up to date with the partitions. Quarters newer than every
+    quarter already in the file are appended; if a quarter in the file was
+    re-ingested (or an older one was added) the file is rewritten. Returns
+    the periodos written.
+    """
+    csv_path = Path(csv_path)
+    state_path = csv_path.with_name(f".{csv_path.name}.json")
+    partitions = _partition_fingerprints(output_dir)
+    state = json.loads(state_path.read_text()) if state_path.exists() and csv_path.exists() else {}
+
+    unchanged = state and all(partitions.get(periodo) == fingerprint for periodo, fingerprint in state.items())
+    new = sorted(periodo for periodo in partitions if periodo not in state)
+    if unchanged and not new:
+        return []
+
+    if unchanged and min(new) > max(state):
+        read_nominas(output_dir, new).to_csv(csv_path, mode="a", header=False, index=False, date_format=CSV_DATE_FORMAT)
+        written = new
+    else:
+        written = sorted(partitions)
+        df = read_nominas(output_dir, written)
+        _write_atomic(csv_path, lambda p: df.to_csv(p, index=False, date_format=CSV_DATE_FORMAT))
+
+    state.update({periodo: partitions[periodo] for periodo in written})
+    _write_atomic(state_path, lambda p: p.write_text(json.dumps(state, indent=2, sort_keys=True)))
+    return written
@@ -0,0 +1,209 @@
+# profiling.py
+# Streaming column profiler for the raw input CSVs (used by explore.py).
+# Each file is read once in Arrow record batches; every column keeps only
+# fixed-size sketches, so memory does not grow with the file:
+#   - HyperLogLog      -> approximate distinct count (~1.6% error with p=12)
+#   - KLL compactors   -> approximate quantiles of numeric values
+#   - Misra-Gries      -> top values (counts are lower bounds, error <= n / (k + 1))
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+
+from readers import NULL_VALUES, read_header
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+BLOCK_SIZE = 8 << 20          # bytes per Arrow record batch
+HLL_PRECISION = 12            # 2^12 registers
+KLL_CAPACITY = 200            # values per compactor level
+TOP_K = 10                    # Misra-Gries counters = 5 * TOP_K
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+NUMBER_PATTERN = r"^-?[0-9]+(\.[0-9]+)?$"
+
+
+# =============================================================================
+# SKETCHES
+# =============================================================================
+def hash_values(values):
+    """64-bit hashes of an array of strings."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+class HyperLogLog:
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        rest_bits = 64 - self.p
+        index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # rho = position of the first 1-bit in the remaining bits (rest < 2^52 is exact in float64)
+        bit_length = np.where(rest > 0, np.frexp(rest.astype(np.float64))[1], 0)
+        rho = (rest_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rho)
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+class KLLSketch:
+    """
+    Quantile sketch: level h holds values of weight 2^h. A full level is
+    sorted and every other value (random offset) is promoted to level h+1.
+    """
+
+    def __init__(self, k=KLL_CAPACITY, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+        self.n = 0
+
+    def add(self, values):
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self.k:
+                buffer = np.sort(self.levels[h])
+                if len(buffer) % 2:
+                    # Odd size: keep the last value at this level
+                    keep, buffer = buffer[-1:], buffer[:-1]
+                else:
+                    keep = np.empty(0)
+                promoted = buffer[self.rng.integers(0, 2)::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs):
+        if self.n == 0:
+            return [np.nan] * len(qs)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return values[order][np.minimum(positions, len(values) - 1)].tolist()
+
+
+class MisraGries:
+    """Mergeable heavy hitters summary with a fixed number of counters."""
+
+    def __init__(self, counters=5 * TOP_K):
+        self.counters = counters
+        self.values = np.empty(0, dtype=object)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def _reduce(self, values, counts):
+        """Keeps the `counters` largest counts minus the (counters + 1)-th largest one."""
+        if len(counts) <= self.counters:
+            return values, counts
+        top = np.argpartition(-counts, self.counters)[:self.counters + 1]
+        cut = counts[top].min()
+        keep = top[counts[top] > cut]
+        return values[keep], counts[keep] - cut
+
+    def add_counts(self, values, counts):
+        """Merges the exact counts of a batch (distinct values, counts)."""
+        batch_values, batch_counts = self._reduce(values, counts)
+        merged = pd.Series(self.counts, index=self.values).add(
+            pd.Series(batch_counts, index=batch_values), fill_value=0
+        )
+        self.values, self.counts = self._reduce(merged.index.to_numpy(dtype=object), merged.to_numpy(dtype=np.int64))
+
+    def top(self, k=TOP_K):
+        order = np.argsort(-self.counts, kind="stable")[:k]
+        return list(zip(self.values[order], self.counts[order]))
+
+
+# =============================================================================
+# COLUMN PROFILE
+# =============================================================================
+class ColumnProfile:
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.nulls = 0
+        self.numeric = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.distinct = HyperLogLog()
+        self.quantiles = KLLSketch()
+        self.top = MisraGries()
+
+    def add(self, array):
+        """array: pyarrow string array of one record batch."""
+        self.rows += len(array)
+        self.nulls += array.null_count
+        if array.null_count == len(array):
+            return
+
+        # Exact counts of the batch (Arrow kernel); sketches only see distinct values
+        counts = pc.value_counts(array.drop_null())
+        values = counts.field("values").to_numpy(zero_copy_only=False)
+        self.distinct.add(hash_values(values))
+        self.top.add_counts(values, counts.field("counts").to_numpy())
+
+        numeric = array.filter(pc.match_substring_regex(array, NUMBER_PATTERN), null_selection_behavior="drop")
+        if len(numeric):
+            parsed = pc.cast(numeric, pa.float64()).to_numpy()
+            self.numeric += len(parsed)
+            self.minimum = min(self.minimum, parsed.min())
+            self.maximum = max(self.maximum, parsed.max())
+            self.quantiles.add(parsed)
+
+    def report(self):
+        non_null = self.rows - self.nulls
+        is_numeric = non_null > 0 and self.numeric / non_null >= 0.95
+        row = {
+            "columna": self.name,
+            "filas": self.rows,
+            "nulos_pct": round(100 * self.nulls / self.rows, 1) if self.rows else np.nan,
+            "distintos_aprox": min(self.distinct.count(), non_null),
+            "numerico_pct": round(100 * self.numeric / non_null, 1) if non_null else np.nan,
+            "min": self.minimum if is_numeric else np.nan,
+            "max": self.maximum if is_numeric else np.nan,
+        }
+        for q, value in zip(QUANTILES, self.quantiles.quantiles(QUANTILES)):
+            row[f"p{int(q * 100):02d}"] = value if is_numeric else np.nan
+        row["top"] = ", ".join(f"{value} ({count})" for value, count in self.top.top(5))
+        return row
+
+
+def profile_csv(path, block_size=BLOCK_SIZE):
+    """One streaming pass over a CSV; returns one report row per column."""
+    path = Path(path)
+    header = read_header(path)
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            # Everything as text: types are inferred by the profile, not by the reader
+            column_types={name: pa.string() for name in header},
+            null_values=NULL_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    profiles = [ColumnProfile(name) for name in reader.schema.names]
+    for batch in reader:
+        for profile, array in zip(profiles, batch.columns):
+            profile.add(array)
+    return pd.DataFrame([p.report() for p in profiles])
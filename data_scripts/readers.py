@@ -0,0 +1,240 @@
+# readers.py
+# Dtype-explicit CSV readers for the raw inputs. Each source declares how its
+# raw headers map to our column names; types come from the data dictionaries
+# in documentation/dataframes. Only the mapped columns are parsed, with the
+# pyarrow CSV engine (multithreaded); columns a script needs beyond the
+# dictionary are listed in the source's "keep". Dates are read as text and
+# parsed afterwards, so a malformed value becomes NaT instead of failing the
+# whole file.
+
+import csv
+import runpy
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+DICTIONARIES_DIR = Path(__file__).parent.parent / "documentation" / "dataframes"
+
+DICTIONARIES = {
+    "censos": ("censos_dict.py", "CENSOS_DATA_DICTIONARY"),
+    "contratos": ("contratos_dict.py", "CONTRATOS_DICT"),
+    "locales": ("locales_dict.py", "LOCALES_DATA_DICTIONARY"),
+    "nominas": ("nominas_dict.py", "NOMINAS_DATA_DICTIONARY"),
+}
+
+# data_type of the dictionaries -> Arrow type
+ARROW_TYPES = {
+    "string": pa.string(),
+    "texto": pa.string(),
+    "categórico": pa.string(),
+    "Int64": pa.int64(),
+    "entero": pa.int64(),
+    "boolean": pa.bool_(),
+    "booleano": pa.bool_(),
+    # Parsed after reading (parse_dates), not by the CSV reader
+    "fecha": pa.string(),
+}
+
+# Arrow type -> pandas dtype of the returned frame (nullable, Arrow-backed strings)
+PANDAS_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+# Dates come as M/D/YYYY (e.g. 2/28/2026) or ISO; tried in this order
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d", "%d-%m-%Y", "ISO8601"]
+TRUE_VALUES = ["1", "true", "True", "TRUE", "si", "Si", "SI", "sí", "Sí", "x", "X"]
+FALSE_VALUES = ["0", "false", "False", "FALSE", "no", "No", "NO"]
+NULL_VALUES = ["", "NA", "N/A", "n/a", "NaN", "nan", "null", "-"]
+
+
+# =============================================================================
+# SOURCES (raw header -> column name)
+# =============================================================================
+def snake_case(column):
+    """'Razón Social' -> 'razon_social', 'N° Local' -> 'n_local'."""
+    return (
+        str(column).strip().lower()
+        .replace(" ", "_").replace("n°", "n").replace("(", "").replace(")", "").replace(".", "")
+        .replace("á", "a").replace("é", "e").replace("í", "i").replace("ó", "o").replace("ú", "u")
+        .strip("_")
+    )
+
+
+CENSO_COLUMNS = [
+    "local_id", "fecha", "periodo", "agencia", "schoperas_total", "schoperas_ccu", "schoperas_otros",
+    "salidas_total", "salidas_ccu", "salidas_otras", "coolers_total", "marcas_ccu", "marcas_abenv",
+    "marcas_kross", "marcas_otras", "instalo", "disponibilizo",
+]
+CENSO_TYPES = {
+    "fecha": "fecha",
+    "periodo": "string",
+    "agencia": "string",
+    "schoperas_total": "Int64",
+    "salidas_total": "Int64",
+    "salidas_otras": "Int64",
+    "marcas_ccu": "boolean",
+    # 1/0 flags compared with == 1 in transform_base
+    "instalo": "Int64",
+    "disponibilizo": "Int64",
+}
+
+SOURCES = {
+    "censo_2023": {
+        "dictionary": "censos",
+        "columns": {
+            "id": "local_id",
+            "N° Coolers": "coolers_total",
+            "N° Columnas (Schoperas)": "schoperas_otros",
+            "N° Salidas Schop CCU": "salidas_total",
+        },
+        "keep": CENSO_COLUMNS,
+        "types": CENSO_TYPES,
+    },
+    "censo_2024": {
+        "dictionary": "censos",
+        "columns": {
+            "id": "local_id",
+            "CANTIDAD DE SCHOPERAS CCU": "schoperas_ccu",
+            "CANTIDAD DE SALIDAS": "salidas_total",
+            "CANTIDAD DE SHOPERAS COMPETENCIA ": "schoperas_otros",
+        },
+        "keep": CENSO_COLUMNS,
+        "types": CENSO_TYPES,
+    },
+    "censo_2025": {
+        "dictionary": "censos",
+        "columns": {
+            "id": "local_id",
+            "Número de Salidas Actuales ": "salidas_total",
+            "CCH": "marcas_abenv",
+            "KROSS": "marcas_kross",
+            "Otras": "marcas_otras",
+        },
+        "keep": CENSO_COLUMNS,
+        "types": CENSO_TYPES,
+    },
+    "contratos": {
+        "dictionary": "contratos",
+        "columns": {
+            "id": "local_id",
+            "Fecha Inicio": "fecha_inicio",
+            "Fecha Fin": "fecha_fin",
+            "VIGENTE/NO VIGENTE": "vigente_sn",
+            "Folio": "folio",
+            "Activos/No Activos Según CCU (sin detalle)": "activo_ccu_sn",
+        },
+        # Raw flags transform_base turns into vigente / reportado_inactivo_ccu
+        "keep": ["vigente_sn", "activo_ccu_sn"],
+        "types": {"vigente_sn": "string", "activo_ccu_sn": "string"},
+    },
+    "locales": {
+        "dictionary": "locales",
+        "rename": snake_case,
+        "columns": {
+            "id": "local_id",
+            "nombre_de_fantasia": "nombre_fantasia",
+            "nombre_de_fantasia_2": "nombre_fantasia_2",
+        },
+        "keep": ["nombre_fantasia_2"],
+        "types": {},
+    },
+    "nominas": {
+        "dictionary": "nominas",
+        "rename": snake_case,
+        "columns": {
+            "id": "local_id",
+            "schoperas_delta": "delta_schoperas",
+            "salidas_delta": "delta_salidas",
+            "variacion_schoperas": "delta_schoperas",
+            "variacion_salidas": "delta_salidas",
+        },
+        "keep": ["fecha", "delta_schoperas", "delta_salidas"],
+        "types": {"fecha": "fecha", "delta_schoperas": "Int64", "delta_salidas": "Int64"},
+    },
+}
+
+
+# =============================================================================
+# READERS
+# =============================================================================
+_dictionaries = {}
+
+
+def load_dictionary(name):
+    """Data dictionary of documentation/dataframes (loaded once, without importing the folder as a package)."""
+    if name not in _dictionaries:
+        file_name, variable = DICTIONARIES[name]
+        _dictionaries[name] = runpy.run_path(str(DICTIONARIES_DIR / file_name))[variable]
+    return _dictionaries[name]
+
+
+def read_header(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def resolve_columns(header, source):
+    """Returns {raw header: (column name, arrow type, data type)} for the columns of header the source uses."""
+    spec = SOURCES[source]
+    dictionary = load_dictionary(spec["dictionary"])
+    rename = spec.get("rename", lambda c: c)
+    wanted = set(dictionary) | set(spec["columns"].values()) | set(spec["keep"])
+
+    selected = {}
+    for raw in header:
+        name = spec["columns"].get(raw) or spec["columns"].get(rename(raw)) or rename(raw)
+        if name not in wanted or name in {n for n, *_ in selected.values()}:
+            continue
+        data_type = spec["types"].get(name) or dictionary.get(name, {}).get("data_type", "string")
+        selected[raw] = (name, ARROW_TYPES[data_type], data_type)
+    return selected
+
+
+def parse_dates(values):
+    """Text dates in any of DATE_FORMATS -> datetime64[us]; unparseable values become NaT."""
+    values = pd.Series(values, dtype="string").str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+    for date_format in DATE_FORMATS:
+        missing = parsed.isna() & values.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(values[missing], format=date_format, errors="coerce")
+    return parsed.astype("datetime64[us]")
+
+
+def read_source(path, source):
+    """
+    Reads a raw CSV with the column mapping and types of SOURCES[source].
+
+    Returns a pandas frame with our column names, nullable dtypes (Int64,
+    boolean, Arrow strings) and datetime64[us] dates (NaT when malformed);
+    unmapped columns are never parsed.
+    """
+    path = Path(path)
+    selected = resolve_columns(read_header(path), source)
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=list(selected),
+        column_types={raw: arrow_type for raw, (_, arrow_type, _) in selected.items()},
+        true_values=TRUE_VALUES,
+        false_values=FALSE_VALUES,
+        null_values=NULL_VALUES,
+        strings_can_be_null=True,
+    )
+    try:
+        table = pa_csv.read_csv(path, convert_options=convert_options)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"{path.name}: {e}") from e
+
+    table = table.rename_columns([selected[raw][0] for raw in table.column_names])
+    df = table.to_pandas(types_mapper=PANDAS_TYPES.get)
+    for name, _, data_type in selected.values():
+        if data_type == "fecha":
+            df[name] = parse_dates(df[name])
+    return df
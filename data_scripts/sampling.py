@@ -0,0 +1,206 @@
+# sampling.py
+# Stratified, referentially consistent samples of the four tables for fast
+# development runs. Venues are stratified on region, the clasificacion of
+# their latest census and their contract status; censos, nominas and
+# contratos are then cut to the sampled venues with hash semi-joins.
+#
+# Usage (from the repo root, on the outputs of transform_base.py):
+#   python data_scripts/sampling.py --size 500
+
+import argparse
+import runpy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# SETTINGS
+# =============================================================================
+OUTPUT_DIR = Path(__file__).parent / "outputs"
+TABLES = ("locales", "censos", "nominas", "contratos")
+STRATA = ["region", "clasificacion", "contrato"]
+
+CONFIG_PATH = Path(__file__).parent.parent / "utils" / "config.py"
+
+
+# =============================================================================
+# STRATA
+# =============================================================================
+def _id_column(locales_df):
+    """'id' in the worksheets, 'local_id' in the outputs of transform_base.py."""
+    return "local_id" if "local_id" in locales_df.columns else "id"
+
+
+def _keys(values):
+    """Venue ids as int64 when they are all whole numbers (also '123' / 123.0), else as text."""
+    values = pd.Series(values)
+    numbers = values if pd.api.types.is_integer_dtype(values) else pd.to_numeric(values, errors="coerce")
+    if numbers.notna().all() and (numbers % 1 == 0).all():
+        return numbers.to_numpy(dtype=np.int64)
+    return values.astype(str).str.strip().str.removesuffix(".0").to_numpy(dtype=object)
+
+
+def _comparable(a, b):
+    """Both key arrays as text if one of them could not be read as numbers."""
+    if a.dtype != b.dtype:
+        return a.astype(str).astype(object), b.astype(str).astype(object)
+    return a, b
+
+
+def compliance_rule():
+    """
+    umbral / ratio of the compliance rule (SALIDAS_MINIMAS / SALIDAS_RATIO of
+    utils/config.py), read without importing the app packages: the scripts in
+    this folder run with only data_scripts on the path.
+    """
+    config = runpy.run_path(str(CONFIG_PATH))
+    return {"umbral": config["SALIDAS_MINIMAS"], "ratio": config["SALIDAS_RATIO"]}
+
+
+def _clasificacion(censos_df, umbral, ratio):
+    """clasificacion of the census rows (the column itself if already computed)."""
+    if "clasificacion" in censos_df.columns:
+        return censos_df["clasificacion"].astype(str)
+    total = pd.to_numeric(censos_df["salidas_total"], errors="coerce")
+    otras = pd.to_numeric(censos_df["salidas_otras"], errors="coerce")
+    # Same steps as process_censos: a missing total never applies and a
+    # missing salidas_otras never meets the target
+    applies = total > umbral
+    complies = otras >= np.floor(total / ratio)
+    return pd.Series(
+        np.where(~applies, "No aplica", np.where(complies, "En regla", "No en regla")),
+        index=censos_df.index,
+    )
+
+
+def venue_strata(locales_df, censos_df, contratos_df, *, umbral, ratio):
+    """
+    One row per venue (indexed by id) with region, clasificacion, contrato and an estrato code.
+
+    umbral / ratio: compliance rule for censos without clasificacion (see compliance_rule).
+    """
+    venue_ids = _keys(locales_df[_id_column(locales_df)])
+    censo_ids = _keys(censos_df["local_id"])
+    contrato_ids = _keys(contratos_df["local_id"])
+    venue_ids, censo_ids = _comparable(venue_ids, censo_ids)
+    venue_ids, contrato_ids = _comparable(venue_ids, contrato_ids)
+
+    region = locales_df["region"].fillna("Sin region").to_numpy() if "region" in locales_df else "Sin region"
+    venues = pd.DataFrame({"region": region}, index=pd.Index(venue_ids, name="local_id"))
+    venues = venues[~venues.index.duplicated()]
+
+    # Latest census of each venue
+    censos = pd.DataFrame({
+        "local_id": censo_ids,
+        "periodo": censos_df["periodo"].to_numpy(),
+        "fecha": censos_df["fecha"].to_numpy() if "fecha" in censos_df else 0,
+        "clasificacion": _clasificacion(censos_df, umbral, ratio).to_numpy(),
+    })
+    latest = censos.sort_values(["periodo", "fecha"], kind="stable").drop_duplicates("local_id", keep="last")
+    venues["clasificacion"] = latest.set_index("local_id")["clasificacion"].reindex(venues.index).fillna("Sin censo")
+
+    # Contract status: any vigente contract, only expired ones, or none
+    vigente = contratos_df["vigente"]
+    if pd.api.types.is_numeric_dtype(vigente) or pd.api.types.is_bool_dtype(vigente):
+        vigente = vigente.eq(1)
+    else:
+        vigente = vigente.astype(str).str.strip().str.lower().isin(["1", "1.0", "true", "vigente"])
+    status = pd.Series(vigente.to_numpy(), index=contrato_ids).groupby(level=0).any().reindex(venues.index)
+    venues["contrato"] = np.where(status.isna(), "Sin contrato", np.where(status.fillna(False).astype(bool), "Vigente", "No vigente"))
+
+    venues["estrato"] = venues.groupby(STRATA, sort=True).ngroup().to_numpy()
+    return venues
+
+
+def allocate(counts, size):
+    """
+    Venues to draw per stratum: proportional to its size (largest remainder),
+    with at least one per stratum when size allows it.
+    """
+    size = min(size, int(counts.sum()))
+    if size >= len(counts):
+        # One per stratum first, the rest proportionally to what is left
+        base = np.ones(len(counts), dtype=int)
+        quota = (counts - 1) / max(counts.sum() - len(counts), 1) * (size - len(counts))
+    else:
+        base = np.zeros(len(counts), dtype=int)
+        quota = counts / counts.sum() * size
+    take = base + np.floor(quota).astype(int)
+    remainder = (quota - np.floor(quota)).sort_values(ascending=False, kind="stable")
+    take[remainder.index[: size - take.sum()]] += 1
+    return take.clip(upper=counts)
+
+
+# =============================================================================
+# SAMPLING
+# =============================================================================
+def _rank(ids, seed):
+    """Stable pseudo-random rank of each id: the same venues win in every run with the same seed."""
+    # hash_array ignores hash_key for numeric ids, so the seed is mixed into the
+    # id hashes and the result hashed again
+    salt = pd.util.hash_array(np.array([seed], dtype=np.int64))[0]
+    return pd.util.hash_array(pd.util.hash_array(np.asarray(ids)) ^ salt)
+
+
+def sample_venues(strata, size, seed=42):
+    """ids of a stratified sample; the same seed always picks the same venues."""
+    ordered = strata.assign(_rank=_rank(strata.index, seed)).sort_values(["estrato", "_rank"], kind="stable")
+    take = allocate(ordered["estrato"].value_counts(sort=False), size)
+    position = ordered.groupby("estrato", sort=False).cumcount()
+    return ordered.index[(position < ordered["estrato"].map(take)).to_numpy()]
+
+
+def semi_join(df, ids, column="local_id"):
+    """Rows of df whose column is in ids: the (small) id set is indexed once and probed in one pass."""
+    ids, keys = _comparable(np.asarray(ids), _keys(df[column]))
+    return df[pd.Index(ids).get_indexer(keys) >= 0]
+
+
+def stratified_sample(locales_df, censos_df, nominas_df, contratos_df, size, *, umbral, ratio, seed=42):
+    """(locales, censos, nominas, contratos) restricted to a stratified sample of `size` venues.
+
+    umbral / ratio: compliance rule, for censos without clasificacion.
+    nominas_df may be None (the caller then reads the sampled venues itself).
+    """
+    ids = sample_venues(venue_strata(locales_df, censos_df, contratos_df, umbral=umbral, ratio=ratio), size, seed)
+    return (
+        semi_join(locales_df, ids, _id_column(locales_df)),
+        semi_join(censos_df, ids),
+        None if nominas_df is None else semi_join(nominas_df, ids),
+        semi_join(contratos_df, ids),
+    )
+
+
+def strata_shares(locales_df, censos_df, contratos_df, *, umbral, ratio):
+    """Share of venues per value of each stratum column (to compare a sample with the full data)."""
+    strata = venue_strata(locales_df, censos_df, contratos_df, umbral=umbral, ratio=ratio)
+    return pd.concat({column: strata[column].value_counts(normalize=True) for column in STRATA})
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Stratified, consistent sample of the transformed tables.")
+    parser.add_argument("--size", type=int, default=500, help="Number of venues in the sample")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dir", type=Path, default=OUTPUT_DIR, help="Folder with locales/censos/nominas/contratos.csv")
+    args = parser.parse_args()
+
+    frames = [pd.read_csv(args.dir / f"{name}.csv", dtype={"local_id": "string"}) for name in TABLES]
+    rule = compliance_rule()
+    samples = stratified_sample(*frames, size=args.size, seed=args.seed, **rule)
+    for name, full, sample in zip(TABLES, frames, samples):
+        sample.to_csv(args.dir / f"{name}_sample.csv", index=False)
+        print(f"- {name}_sample.csv: {len(sample)} of {len(full)} rows")
+
+    shares = pd.DataFrame({
+        "full": strata_shares(frames[0], frames[1], frames[3], **rule),
+        "sample": strata_shares(samples[0], samples[1], samples[3], **rule),
+    }).fillna(0)
+    print(shares.round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,20 @@
 import pandas as pd
 from pathlib import Path
 
+from dedup import apply_id_map, build_canonical_ids, dedupe_censos, dedupe_contratos
+from nominas_ingest import available_quarters, export_nominas_csv, ingest_nominas, read_nominas
+from readers import read_source
+from sampling import compliance_rule, stratified_sample
+
 # =============================================================================
 # SETTINGS & PATHS
 # =============================================================================
 INPUT_DIR = Path(__file__).parent / "inputs"
 OUTPUT_DIR = Path(__file__).parent / "outputs"
 
+# Venues in the development sample (*_sample.csv)
+SAMPLE_SIZE = 500
+
 # Ensure output directory exists
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -18,13 +26,13 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 # =============================================================================
 print("Loading dataframes...")
 
-df_censo_2023 = pd.read_csv(INPUT_DIR / "censo_2023.csv")
-df_censo_2024 = pd.read_csv(INPUT_DIR / "censo_2024.csv")
-df_censo_2025 = pd.read_csv(INPUT_DIR / "censo_2025.csv")
-df_contratos = pd.read_csv(INPUT_DIR / "contratos.csv")
-df_locales = pd.read_csv(INPUT_DIR / "locales.csv")
-df_nominas_2025_q2 = pd.read_csv(INPUT_DIR / "nominas_2025_q2.csv")
-df_nominas_2025_q3 = pd.read_csv(INPUT_DIR / "nominas_2025_q3.csv")
+# Only the mapped columns are parsed, with the types of the data dictionaries
+# (column mappings per source live in readers.SOURCES)
+df_censo_2023 = read_source(INPUT_DIR / "censo_2023.csv", "censo_2023")
+df_censo_2024 = read_source(INPUT_DIR / "censo_2024.csv", "censo_2024")
+df_censo_2025 = read_source(INPUT_DIR / "censo_2025.csv", "censo_2025")
+df_contratos = read_source(INPUT_DIR / "contratos.csv", "contratos")
+df_locales = read_source(INPUT_DIR / "locales.csv", "locales")
 
 print("Done. Loaded:")
 print(f"- df_censo_2023: {len(df_censo_2023)} rows")
@@ -32,8 +40,6 @@ print(f"- df_censo_2024: {len(df_censo_2024)} rows")
 print(f"- df_censo_2025: {len(df_censo_2025)} rows")
 print(f"- df_contratos: {len(df_contratos)} rows")
 print(f"- df_locales: {len(df_locales)} rows")
-print(f"- df_nominas_2025_q2: {len(df_nominas_2025_q2)} rows")
-print(f"- df_nominas_2025_q3: {len(df_nominas_2025_q3)} rows")
 
 
 # =============================================================================
@@ -41,38 +47,24 @@ print(f"- df_nominas_2025_q3: {len(df_nominas_2025_q3)} rows")
 # =============================================================================
 locales_df = df_locales.copy()
 
-# 1. Clean column names (snake_case, no accents)
-locales_df.columns = [
-    c.lower()
-    .replace(" ", "_")
-    .replace("n°", "n")
-    .replace("(", "")
-    .replace(")", "")
-    .replace(".", "")
-    .replace("á", "a")
-    .replace("é", "e")
-    .replace("í", "i")
-    .replace("ó", "o")
-    .replace("ú", "u")
-    .strip("_")
-    for c in locales_df.columns
-]
-
-# 2. Map specific names
-locales_df = locales_df.rename(columns={
-    "id": "local_id",
-    "nombre_de_fantasia": "nombre_fantasia",
-    "nombre_de_fantasia_2": "nombre_fantasia_2"
-})
+# Column names arrive snake_case and mapped (readers.SOURCES['locales'])
 
-# 3. Format text columns (Trim & Title)
+# 1. Format text columns (Trim & Title)
 columns_to_format = ["razon_social", "direccion", "nombre_fantasia", "nombre_fantasia_2", "ciudad", "region"]
 
 for col in columns_to_format:
     if col in locales_df.columns:
         locales_df[col] = locales_df[col].astype(str).str.strip().str.title()
 
-# 4. Save Locales
+# 2. Deduplicate venues (same business under different ids / spellings / RUT formats)
+id_map = build_canonical_ids(locales_df)
+id_map.to_csv(OUTPUT_DIR / "locales_id_map.csv", index=False)
+
+es_canonico = (id_map["local_id"] == id_map["canonical_id"]).to_numpy()
+print(f"\nDedup: {(~es_canonico).sum()} duplicated venues merged into {id_map.loc[~es_canonico, 'canonical_id'].nunique()}")
+locales_df = locales_df[es_canonico]
+
+# 3. Save Locales
 print("\nLocales head:")
 print(locales_df.head())
 print("-" * 50)
@@ -112,38 +104,28 @@ censos_df = censos_df.astype({
 })
 
 # --- Census 2023 ---
-df_2023_tmp = df_censo_2023.rename(columns={
-    "id": "local_id",
-    "N° Coolers": "coolers_total",
-    "N° Columnas (Schoperas)": "schoperas_otros",
-    "N° Salidas Schop CCU": "salidas_total"
-})
+# Columns already renamed by readers.SOURCES['censo_2023']
+df_2023_tmp = df_censo_2023.copy()
 df_2023_tmp["periodo"] = "2023"
 censos_df = pd.concat([censos_df, df_2023_tmp[df_2023_tmp.columns.intersection(censos_df.columns)]], ignore_index=True)
 
 # --- Census 2024 ---
-df_2024_tmp = df_censo_2024.rename(columns={
-    "id": "local_id",
-    "CANTIDAD DE SCHOPERAS CCU": "schoperas_ccu",
-    "CANTIDAD DE SALIDAS": "salidas_total",
-    "CANTIDAD DE SHOPERAS COMPETENCIA ": "schoperas_otros"
-})
+# Columns already renamed by readers.SOURCES['censo_2024']
+df_2024_tmp = df_censo_2024.copy()
 df_2024_tmp["periodo"] = "2024"
 censos_df = pd.concat([censos_df, df_2024_tmp[df_2024_tmp.columns.intersection(censos_df.columns)]], ignore_index=True)
 
 # --- Census 2025 ---
-df_2025_tmp = df_censo_2025.rename(columns={
-    "id": "local_id",
-    "Número de Salidas Actuales ": "salidas_total",
-    "CCH": "marcas_abenv",
-    "KROSS": "marcas_kross",
-    "Otras": "marcas_otras"
-})
+# Columns already renamed by readers.SOURCES['censo_2025']
+df_2025_tmp = df_censo_2025.copy()
 df_2025_tmp["periodo"] = "2025"
-df_2025_tmp["instalo"] = df_censo_2025["instalo"] == 1
-df_2025_tmp["disponibilizo"] = df_censo_2025["disponibilizo"] == 1
+df_2025_tmp["instalo"] = df_censo_2025["instalo"].eq(1).fillna(False)
+df_2025_tmp["disponibilizo"] = df_censo_2025["disponibilizo"].eq(1).fillna(False)
 censos_df = pd.concat([censos_df, df_2025_tmp[df_2025_tmp.columns.intersection(censos_df.columns)]], ignore_index=True)
 
+# Merged venues keep one census per periodo
+censos_df = dedupe_censos(apply_id_map(censos_df, id_map))
+
 # 4. Save Censos
 print("\nCensos head:")
 print(censos_df.head())
@@ -154,26 +136,17 @@ censos_df.to_csv(OUTPUT_DIR / "censos.csv", index=False)
 # =============================================================================
 # CONTRATOS TRANSFORMATION
 # =============================================================================
-df_contratos = df_contratos.rename(columns={
-    "id": "local_id",
-    "Fecha Inicio": "fecha_inicio",
-    "Fecha Fin": "fecha_fin",
-    "VIGENTE/NO VIGENTE": "vigente_sn",
-    "Folio": "folio",
-    "Activos/No Activos Según CCU (sin detalle)": "activo_ccu_sn",
-})
-
-# Convert dates (handles M/D/YYYY like 2/28/2026)
-df_contratos["fecha_inicio"] = pd.to_datetime(df_contratos["fecha_inicio"], errors='coerce')
-df_contratos["fecha_fin"] = pd.to_datetime(df_contratos["fecha_fin"], errors='coerce')
+# Columns renamed and dates parsed (M/D/YYYY like 2/28/2026) by readers.SOURCES['contratos']
 
 # Boolean conversions
-df_contratos["vigente"] = df_contratos["vigente_sn"] == "VIGENTE"
-df_contratos["reportado_inactivo_ccu"] = df_contratos["activo_ccu_sn"] != "Activos"
+df_contratos["vigente"] = df_contratos["vigente_sn"].eq("VIGENTE").fillna(False)
+df_contratos["reportado_inactivo_ccu"] = df_contratos["activo_ccu_sn"].ne("Activos").fillna(True)
 
 # Final selection and types
 df_contratos = df_contratos.astype({"local_id": "string", "folio": "string"})
 df_contratos = df_contratos[["local_id", "fecha_inicio", "fecha_fin", "vigente", "folio", "reportado_inactivo_ccu"]]
+# Contracts copied under several ids of a merged venue are kept once
+df_contratos = dedupe_contratos(apply_id_map(df_contratos, id_map))
 
 print("\nContratos head:")
 print(df_contratos.head())
@@ -182,21 +155,30 @@ df_contratos.to_csv(OUTPUT_DIR / "contratos.csv", index=False)
 
 
 # =============================================================================
-# NOMINAS TRANSFORMATION (Placeholder)
+# NOMINAS TRANSFORMATION
 # =============================================================================
-# TODO: Implement nominations logic
+# One parquet partition per quarterly file (outputs/nominas/periodo=YYYY-Qn);
+# files already ingested with the same content are skipped and only the new
+# quarters are appended to nominas.csv.
+NOMINAS_DIR = OUTPUT_DIR / "nominas"
 
-# sample
+nuevos = ingest_nominas(INPUT_DIR, NOMINAS_DIR, id_map=id_map)
+print(f"\nNominas: ingested {nuevos or 'nothing new'}, available {available_quarters(NOMINAS_DIR)}")
+
+exportados = export_nominas_csv(NOMINAS_DIR, OUTPUT_DIR / "nominas.csv")
+print(f"nominas.csv: wrote {exportados or 'nothing new'}")
+print("-" * 50)
 
 # =============================================================================
 # SAMPLE
 # =============================================================================
-
-locales_sample = locales_df.sample(15, random_state=42)
-locales_sample.to_csv(OUTPUT_DIR / "locales_sample.csv", index=False)
-
-distinct_local_ids = locales_sample["local_id"].unique()
-
-contratos_sample = df_contratos[df_contratos["local_id"].isin(distinct_local_ids)]
-contratos_sample.to_csv(OUTPUT_DIR / "contratos_sample.csv", index=False)
-
+# Venues stratified on region, clasificacion of their latest census and
+# contract status, with their censos, nominas and contratos (sampling.py).
+# Only the nominas of the sampled venues are read from the partitions.
+samples = stratified_sample(locales_df, censos_df, None, df_contratos, size=SAMPLE_SIZE, **compliance_rule())
+samples = (samples[0], samples[1], read_nominas(NOMINAS_DIR, local_ids=samples[0]["local_id"]), samples[3])
+
+print(f"\nSample of {SAMPLE_SIZE} venues:")
+for name, sample_df in zip(("locales", "censos", "nominas", "contratos"), samples):
+    sample_df.to_csv(OUTPUT_DIR / f"{name}_sample.csv", index=False)
+    print(f"- {name}_sample.csv: {len(sample_df)} rows")
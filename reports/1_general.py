@@ -2,18 +2,21 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 import altair as alt
-from src.data_preparation import get_generated_dataframes
-from utils.config import CLASIFICACION_COLORS
+from src.compliance import simulate_rules
+from src.data_store import get_data_store, get_shared_dataframes
+from src.rollups import TOTAL, distinct_venues
+from utils.config import CLASIFICACION_COLORS, SALIDAS_MINIMAS, SALIDAS_RATIO
 
 st.title("Cumplimiento de Competencia CCU - Demo App")
 
 st.markdown("Lectura de datos desde [Google Sheets](https://docs.google.com/spreadsheets/d/11JgW2Z9cFrHvNFw21-zlvylTHHo5tvizJeA9oxHcDHU/edit?gid=2068995815#gid=2068995815)")
 
 def plot_clasificacion_pie(df):
-    """Generates a pie chart for classification distribution."""
+    """Generates a pie chart for classification distribution from cube rows (registros)."""
     fig = px.pie(
         df,
         names='clasificacion',
+        values='registros',
         color='clasificacion',
         hole=.3,
         color_discrete_map=CLASIFICACION_COLORS,
@@ -29,7 +32,7 @@ def plot_clasificacion_pie(df):
     return fig
 
 try:
-    locales_df, censos_df, activos_df, nominas_df, contratos_df = get_generated_dataframes()
+    locales_df, censos_df, activos_df, nominas_df, contratos_df = get_shared_dataframes()
 except FileNotFoundError as e:
     st.error(f"Error loading data file: {e}. Please make sure the files are in the 'data/raw/' directory.")
     st.stop()
@@ -39,14 +42,28 @@ except FileNotFoundError as e:
 # FILTERS
 # -----------------------------------------------------------------------------
 
-selected_periodo = 2025
+# censos_df['periodo'] is a string ("2025")
+selected_periodo = "2025"
 
 # periodos = sorted(censos_df['periodo'].unique(), reverse=True)
 # selected_periodo = st.selectbox("Seleccionar Periodo", periodos, width=200)
 
-censos_df_anual = censos_df[censos_df['periodo'] == selected_periodo]
-
-
+# Filters roll up the pre-aggregated cubes of the data store (no row scans)
+store = get_data_store()
+censos_cube = store.censos_cube
+
+filter_col1, filter_col2, filter_col3 = st.columns(3)
+with filter_col1:
+    selected_regiones = st.multiselect("Región", censos_cube.members('region'))
+with filter_col2:
+    selected_ciudades = st.multiselect("Ciudad", censos_cube.members('ciudad'))
+with filter_col3:
+    selected_agencias = st.multiselect("Agencia", censos_cube.members('agencia'), help="Solo aplica a censos")
+
+filtros = dict(region=selected_regiones, ciudad=selected_ciudades)
+censos_anual = censos_cube.rollup(
+    by=['clasificacion'], periodo=selected_periodo, agencia=selected_agencias, **filtros
+)
 
 
 # -----------------------------------------------------------------------------
@@ -54,26 +71,42 @@ censos_df_anual = censos_df[censos_df['periodo'] == selected_periodo]
 # -----------------------------------------------------------------------------
 
 
-# Calculate KPIs based on the clasificacion of all census records.
-clasificacion_counts = censos_df_anual['clasificacion'].value_counts()
-
-en_regla = clasificacion_counts.get("En regla", 0)
-no_en_regla = clasificacion_counts.get("No en regla", 0)
-sin_comodato = clasificacion_counts.get("Sin comodato o terminado", 0)
-no_aplica = clasificacion_counts.get("No aplica", 0)
-total_locales = censos_df['local_id'].nunique()
-total_contratos_vigentes = contratos_df[contratos_df['vigente'] == True]['local_id'].nunique()
+# Calculate KPIs based on the clasificacion of the census records of the periodo.
+# "Locales" and "Contratos Vigentes" count distinct venues, the clasificacion
+# tiles count census records. With no filter, one region / ciudad filter or a
+# single agencia they are O(1) lookups in the materialized rollups; other
+# selections roll up the cubes and count distinct venues from the rows.
+seleccion = {nivel: grupos for nivel, grupos in
+             dict(region=selected_regiones, ciudad=selected_ciudades, agencia=selected_agencias).items() if grupos}
+nivel, grupos = next(iter(seleccion.items()), ("total", [TOTAL]))
+if len(seleccion) <= 1 and (nivel != "agencia" or len(grupos) == 1):
+    kpis = store.rollups.total(nivel, grupos, selected_periodo)
+    en_regla, no_en_regla = kpis["en_regla"], kpis["no_en_regla"]
+    sin_comodato, no_aplica = kpis["sin_comodato"], kpis["no_aplica"]
+    total_locales, brecha_total = kpis["locales"], kpis["brecha_total"]
+    # Contracts ignore the agencia filter
+    nivel_contratos, grupos_contratos = (nivel, grupos) if nivel != "agencia" else ("total", [TOTAL])
+    total_contratos_vigentes = store.rollups.total_contratos(nivel_contratos, grupos_contratos)["locales_vigentes"]
+else:
+    clasificacion_counts = censos_anual.set_index('clasificacion')['registros']
+    en_regla = clasificacion_counts.get("En regla", 0)
+    no_en_regla = clasificacion_counts.get("No en regla", 0)
+    sin_comodato = clasificacion_counts.get("Sin comodato o terminado", 0)
+    no_aplica = clasificacion_counts.get("No aplica", 0)
+    brecha_total = censos_anual.set_index('clasificacion')['brecha'].get("No en regla", 0)
+    total_locales, total_contratos_vigentes = distinct_venues(store, selected_periodo, agencia=selected_agencias, **filtros)
+brecha = brecha_total / no_en_regla if no_en_regla else float('nan')
 
 col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
 
 with col1:
-    st.metric("Locales", f"{total_locales}")
+    st.metric("Locales", f"{total_locales}", help=f"Locales censados en {selected_periodo}")
 with col2:
-    st.metric("Contratos Vigentes", f"{total_contratos_vigentes}")
+    st.metric("Contratos Vigentes", f"{total_contratos_vigentes}", help="Locales con al menos un contrato vigente")
 with col3:  
-    st.metric("Metrica a definir", f"{sin_comodato}")
+    st.metric("No en Regla", f"{no_en_regla}", help=f"Locales que no cumplen en el censo {selected_periodo}")
 with col4:
-    st.metric("Metrica a definir", f"{no_aplica}")
+    st.metric("Brecha Promedio", "-" if pd.isna(brecha) else f"{brecha:.1f} salidas", help="Salidas de otras marcas que faltan en promedio a los locales No en regla")
 
 
 
@@ -83,9 +116,10 @@ with col4:
 # -----------------------------------------------------------------------------
 
 st.header("Cumplimiento por Periodo - Censos")
-chart = alt.Chart(censos_df).mark_bar().encode(
+censos_por_periodo = censos_cube.rollup(by=['periodo', 'clasificacion'], agencia=selected_agencias, **filtros)
+chart = alt.Chart(censos_por_periodo).mark_bar().encode(
     x=alt.X('periodo:O', title='Periodo'),
-    y=alt.Y('count():Q', title='Número de Locales'),
+    y=alt.Y('registros:Q', title='Número de Locales'),
     color=alt.Color(
         'clasificacion:N',
         title='Clasificacion',
@@ -98,26 +132,38 @@ chart = alt.Chart(censos_df).mark_bar().encode(
 
 st.altair_chart(chart, use_container_width=True, height=200)
 
+with st.expander("Simulador de reglas de cumplimiento"):
+    st.markdown(f"Regla actual: aplica con más de {SALIDAS_MINIMAS} salidas y exige `floor(salidas_total / {SALIDAS_RATIO})` salidas de otras marcas.")
+    sim_col1, sim_col2 = st.columns(2)
+    with sim_col1:
+        umbrales = st.slider("Umbral de salidas (aplica si salidas_total > umbral)", 0, 12, (2, 6))
+    with sim_col2:
+        ratios = st.slider("Ratio (salidas_target = floor(salidas_total / ratio))", 2, 10, (3, 6))
+
+    escenarios_df = simulate_rules(
+        censos_df,
+        umbrales=range(umbrales[0], umbrales[1] + 1),
+        ratios=range(ratios[0], ratios[1] + 1),
+    )
+    escenarios_df = escenarios_df[escenarios_df['periodo'] == selected_periodo]
+    st.altair_chart(
+        alt.Chart(escenarios_df).mark_rect().encode(
+            x=alt.X('ratio:O', title='Ratio'),
+            y=alt.Y('umbral:O', title='Umbral'),
+            color=alt.Color('no_en_regla:Q', title='No en regla', scale=alt.Scale(scheme='reds')),
+            tooltip=['umbral', 'ratio', 'aplica', 'en_regla', 'no_en_regla', alt.Tooltip('brecha_promedio:Q', format='.2f')],
+        ),
+        use_container_width=True,
+    )
+
 # -----------------------------------------------------------------------------
 # ACTIVOS - DISTRIBUCION POR TRAMO
 # -----------------------------------------------------------------------------
 
 st.header("Distribución por Tramo de Salidas - Nominas")
 
-# Prepare tramo data
-activos_plot_df = activos_df.copy()
-
-# Filter by selected year (periodo of selectbox)
-# activos_plot_df = activos_plot_df[activos_plot_df['fecha'].dt.year == int(selected_periodo)]
-
-# Filter for active venues only if needed
-activos_plot_df = activos_plot_df[activos_plot_df['estado'] == 'activo']
-
-def define_tramo(val):
-    if pd.isna(val): return None
-    return "≤ 3 salidas" if val <= 3 else "≥ 4 salidas"
-
-activos_plot_df['salidas_tramo'] = activos_plot_df['salidas_totales'].apply(define_tramo)
+# Prepare tramo data: active venues only, rolled up from the activos cube
+activos_plot_df = store.activos_cube.rollup(by=['periodo', 'salidas_tramo'], estado='activo', **filtros)
 
 # Create the stacked bar chart
 # Order periods chronologically for the X-axis
@@ -125,7 +171,7 @@ period_order = sorted(activos_plot_df['periodo'].unique())
 
 tramo_chart = alt.Chart(activos_plot_df).mark_bar().encode(
     x=alt.X('periodo:O', title='Periodo', sort=period_order),
-    y=alt.Y('count():Q', title='Número de Locales'),
+    y=alt.Y('registros:Q', title='Número de Locales'),
     color=alt.Color(
         'salidas_tramo:N',
         title='Tramo de Salidas',
@@ -134,11 +180,25 @@ tramo_chart = alt.Chart(activos_plot_df).mark_bar().encode(
             range=["#CBDCEB", "#83c9ff"] # Grayish for small, CCU blue for large
         )
     ),
-    tooltip=['periodo', 'salidas_tramo', 'count()']
+    tooltip=['periodo', 'salidas_tramo', 'registros']
 ).properties(height=300)
 
 st.altair_chart(tramo_chart, use_container_width=True)
 
+# -----------------------------------------------------------------------------
+# TENDENCIA - PANEL LOCALES x TRIMESTRE
+# -----------------------------------------------------------------------------
+
+st.header("Tendencia por Trimestre - Nominas")
+st.markdown("Promedio entre locales activos; los trimestres sin nomina mantienen el ultimo estado informado.")
+
+activos_panel = store.activos_panel
+tendencia_df = pd.DataFrame({
+    "Salidas promedio": activos_panel.stats('salidas_totales')['mean'],
+    "Schoperas promedio": activos_panel.stats('schoperas_totales')['mean'],
+})
+st.line_chart(tendencia_df, height=250)
+
 st.subheader("Features posibles")
 st.markdown("- Estado de contrato por trimestre segun info de nominas.")
 st.markdown("- Cuantos locales tomarcon accion cumplimiento?")
@@ -148,5 +208,5 @@ st.markdown("- Tablas con formato customizado con boton de descarga")
 st.markdown("-  agregr URL del contrato drive u a otros doucmentos drive")
 
 
-fig = plot_clasificacion_pie(censos_df_anual)
+fig = plot_clasificacion_pie(censos_anual)
 st.plotly_chart(fig, use_container_width=True, height=200)
\ No newline at end of file
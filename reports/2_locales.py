@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
-from src.data_preparation import get_generated_dataframes
+from src.data_preparation import add_vencimiento
+from src.data_store import get_data_store
 from utils.config import CLASIFICACION_COLORS
 
 def display_compliance_badge(clasificacion):
@@ -18,167 +18,208 @@ def display_compliance_badge(clasificacion):
         st.badge(clasificacion, icon="🔍")
 
 try:
-    locales_df, censos_df, activos_df, nominas_df, contratos_df = get_generated_dataframes()
+    store = get_data_store()
 except FileNotFoundError as e:
     st.error(f"Error loading data file: {e}. Please make sure the files are in the 'data/raw/' directory.")
     st.stop()
 
 
+@st.cache_data(max_entries=256, show_spinner=False)
+def get_venue_frames(_store, version, local_id):
+    """Rows of one venue per frame, cached per (data version, local_id).
 
-# -----------------------------------------------------------------------------
-# FILTERS
-# -----------------------------------------------------------------------------
+    _store is the store the version came from (not hashed by st.cache_data).
+    """
+    local_stats_df = _store.venue_frame('activos', local_id).assign(
+        # Fill NaN values with 0 to ensure they appear in the chart
+        salidas_totales=lambda df: df['salidas_totales'].fillna(0)
+    )
+    local_censos = _store.venue_frame('censos', local_id).sort_values('fecha', ascending=False)
+    local_contratos = _store.venue_frame('contratos', local_id)
+    return local_stats_df, local_censos, local_contratos
 
-st.title("Locales")
-st.markdown("Informacion de censos y nominas de cada local por periodo")
-
-# Filter selection by razon_social
-names = locales_df['razon_social'].tolist()
-selected_name = st.selectbox("Seleccionar Local", names)
-local_info = locales_df[locales_df['razon_social'] == selected_name].iloc[0]
-selected_local_id = local_info['id']
-
-# -----------------------------------------------------------------------------
 
 # -----------------------------------------------------------------------------
 # FICHA DEL LOCAL
 # -----------------------------------------------------------------------------
 
-st.subheader("Ficha del Local")
-if pd.notna(local_info['nota_interna']):
-    st.markdown(f"Nota demo: {local_info['nota_interna']}")
+def render_ficha(local_info, local_censos, selected_local_id):
+    st.subheader("Ficha del Local")
+    if pd.notna(local_info['nota_interna']):
+        st.markdown(f"Nota demo: {local_info['nota_interna']}")
 
+    # Get most recent census clasificacion for the badge
+    latest_clasificacion = local_censos.iloc[0]['clasificacion'] if not local_censos.empty else "Sin Datos"
 
-# Get most recent census clasificacion for the badge
-local_censos = censos_df[censos_df['local_id'] == selected_local_id].sort_values('fecha', ascending=False)
-latest_clasificacion = local_censos.iloc[0]['clasificacion'] if not local_censos.empty else "Sin Datos"
+    with st.container(border=True):
+        col1, col2 = st.columns([2, 1])
 
-with st.container(border=True):
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.markdown(f"### {local_info['razon_social']}")
-        st.caption(f"ID: {int(selected_local_id)} | RUT: {local_info['rut']}")
-        st.markdown(f"📍 **{local_info['direccion']}**")
-        st.markdown(f"{local_info['ciudad']}, {local_info['region']}")
-        
-    with col2:
-        st.markdown("**Estado de Cumplimiento (Ultimo Censo)**")
-        if latest_clasificacion != "Sin Datos":
-            display_compliance_badge(latest_clasificacion)
-        else:
-            st.write("No hay censos registrados")
+        with col1:
+            st.markdown(f"### {local_info['razon_social']}")
+            st.caption(f"ID: {int(selected_local_id)} | RUT: {local_info['rut']}")
+            st.markdown(f"📍 **{local_info['direccion']}**")
+            st.markdown(f"{local_info['ciudad']}, {local_info['region']}")
+
+        with col2:
+            st.markdown("**Estado de Cumplimiento (Ultimo Censo)**")
+            if latest_clasificacion != "Sin Datos":
+                display_compliance_badge(latest_clasificacion)
+            else:
+                st.write("No hay censos registrados")
 
 
 # -----------------------------------------------------------------------------
 # ACTIVOS NOMINAS
 # -----------------------------------------------------------------------------
 
-st.subheader("Activos por Trimestre")
-st.markdown("Reconstruido usando censos y nominas CCU. Avisa si local necesita revision de cumplimiento.")
-st.markdown("*Se usa como fuente de verdad los totale sultimo censo registrado antes del periodo de la nomina.")
+def bar_chart_spec(y):
+    """Vega-Lite bar chart of y by periodo.
+
+    Same chart alt.Chart(...).mark_bar().encode(...) produced, as a plain dict:
+    building it with Altair validated the schema on every rerun (most of the
+    time of a venue change).
+    """
+    return {
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "periodo", "type": "nominal"},
+            "y": {"field": y, "type": "quantitative"},
+            "tooltip": [
+                {"field": "periodo", "type": "nominal"},
+                {"field": y, "type": "quantitative"},
+            ],
+        },
+    }
+
 
+SCHOPERAS_CHART = bar_chart_spec('schoperas_totales')
+SALIDAS_CHART = bar_chart_spec('salidas_totales')
 
-local_stats_df = activos_df[activos_df['local_id'] == selected_local_id].copy()
-# Fill NaN values with 0 to ensure they appear in the chart
-local_stats_df['salidas_totales'] = local_stats_df['salidas_totales'].fillna(0)
 
+def render_activos(local_stats_df):
+    st.subheader("Activos por Trimestre")
+    st.markdown("Reconstruido usando censos y nominas CCU. Avisa si local necesita revision de cumplimiento.")
+    st.markdown("*Se usa como fuente de verdad los totale sultimo censo registrado antes del periodo de la nomina.")
 
-# bar plot
-tab1, tab2 = st.tabs(["Shoperas", "Salidas"])
+    # bar plot (tabs switch in the browser, without a rerun)
+    tab1, tab2 = st.tabs(["Shoperas", "Salidas"])
 
-with tab1:
-    schoperas_chart = alt.Chart(local_stats_df).mark_bar().encode(
-    x='periodo',
-    y='schoperas_totales',
-    tooltip=['periodo', 'schoperas_totales']
-)
-    st.altair_chart(schoperas_chart, use_container_width=True)
+    with tab1:
+        st.vega_lite_chart(local_stats_df, SCHOPERAS_CHART, use_container_width=True)
 
-with tab2:
-    salidas_chart = alt.Chart(local_stats_df).mark_bar().encode(
-    x='periodo',
-    y='salidas_totales',
-    tooltip=['periodo', 'salidas_totales']
-)
-    st.altair_chart(salidas_chart, use_container_width=True)
+    with tab2:
+        st.vega_lite_chart(local_stats_df, SALIDAS_CHART, use_container_width=True)
 
-st.dataframe(local_stats_df[['periodo', 'schoperas_totales', 'salidas_totales']])
+    st.dataframe(local_stats_df[['periodo', 'schoperas_totales', 'salidas_totales']])
 
 
 # -----------------------------------------------------------------------------
 # CENSOS
 # -----------------------------------------------------------------------------
 
-st.subheader("Censos")
-st.markdown("Información detallada de censos por periodo: clasificación de cumplimiento, totales de infraestructura y marcas detectadas.")
-
-censos_filtered = censos_df[censos_df['local_id'] == selected_local_id]
-display_columns = ['periodo', 'clasificacion', 'schoperas_total', 'salidas_total', 'salidas_otras', 'marcas', 'accion']
-censos_filtered = censos_filtered[display_columns].sort_values('periodo', ascending=False)
-
-st.dataframe(
-    censos_filtered,
-    column_config={
-        "schoperas_total": st.column_config.Column("Schoperas", help="Total de schoperas instaladas"),
-        "salidas_total": st.column_config.Column("Salidas", help="Total de salidas instaladas"),
-        "salidas_otras": st.column_config.Column("Salidas Otras", help="Total de salidas instaladas de otras marcas"),
-        "clasificacion": st.column_config.MultiselectColumn(
-            "Clasificación",
-            help="Estado de cumplimiento del local",
-            options=list(CLASIFICACION_COLORS.keys()),
-            color=list(CLASIFICACION_COLORS.values()),
-        ),
-        "marcas": st.column_config.MultiselectColumn(
-            "Marcas Ofrecidas",
-            help="Marcas detectadas en el censo",
-            options=[
-                "ABInBev",
-                "Kross",
-                "Otros",
-            ],
-            color=["#0C7779", "#803df5", "#00c0f2"],
-        ),
-    },
-    hide_index=True,
-)
+def render_censos(local_censos):
+    st.subheader("Censos")
+    st.markdown("Información detallada de censos por periodo: clasificación de cumplimiento, totales de infraestructura y marcas detectadas.")
+
+    display_columns = ['periodo', 'clasificacion', 'schoperas_total', 'salidas_total', 'salidas_otras', 'marcas', 'accion']
+    censos_filtered = local_censos[display_columns].sort_values('periodo', ascending=False)
+
+    st.dataframe(
+        censos_filtered,
+        column_config={
+            "schoperas_total": st.column_config.Column("Schoperas", help="Total de schoperas instaladas"),
+            "salidas_total": st.column_config.Column("Salidas", help="Total de salidas instaladas"),
+            "salidas_otras": st.column_config.Column("Salidas Otras", help="Total de salidas instaladas de otras marcas"),
+            "clasificacion": st.column_config.MultiselectColumn(
+                "Clasificación",
+                help="Estado de cumplimiento del local",
+                options=list(CLASIFICACION_COLORS.keys()),
+                color=list(CLASIFICACION_COLORS.values()),
+            ),
+            "marcas": st.column_config.MultiselectColumn(
+                "Marcas Ofrecidas",
+                help="Marcas detectadas en el censo",
+                options=[
+                    "ABInBev",
+                    "Kross",
+                    "Otros",
+                ],
+                color=["#0C7779", "#803df5", "#00c0f2"],
+            ),
+        },
+        hide_index=True,
+    )
 
 
 # -----------------------------------------------------------------------------
 # CONTRATOS
 # -----------------------------------------------------------------------------
 
-st.subheader("Contrato")
-local_contrato = contratos_df[contratos_df['local_id'] == selected_local_id]
-if not local_contrato.empty:
-    contrato_info = local_contrato.iloc[0]
-    
-    # Check if reported inactive by CCU
-    if contrato_info.get('reportado_inactivo_ccu'):
-        st.error(f"🚫 **Contrato finalizado según nominas CCU**")
-        if pd.notna(contrato_info.get('motivo_termino')):
-            st.markdown(f"**Motivo término:** {contrato_info['motivo_termino']}")
-        if pd.notna(contrato_info.get('periodo_termino')):
-            st.caption(f"Informado en periodo: {contrato_info['periodo_termino']}")
-        st.divider()
-
-    # Check if upcoming expiration
-    if contrato_info['proximo_a_vencer']:
-        st.badge(
-            icon="⚠️", 
-            label=f"Contrato próximo a vencer ({contrato_info['dias_restantes']} días)"
-        )
-
-contrato_columns = ['fecha_inicio', 'fecha_fin', 'vigente']
-st.dataframe(local_contrato[contrato_columns], column_config={
-        "fecha_inicio": st.column_config.DateColumn(
-            "Fecha Inicio",
-            help="Fecha de inicio del contrato"
-        ),
-        "fecha_fin": st.column_config.DateColumn(
-            "Fecha Fin",
-            help="Fecha de fin del contrato"    
-        )
-    }
-)
+def render_contrato(local_contratos):
+    st.subheader("Contrato")
+    # dias_restantes / proximo_a_vencer are computed against today's date at query time
+    local_contrato = add_vencimiento(local_contratos)
+    if not local_contrato.empty:
+        contrato_info = local_contrato.iloc[0]
+
+        # Check if reported inactive by CCU
+        if contrato_info.get('reportado_inactivo_ccu'):
+            st.error(f"🚫 **Contrato finalizado según nominas CCU**")
+            if pd.notna(contrato_info.get('motivo_termino')):
+                st.markdown(f"**Motivo término:** {contrato_info['motivo_termino']}")
+            if pd.notna(contrato_info.get('periodo_termino')):
+                st.caption(f"Informado en periodo: {contrato_info['periodo_termino']}")
+            st.divider()
+
+        # Check if upcoming expiration
+        if contrato_info['proximo_a_vencer']:
+            st.badge(
+                icon="⚠️", 
+                label=f"Contrato próximo a vencer ({contrato_info['dias_restantes']} días)"
+            )
+
+    contrato_columns = ['fecha_inicio', 'fecha_fin', 'vigente']
+    st.dataframe(local_contrato[contrato_columns], column_config={
+            "fecha_inicio": st.column_config.DateColumn(
+                "Fecha Inicio",
+                help="Fecha de inicio del contrato"
+            ),
+            "fecha_fin": st.column_config.DateColumn(
+                "Fecha Fin",
+                help="Fecha de fin del contrato"    
+            )
+        }
+    )
+
+
+# -----------------------------------------------------------------------------
+# PAGE
+# -----------------------------------------------------------------------------
+
+st.title("Locales")
+st.markdown("Informacion de censos y nominas de cada local por periodo")
+
+
+@st.fragment
+def venue_view():
+    """Search, selector and venue sections; a venue change reruns only this fragment."""
+    # Search venues by razon_social, nombre_fantasia, direccion, RUT or ID.
+    # Only the top matches are sent to the browser and the selector returns ids.
+    search_index = store.search_index
+    query = st.text_input("Buscar local", placeholder="Razón social, nombre de fantasía, dirección, RUT o ID")
+    matching_ids = search_index.search(query, k=20)
+    if not matching_ids:
+        st.info("No se encontraron locales para la búsqueda.")
+        return
+
+    selected_local_id = st.selectbox("Seleccionar Local", matching_ids, format_func=search_index.label)
+    local_info = store.locales.iloc[search_index.position(selected_local_id)]
+    local_stats_df, local_censos, local_contratos = get_venue_frames(store, store.version, selected_local_id)
+
+    render_ficha(local_info, local_censos, selected_local_id)
+    render_activos(local_stats_df)
+    render_censos(local_censos)
+    render_contrato(local_contratos)
+
 
+venue_view()
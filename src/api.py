@@ -0,0 +1,320 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+# =============================================================================
+# SECTION: READ-ONLY JSON API
+# =============================================================================
+# Serves the prepared frames of the shared DataStore (the same cached store or
+# published snapshot the Streamlit app reads) to other internal tools:
+#   GET /health
+#   GET /locales | /censos | /activos | /contratos   ?col=value&page=&page_size=
+#       /contratos also takes ?vigente_en=YYYY-MM-DD or ?vigente_periodo=YYYY-Qn
+#   GET /locales/<local_id>                          venue sheet with all its rows
+#   GET /agregados/<censos|activos|contratos>        ?by=dim,dim&dim=value
+# Every response carries an ETag derived from the data version (and the day,
+# since contract expiry depends on it) plus the request, so a client polling
+# with If-None-Match gets a body-less 304 until the data changes. Bodies are
+# gzip-compressed when the client accepts it.
+# Usage: python -m src.api [--port 8502]   |   python -m src.api --check
+
+TABLES = ("locales", "censos", "activos", "contratos")
+CUBES = {
+    "censos": "censos_cube",
+    "activos": "activos_cube",
+    "contratos": "contratos_cube",
+}
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+GZIP_MIN_BYTES = 1024
+RESPONSE_CACHE_SIZE = 256
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def current_store():
+    from src.data_store import get_data_store
+    return get_data_store()
+
+
+def _to_records(df):
+    """Rows as JSON-ready dicts (ISO dates, None for missing values)."""
+    return json.loads(df.to_json(orient="records", date_format="iso", force_ascii=False))
+
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _filter(df, filters):
+    """Rows whose column text equals any of the requested values (?col=a&col=b or ?col=a,b)."""
+    for column, values in filters.items():
+        if column not in df.columns:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown filter column: {column}")
+        df = df[df[column].astype(str).isin(values)]
+    return df
+
+
+def _parse_query(query):
+    params = {key: [v for value in values for v in value.split(",")] for key, values in parse_qs(query).items()}
+    try:
+        page = int(params.pop("page", ["1"])[0])
+        page_size = min(int(params.pop("page_size", [str(PAGE_SIZE)])[0]), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "page and page_size must be integers")
+    if page < 1 or page_size < 1:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "page and page_size must be positive")
+    return params, page, page_size
+
+
+def _table(store, name, params):
+    if name == "contratos":
+        from src.data_preparation import add_vencimiento
+        contratos = store.contratos
+        # Active-on queries go through the interval index instead of scanning the dates
+        try:
+            if "vigente_en" in params:
+                contratos = store.contratos_index.vigentes_en(params.pop("vigente_en")[0])
+            elif "vigente_periodo" in params:
+                contratos = store.contratos_index.vigentes_en_periodo(params.pop("vigente_periodo")[0])
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "vigente_en must be a date and vigente_periodo a quarter (2025-Q3)")
+        return add_vencimiento(contratos)
+    return getattr(store, name)
+
+
+def _local_id(store, raw):
+    """Matches the path segment against the dtype of locales.id."""
+    ids = store.locales["id"]
+    for candidate in (raw, int(raw) if raw.lstrip("-").isdigit() else None):
+        if candidate is not None and (ids == candidate).any():
+            return candidate
+    raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown local_id: {raw}")
+
+
+def render(store, path, query):
+    """JSON body (str) for a request path and query string."""
+    parts = [p for p in path.split("/") if p]
+    params, page, page_size = _parse_query(query)
+    meta = {"version": store.version}
+
+    if len(parts) == 1 and parts[0] in TABLES:
+        df = _filter(_table(store, parts[0], params), params)
+        total = len(df)
+        rows = df.iloc[(page - 1) * page_size: page * page_size]
+        meta.update(page=page, page_size=page_size, total=total, pages=-(-total // page_size))
+        return _dumps({**meta, "data": _to_records(rows)})
+
+    if len(parts) == 2 and parts[0] == "locales":
+        local_id = _local_id(store, parts[1])
+        local = store.locales[store.locales["id"] == local_id].iloc[:1]
+        from src.data_preparation import add_vencimiento
+        return _dumps({
+            **meta,
+            "local": _to_records(local)[0],
+            "censos": _to_records(store.venue_frame("censos", local_id)),
+            "activos": _to_records(store.venue_frame("activos", local_id)),
+            "contratos": _to_records(add_vencimiento(store.venue_frame("contratos", local_id))),
+        })
+
+    if len(parts) == 2 and parts[0] == "agregados" and parts[1] in CUBES:
+        cube = getattr(store, CUBES[parts[1]])
+        by = [dim for dim in params.pop("by", []) if dim]
+        unknown = [dim for dim in by + list(params) if dim not in cube.dims]
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown dimensions: {', '.join(unknown)} (valid: {', '.join(cube.dims)})")
+        # Query values are text: match them against the members of each dimension
+        filters = {dim: [m for m in cube.members(dim) if str(m) in values] for dim, values in params.items()}
+        filters = {dim: members or ["__none__"] for dim, members in filters.items()}
+        result = cube.rollup(by, **filters)
+        data = _to_records(result) if by else json.loads(result.to_json())
+        meta.update(dims=cube.dims, measures=cube.measures, by=by)
+        return _dumps({**meta, "data": data})
+
+    raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+
+
+def make_etag(version, path, query):
+    """Strong ETag: data version + day (contract expiry) + normalized request."""
+    params = sorted(parse_qs(query).items())
+    digest = hashlib.sha1(f"{path}?{params}".encode()).hexdigest()[:10]
+    return f'"{version}-{date.today():%Y%m%d}-{digest}"'
+
+
+_responses = OrderedDict()
+_responses_lock = threading.Lock()
+
+
+def cached_response(store, etag, path, query):
+    """
+    (identity body, gzip body) per ETag, rendered from the same store the
+    ETag was computed from. Keeps the RESPONSE_CACHE_SIZE most recent bodies
+    (only bytes: an old store is not kept alive by the cache).
+    """
+    with _responses_lock:
+        if etag in _responses:
+            _responses.move_to_end(etag)
+            return _responses[etag]
+    body = render(store, path, query).encode()
+    compressed = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+    with _responses_lock:
+        _responses[etag] = (body, compressed)
+        while len(_responses) > RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+    return body, compressed
+
+
+# =============================================================================
+# SECTION: HTTP SERVER
+# =============================================================================
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for pollers
+    server_version = "ccu-api"
+    quiet = True
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        body = json.dumps({"error": message}).encode()
+        self._send(status, body, {"Content-Type": "application/json; charset=utf-8"})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            store = current_store()
+            if url.path.rstrip("/") == "/health":
+                body = json.dumps({"status": "ok", "version": store.version}).encode()
+                return self._send(HTTPStatus.OK, body, {"Content-Type": "application/json", "Cache-Control": "no-store"})
+
+            etag = make_etag(store.version, url.path.rstrip("/"), url.query)
+            headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+            if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+                return self._send(HTTPStatus.NOT_MODIFIED, headers=headers)
+
+            body, compressed = cached_response(store, etag, url.path.rstrip("/"), url.query)
+            headers["Content-Type"] = "application/json; charset=utf-8"
+            if compressed is not None and "gzip" in self.headers.get("Accept-Encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+                body = compressed
+            self._send(HTTPStatus.OK, body, headers)
+        except ApiError as e:
+            self._send_error(e.status, str(e))
+        except Exception as e:
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host, port, quiet=True):
+    """Builds the store and its derived structures (cubes, venue rows) before binding."""
+    from src.warmup import warm_up
+
+    ApiHandler.quiet = quiet
+    store, _ = warm_up()
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    print(f"Serving data version {store.version} on http://{host}:{server.server_port}", flush=True)
+    return server
+
+
+# =============================================================================
+# SECTION: CHECK
+# =============================================================================
+
+def check():
+    """Starts the API on a free localhost port (synthetic data) and exercises it."""
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+    server = serve("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def get(path, **headers):
+        try:
+            with urlopen(Request(base + path, headers=headers)) as response:
+                return response.status, dict(response.headers), response.read()
+        except HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+
+    status, headers, body = get("/censos?periodo=2025&page_size=50", **{"Accept-Encoding": "gzip"})
+    assert status == 200 and headers["Content-Encoding"] == "gzip", (status, headers)
+    page = json.loads(gzip.decompress(body))
+    assert len(page["data"]) == 50 and page["total"] > 50 and all(r["periodo"] == "2025" for r in page["data"])
+    print(f"/censos?periodo=2025: {page['total']} rows, {page['pages']} pages, gzip {len(body)} bytes")
+
+    start = time.perf_counter()
+    status, _, body = get("/censos?periodo=2025&page_size=50", **{"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b"", status
+    print(f"If-None-Match: 304 in {1000 * (time.perf_counter() - start):.1f} ms")
+
+    status, _, body = get("/censos?periodo=2025&page_size=50&page=2")
+    assert status == 200 and json.loads(body)["page"] == 2
+
+    local_id = page["data"][0]["local_id"]
+    status, _, body = get(f"/locales/{local_id}")
+    venue = json.loads(body)
+    assert status == 200 and venue["local"]["id"] == local_id and venue["censos"], status
+    print(f"/locales/{local_id}: {len(venue['censos'])} censos, {len(venue['contratos'])} contratos")
+
+    status, _, body = get("/agregados/censos?by=periodo,clasificacion")
+    assert status == 200 and json.loads(body)["data"]
+    status, _, body = get("/agregados/censos?by=nope")
+    assert status == 400, status
+    status, _, _ = get("/locales/no-existe")
+    assert status == 404, status
+
+    server.shutdown()
+    print("OK: pagination, gzip, ETag / 304 and errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the prepared data.")
+    parser.add_argument("--host", default=None, help="Bind address (default: $CCU_API_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None, help="Port (default: $CCU_API_PORT or 8502)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--check", action="store_true", help="Exercise the API on localhost with synthetic data and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        # Must be set before utils.config is imported
+        os.environ["CCU_DATA_SOURCE"] = "synthetic"
+        check()
+        return
+
+    from utils.config import API_HOST, API_PORT
+    server = serve(args.host or API_HOST, args.port or API_PORT, quiet=not args.verbose)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
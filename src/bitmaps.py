@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# SECTION: BITSETS
+# =============================================================================
+
+# Same labels as build_marcas_list
+MARCAS = {
+    "ABInBev": "marcas_abenv",
+    "Kross": "marcas_kross",
+    "Otros": "marcas_otras",
+}
+
+
+class Bitset:
+    """Set of venue positions packed in uint64 words; supports &, |, - and ~."""
+
+    __slots__ = ("index", "words")
+
+    def __init__(self, index, words):
+        self.index = index
+        self.words = words
+
+    def _check(self, other):
+        if other.index is not self.index:
+            raise ValueError("Bitsets of different indexes cannot be combined")
+
+    def __and__(self, other):
+        self._check(other)
+        return Bitset(self.index, self.words & other.words)
+
+    def __or__(self, other):
+        self._check(other)
+        return Bitset(self.index, self.words | other.words)
+
+    def __sub__(self, other):
+        self._check(other)
+        return Bitset(self.index, self.words & ~other.words)
+
+    def __invert__(self):
+        # Complement within the universe of censused venues (padding bits stay off)
+        return Bitset(self.index, ~self.words & self.index._universe)
+
+    def __len__(self):
+        return int(np.unpackbits(self.words.view(np.uint8)).sum())
+
+    def positions(self):
+        bits = np.unpackbits(self.words.view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits)
+
+    def ids(self):
+        """Venue ids (local_id) of the set, in index order."""
+        return self.index.local_ids[self.positions()].tolist()
+
+
+class CensosBitmapIndex:
+    """
+    Bitsets per (marca, periodo), (clasificacion, periodo) and periodo over
+    the venues in censos, built once per data version.
+
+    A venue bit is on when any of its census rows of the periodo matches.
+    Queries combine bitsets with set algebra, e.g. venues with Kross but no
+    ABInBev in 2025 that are 'No en regla':
+
+        idx.marca("Kross", "2025") - idx.marca("ABInBev", "2025") & idx.clasificacion("No en regla", "2025")
+    """
+
+    def __init__(self, censos_df):
+        codes, self.local_ids = pd.factorize(censos_df['local_id'], sort=True)
+        self.local_ids = np.asarray(self.local_ids)
+        self.n = len(self.local_ids)
+        self._n_words = (self.n + 63) // 64
+        self._universe = self._pack(np.arange(self.n))
+
+        valid = codes >= 0
+        codes = codes[valid]
+        periodos = censos_df['periodo'].astype(str).to_numpy()[valid]
+        clasificaciones = censos_df['clasificacion'].astype(str).to_numpy()[valid]
+
+        self._bitsets = {}
+        for periodo in np.unique(periodos):
+            in_periodo = periodos == periodo
+            self._bitsets[("periodo", periodo)] = self._pack(codes[in_periodo])
+            for marca, column in MARCAS.items():
+                if column in censos_df.columns:
+                    has_marca = censos_df[column].fillna(False).to_numpy(dtype=bool)[valid]
+                    self._bitsets[("marca", marca, periodo)] = self._pack(codes[in_periodo & has_marca])
+            for clasificacion in np.unique(clasificaciones[in_periodo]):
+                rows = in_periodo & (clasificaciones == clasificacion)
+                self._bitsets[("clasificacion", clasificacion, periodo)] = self._pack(codes[rows])
+
+    def _pack(self, positions):
+        bits = np.zeros(self._n_words * 64, dtype=np.uint8)
+        bits[positions] = 1
+        return np.packbits(bits, bitorder="little").view(np.uint64)
+
+    def _get(self, key):
+        words = self._bitsets.get(key)
+        if words is None:
+            words = np.zeros(self._n_words, dtype=np.uint64)
+        return Bitset(self, words)
+
+    def censados(self, periodo):
+        """Venues with at least one census row in periodo."""
+        return self._get(("periodo", str(periodo)))
+
+    def marca(self, marca, periodo):
+        """Venues offering marca ('ABInBev', 'Kross', 'Otros') in periodo."""
+        return self._get(("marca", marca, str(periodo)))
+
+    def clasificacion(self, clasificacion, periodo):
+        """Venues with a census row of that clasificacion in periodo."""
+        return self._get(("clasificacion", clasificacion, str(periodo)))
+
+    def todos(self):
+        """Every venue of the index."""
+        return Bitset(self, self._universe.copy())
+
+    def nbytes(self):
+        return sum(words.nbytes for words in self._bitsets.values())
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from utils.config import SALIDAS_MINIMAS, SALIDAS_RATIO
+
+
+# =============================================================================
+# SECTION: COMPLIANCE GAP
+# =============================================================================
+
+def compliance_gap(censos_df):
+    """
+    Per census row gap: salidas_target - salidas_otras.
+
+    Positive values are the missing taps of other brands, zero or negative
+    values mean the venue complies. NaN when the rule does not apply.
+    """
+    return censos_df['salidas_target'] - censos_df['salidas_otras']
+
+
+def brecha_promedio(censos_df):
+    """Average gap over the census rows classified 'No en regla' (NaN if none)."""
+    gap = compliance_gap(censos_df)
+    return gap[censos_df['clasificacion'] == "No en regla"].mean()
+
+
+# =============================================================================
+# SECTION: WHAT-IF SIMULATION
+# =============================================================================
+
+def simulate_rules(censos_df, umbrales=(SALIDAS_MINIMAS,), ratios=(SALIDAS_RATIO,)):
+    """
+    Evaluates every (umbral, ratio) rule over the census in one batched NumPy pass.
+
+    A rule applies when salidas_total > umbral and requires
+    salidas_otras >= floor(salidas_total / ratio). Returns one row per
+    (umbral, ratio, periodo) with aplica / en_regla / no_en_regla / no_aplica
+    counts and the total and average gap of the venues not complying.
+    """
+    umbrales = np.asarray(umbrales, dtype=float)
+    ratios = np.asarray(ratios, dtype=float)
+
+    # Tap counts are small integers: collapse the census into distinct
+    # (periodo, salidas_total, salidas_otras) combinations with a weight, so
+    # the cost of each scenario no longer depends on the number of rows.
+    combos = (
+        pd.DataFrame({
+            'periodo': censos_df['periodo'].astype(str).to_numpy(),
+            'total': pd.to_numeric(censos_df['salidas_total'], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+            'otras': pd.to_numeric(censos_df['salidas_otras'], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+        })
+        .value_counts(dropna=False)
+        .reset_index(name='peso')
+    )
+    total = combos['total'].to_numpy()
+    otras = combos['otras'].to_numpy()
+    periodo_codes, periodos = pd.factorize(combos['periodo'], sort=True)
+
+    # Weighted one-hot periodo matrix (combos x p): per-periodo sums become a matrix product
+    one_hot = np.zeros((len(combos), len(periodos)))
+    one_hot[np.arange(len(combos)), periodo_codes] = combos['peso'].to_numpy()
+
+    # Broadcast: applies (u, 1, c), target and complies (1, r, c)
+    with np.errstate(invalid='ignore'):
+        applies = total[None, None, :] > umbrales[:, None, None]
+        target = np.floor(total[None, None, :] / ratios[None, :, None])
+        complies = otras[None, None, :] >= target
+    no_cumple = applies & ~complies
+    gap = np.where(no_cumple, target - otras[None, None, :], 0)
+
+    n_scenarios = len(umbrales) * len(ratios)
+    applies_all = np.broadcast_to(applies, (len(umbrales), len(ratios), len(total))).reshape(n_scenarios, -1)
+    aplica = applies_all @ one_hot
+    en_regla = (applies & complies).reshape(n_scenarios, -1) @ one_hot
+    no_en_regla = no_cumple.reshape(n_scenarios, -1) @ one_hot
+    brecha_total = np.nan_to_num(gap.reshape(n_scenarios, -1)) @ one_hot
+    registros = one_hot.sum(axis=0)
+
+    umbral_col, ratio_col = np.meshgrid(umbrales, ratios, indexing='ij')
+    result = pd.DataFrame({
+        'umbral': np.repeat(umbral_col.ravel(), len(periodos)),
+        'ratio': np.repeat(ratio_col.ravel(), len(periodos)),
+        'periodo': np.tile(np.asarray(periodos), n_scenarios),
+        'aplica': aplica.ravel().round().astype(int),
+        'en_regla': en_regla.ravel().round().astype(int),
+        'no_en_regla': no_en_regla.ravel().round().astype(int),
+        'no_aplica': (registros[None, :] - aplica).ravel().round().astype(int),
+        'brecha_total': brecha_total.ravel(),
+    })
+    result['brecha_promedio'] = result['brecha_total'] / result['no_en_regla'].where(result['no_en_regla'] > 0)
+    return result
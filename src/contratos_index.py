@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from src.data_preparation import add_vencimiento
+
+
+# =============================================================================
+# SECTION: CONTRATOS INTERVAL INDEX
+# =============================================================================
+
+def _as_datetime64(series):
+    """Returns a datetime64[ns] NumPy array (NaT for missing) for any date column."""
+    return pd.to_datetime(series).astype("datetime64[ns]").to_numpy()
+
+
+class ContratosIndex:
+    """
+    Interval index over [fecha_inicio, fecha_fin] of every contract.
+
+    Built once per data version. Point queries use the interval tree behind
+    pd.IntervalIndex; range and expiry queries use arrays sorted by start and
+    end date, so no query rescans the full contratos frame.
+    """
+
+    def __init__(self, contratos_df):
+        self.contratos = contratos_df
+        inicio = _as_datetime64(contratos_df['fecha_inicio'])
+        fin = _as_datetime64(contratos_df['fecha_fin'])
+
+        # Contracts without both dates, or ending before they start (a data
+        # entry error), cannot be placed on the timeline; they are kept in
+        # self.invalidos for validations.
+        valid = ~(np.isnat(inicio) | np.isnat(fin))
+        valid[valid] = inicio[valid] <= fin[valid]
+        self.invalidos = contratos_df.iloc[np.flatnonzero(~valid)]
+        self._positions = np.flatnonzero(valid)
+        self.intervals = pd.IntervalIndex.from_arrays(inicio[valid], fin[valid], closed='both')
+
+        # Sorted views for range and expiry-window queries
+        self._by_inicio = np.argsort(inicio[valid], kind='stable')
+        self._inicio_sorted = inicio[valid][self._by_inicio]
+        self._fin_valid = fin[valid]
+        self._by_fin = np.argsort(fin, kind='stable')
+        self._fin_sorted = fin[self._by_fin]
+
+        # Row positions per venue for local_id-scoped queries
+        self._by_local = {
+            local_id: np.asarray(rows)
+            for local_id, rows in contratos_df.groupby('local_id', sort=False).indices.items()
+        }
+
+    def _rows(self, positions, local_id=None):
+        """Returns the contratos rows at positions, optionally restricted to one venue."""
+        positions = np.sort(positions)
+        if local_id is not None:
+            positions = np.intersect1d(positions, self._by_local.get(local_id, []), assume_unique=True)
+        return self.contratos.iloc[positions]
+
+    def vigentes_en(self, fecha, local_id=None):
+        """Contracts whose [fecha_inicio, fecha_fin] contains fecha."""
+        matches, _ = self.intervals.get_indexer_non_unique(pd.DatetimeIndex([pd.Timestamp(fecha)]).as_unit('ns'))
+        return self._rows(self._positions[matches[matches >= 0]], local_id)
+
+    def vigentes_entre(self, inicio, fin, local_id=None):
+        """Contracts active at any moment of [inicio, fin] (e.g. a quarter)."""
+        inicio = np.datetime64(pd.Timestamp(inicio), 'ns')
+        fin = np.datetime64(pd.Timestamp(fin), 'ns')
+        # Candidates started on or before the window end; keep those ending after its start.
+        started = self._by_inicio[:np.searchsorted(self._inicio_sorted, fin, side='right')]
+        overlapping = started[self._fin_valid[started] >= inicio]
+        return self._rows(self._positions[overlapping], local_id)
+
+    def vigentes_en_periodo(self, periodo, local_id=None):
+        """Contracts active during a quarter such as '2025-Q3'."""
+        quarter = pd.Period(periodo, freq='Q')
+        return self.vigentes_entre(quarter.start_time, quarter.end_time, local_id)
+
+    def por_vencer(self, reference_date=None, dias_aviso=30, local_id=None):
+        """Contracts expiring within dias_aviso days of reference_date, with expiry columns."""
+        if reference_date is None:
+            reference_date = pd.Timestamp.today()
+        desde = pd.Timestamp(reference_date).normalize()
+        hasta = desde + pd.Timedelta(days=dias_aviso)
+        lo = np.searchsorted(self._fin_sorted, np.datetime64(desde, 'ns'), side='left')
+        hi = np.searchsorted(self._fin_sorted, np.datetime64(hasta, 'ns'), side='right')
+        return add_vencimiento(self._rows(self._by_fin[lo:hi], local_id), desde, dias_aviso)
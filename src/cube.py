@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from src.compliance import compliance_gap
+
+
+# =============================================================================
+# SECTION: OLAP CUBES
+# =============================================================================
+# Pre-aggregated counts and sums per combination of dimensions, built once per
+# data version. Dashboard filters and KPI tiles roll up these small tables
+# instead of scanning censos/activos rows on every rerun.
+
+def salidas_tramo(salidas):
+    """Labels tap counts as '≤ 3 salidas' / '≥ 4 salidas' (None when missing)."""
+    salidas = pd.to_numeric(salidas, errors='coerce')
+    # NumPy masks: snapshot frames hold nullable Arrow columns (pd.NA, not NaN)
+    missing = salidas.isna().to_numpy(bool)
+    hasta_3 = salidas.le(3).fillna(False).to_numpy(bool)
+    return pd.Series(
+        np.where(missing, None, np.where(hasta_3, "≤ 3 salidas", "≥ 4 salidas")),
+        index=salidas.index,
+    )
+
+
+class Cube:
+    """Aggregated fact table: one row per combination of dims with summed measures."""
+
+    def __init__(self, facts, dims, measures):
+        self.dims = list(dims)
+        self.measures = ['registros'] + list(measures)
+        facts = facts[self.dims + list(measures)].assign(registros=1)
+        for dim in self.dims:
+            facts[dim] = facts[dim].astype('category')
+        self.frame = (
+            facts.groupby(self.dims, dropna=False, observed=True)[self.measures]
+            .sum()
+            .reset_index()
+        )
+
+    def members(self, dim):
+        """Sorted distinct values of a dimension (for filter widgets)."""
+        return sorted(v for v in self.frame[dim].unique() if pd.notna(v))
+
+    def filter(self, **filters):
+        """Cube rows matching filters; a filter value may be a scalar or a list (empty = all)."""
+        mask = np.ones(len(self.frame), dtype=bool)
+        for dim, values in filters.items():
+            if values is None:
+                continue
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            if len(values) == 0:
+                continue
+            mask &= self.frame[dim].isin(values).to_numpy()
+        return self.frame[mask]
+
+    def rollup(self, by=(), **filters):
+        """Sums the measures grouped by the dims in `by` (a Series of totals when `by` is empty)."""
+        rows = self.filter(**filters)
+        if not by:
+            return rows[self.measures].sum()
+        return rows.groupby(list(by), observed=True)[self.measures].sum().reset_index()
+
+
+def build_censos_cube(censos_df, contratos_df):
+    """
+    Cube over census rows by periodo, region, ciudad, agencia, clasificacion,
+    salidas_tramo and vigente (the venue has a vigente contract).
+
+    Measures: registros, salidas_total, salidas_otras, salidas_target and
+    brecha (missing taps of the rows 'No en regla').
+    """
+    vigentes = contratos_df.loc[contratos_df['vigente'] == True, 'local_id'].unique()
+    gap = compliance_gap(censos_df)
+    facts = censos_df.assign(
+        salidas_tramo=salidas_tramo(censos_df['salidas_total']),
+        vigente=censos_df['local_id'].isin(vigentes),
+        brecha=gap.where(censos_df['clasificacion'] == "No en regla", 0).fillna(0),
+    )
+    return Cube(
+        facts,
+        dims=['periodo', 'region', 'ciudad', 'agencia', 'clasificacion', 'salidas_tramo', 'vigente'],
+        measures=['salidas_total', 'salidas_otras', 'salidas_target', 'brecha'],
+    )
+
+
+def build_activos_cube(activos_df):
+    """Cube over activos rows by quarter, region, ciudad, estado and salidas_tramo."""
+    facts = activos_df.assign(salidas_tramo=salidas_tramo(activos_df['salidas_totales']))
+    return Cube(
+        facts,
+        dims=['periodo', 'region', 'ciudad', 'estado', 'salidas_tramo'],
+        measures=['salidas_totales', 'schoperas_totales'],
+    )
+
+
+def build_contratos_cube(contratos_df, locales_df):
+    """Cube over contracts by region, ciudad and vigente."""
+    facts = pd.merge(
+        contratos_df[['local_id', 'vigente']],
+        locales_df[['id', 'region', 'ciudad']],
+        left_on='local_id',
+        right_on='id',
+        how='left',
+    )
+    return Cube(facts, dims=['region', 'ciudad', 'vigente'], measures=[])
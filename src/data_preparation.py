@@ -1,49 +1,122 @@
+import logging
+
 import pandas as pd
 import numpy as np
-import math
 import streamlit as st
 from streamlit_gsheets import GSheetsConnection
-from utils.config import TTL_VALUE
+from utils.config import (DATA_SOURCE, SALIDAS_MINIMAS, SALIDAS_RATIO, SAMPLE_LOCALES, SOURCE_VERSION,
+                          SYNTHETIC_LOCALES, TTL_VALUE, VERSIONS_DIR)
 
 
 # =============================================================================
 # SECTION: DATA LOADING
 # =============================================================================
 
+logger = logging.getLogger(__name__)
+
+# Worksheet of each source frame, in the order returned by the loaders
+WORKSHEETS = {"locales": "locales", "censos": "censos", "nominas": "nominas", "contratos": "contratos"}
+
+
+@st.cache_data(ttl=TTL_VALUE)
+def load_data_gsheets(connection="gsheets", worksheets=None):
+    """Return DataFrames for given worksheet names.
+
+    connection: name of the [connections.<name>] entry in secrets.toml.
+    worksheets: overrides of WORKSHEETS for spreadsheets with other tab names.
+    """
+    conn = st.connection(connection, type=GSheetsConnection, ttl=TTL_VALUE)
+    names = {**WORKSHEETS, **(worksheets or {})}
+
+    return tuple(conn.read(worksheet=names[frame]) for frame in WORKSHEETS)
+
+
 @st.cache_data
-def load_data_gsheets():
-    """Return DataFrames for given worksheet names."""
-    
-    conn = st.connection("gsheets", type=GSheetsConnection, ttl=TTL_VALUE)
-    worksheets = ["locales", "censos", "nominas", "contratos"]
+def load_data_synthetic(n_locales=SYNTHETIC_LOCALES):
+    """Synthetic DataFrames shaped like the worksheets (CCU_DATA_SOURCE=synthetic)."""
+    from src.synthetic_data import make_synthetic_sources
+    return make_synthetic_sources(n_locales)
+
+
+@st.cache_data
+def load_data_version(version):
+    """Worksheets as of a recorded version (CCU_SOURCE_VERSION: version id or date)."""
+    from src.versions import read_version
+    return read_version(version, VERSIONS_DIR)
 
-    return tuple(conn.read(worksheet=w) for w in worksheets)
+
+def load_full_source_data():
+    """(locales, censos, nominas, contratos) of the configured source, before sampling.
+
+    CCU_SOURCE_VERSION (with CCU_VERSIONS_DIR) pins the app to a past version.
+    """
+    if VERSIONS_DIR and SOURCE_VERSION:
+        return load_data_version(SOURCE_VERSION)
+    return load_data_synthetic() if DATA_SOURCE == "synthetic" else load_data_gsheets()
+
+
+def load_source_data():
+    """Return (locales, censos, nominas, contratos) from the configured data source.
+
+    CCU_SAMPLE_LOCALES=N keeps only a stratified sample of N venues.
+    """
+    frames = load_full_source_data()
+    if SAMPLE_LOCALES:
+        from data_scripts.sampling import stratified_sample
+        frames = stratified_sample(*frames, size=SAMPLE_LOCALES, umbral=SALIDAS_MINIMAS, ratio=SALIDAS_RATIO)
+    return frames
+
+
+def record_source_version():
+    """Records the source as a delta version in CCU_VERSIONS_DIR (a no-op when nothing changed).
+
+    Called by the snapshot refresher and the warmup thread, never per request.
+    Failures are logged: the app keeps serving without them.
+    """
+    if not VERSIONS_DIR or SOURCE_VERSION:
+        return None
+    try:
+        from src.versions import record_version
+        version, _ = record_version(load_full_source_data(), VERSIONS_DIR)
+        return version
+    except Exception:
+        logger.exception("Could not record the source version in %s", VERSIONS_DIR)
+        return None
+
+
+def clear_source_data():
+    """Drops the cached source DataFrames so the next load reads them again."""
+    load_data_gsheets.clear()
+    load_data_synthetic.clear()
+    load_data_version.clear()
 
 # =============================================================================
 # SECTION: HELPER FUNCTIONS
 # =============================================================================
-def assign_clasificacion(row):
-    """Assigns compliance classification based on rules."""
-    if not row['applies?']:
-        return "No aplica"
+def assign_clasificacion(censos_df):
+    """Assigns compliance classification based on rules (vectorized over the census rows)."""
+    applies = censos_df['applies?'].fillna(False).astype(bool)
+    complies = censos_df['complies?']
     # The original data does not have a direct way to identify "Sin comodato o terminado"
     # We are defaulting to the other classifications for now.
-    if row['complies?'] == True:
-        return "En regla"
-    elif row['complies?'] == False:
-        return "No en regla"
-    return "Sin comodato o terminado"
-
-def build_marcas_list(row):
-    """Builds a list of offered brands based on boolean columns."""
-    categorias = []
-    if row.get("marcas_abenv"):
-        categorias.append("ABInBev")
-    if row.get("marcas_kross"):
-        categorias.append("Kross")
-    if row.get("marcas_otras"):
-        categorias.append("Otros")
-    return categorias
+    return pd.Series(np.select(
+        [~applies, complies.eq(True), complies.eq(False)],
+        ["No aplica", "En regla", "No en regla"],
+        default="Sin comodato o terminado",
+    ), index=censos_df.index)
+
+def build_marcas_list(censos_df):
+    """Builds the list of offered brands per row from the boolean columns."""
+    flags = [
+        (censos_df[column].fillna(False).astype(bool).to_numpy() if column in censos_df else np.zeros(len(censos_df), bool), label)
+        for column, label in (("marcas_abenv", "ABInBev"), ("marcas_kross", "Kross"), ("marcas_otras", "Otros"))
+    ]
+    # Only 8 distinct combinations: build each list once and share it
+    combos = {}
+    codes = flags[0][0] * 1 + flags[1][0] * 2 + flags[2][0] * 4
+    for code in np.unique(codes):
+        combos[code] = [label for bit, (_, label) in enumerate(flags) if code >> bit & 1]
+    return pd.Series([list(combos[code]) for code in codes], index=censos_df.index, dtype=object)
 
 # =============================================================================
 # SECTION: DATA PROCESSING
@@ -52,20 +125,19 @@ def build_marcas_list(row):
 def process_censos(censos_df):
     """Processes censos data to add calculated columns."""
     # applies?: A venue must have more than 3 taps to be considered for compliance.
-    censos_df['applies?'] = censos_df['salidas_total'] > 3
+    # (thresholds live in utils/config.py so src/compliance.py simulates the same rule)
+    censos_df['applies?'] = censos_df['salidas_total'] > SALIDAS_MINIMAS
 
     # salidas_target: The minimum number of non-CCU brand taps required.
     # Formula: floor(salidas_total / 4)
-    censos_df['salidas_target'] = np.nan
-    censos_df.loc[censos_df['applies?'] == True, 'salidas_target'] = censos_df['salidas_total'].apply(lambda x: math.floor(x / 4) if x > 3 else 0)
+    censos_df['salidas_target'] = np.floor(censos_df['salidas_total'] / SALIDAS_RATIO).where(censos_df['applies?'] == True)
 
     # complies?: Checks if the number of other brand taps meets the target.
     # Formula: salidas_otras >= salidas_target
-    censos_df['complies?'] = np.nan
-    censos_df.loc[censos_df['applies?'] == True, 'complies?'] = (censos_df['salidas_otras'] >= censos_df['salidas_target'])
+    censos_df['complies?'] = (censos_df['salidas_otras'] >= censos_df['salidas_target']).where(censos_df['applies?'] == True)
 
     # clasificacion: Categorical variable for compliance classification.
-    censos_df['clasificacion'] = censos_df.apply(assign_clasificacion, axis=1)
+    censos_df['clasificacion'] = assign_clasificacion(censos_df)
 
     # Ensure periodo is a clean string (remove .0 if it became float)
     censos_df['periodo'] = censos_df['periodo'].astype(str).str.replace(".0", "", regex=False)
@@ -92,7 +164,7 @@ def process_censos(censos_df):
 
 
     # build marcas column
-    censos_df['marcas'] = censos_df.apply(build_marcas_list, axis=1)
+    censos_df['marcas'] = build_marcas_list(censos_df)
     
     return censos_df
 
@@ -100,20 +172,34 @@ def process_censos(censos_df):
 def process_contratos(contratos_df):
     """Processes contratos data to add calculated columns."""
     # Ensure date columns are datetime objects
+    contratos_df['fecha_inicio'] = pd.to_datetime(contratos_df['fecha_inicio'])
     contratos_df['fecha_fin'] = pd.to_datetime(contratos_df['fecha_fin'])
-    today = pd.Timestamp.today().normalize()
 
     # vigente: Boolean flag for active contracts.
     # Assuming 'vigente' column in source is 1 for active.
     contratos_df['vigente'] = (contratos_df['vigente'] == 1)
 
-    # dias_restantes: Number of days until contract expiration.
-    contratos_df['dias_restantes'] = (contratos_df['fecha_fin'] - today).dt.days
+    # dias_restantes / proximo_a_vencer depend on the current date, so they are
+    # computed at query time with add_vencimiento instead of being cached here.
+    return contratos_df
 
-    # proximo_a_vencer: True if contract expires within 30 days and is not yet expired.
-    contratos_df['proximo_a_vencer'] = (contratos_df['dias_restantes'] <= 30) & (contratos_df['dias_restantes'] >= 0)
+def add_vencimiento(contratos_df, reference_date=None, dias_aviso=30):
+    """
+    Returns contratos_df with 'dias_restantes' and 'proximo_a_vencer' computed
+    against reference_date (default: today).
+    """
+    if reference_date is None:
+        reference_date = pd.Timestamp.today()
+    reference_date = pd.Timestamp(reference_date).normalize()
 
-    return contratos_df
+    # dias_restantes: Number of days until contract expiration.
+    dias_restantes = (pd.to_datetime(contratos_df['fecha_fin']) - reference_date).dt.days
+
+    return contratos_df.assign(
+        dias_restantes=dias_restantes,
+        # proximo_a_vencer: True if contract expires within dias_aviso days and is not yet expired.
+        proximo_a_vencer=(dias_restantes <= dias_aviso) & (dias_restantes >= 0),
+    )
 
 def contratos_update_from_nominas(contratos_df, nominas_df):
     """
@@ -124,20 +210,20 @@ def contratos_update_from_nominas(contratos_df, nominas_df):
     nominas_df = nominas_df.copy()
     nominas_df['fecha'] = pd.to_datetime(nominas_df['fecha'])
 
-    # Ensure periodo column exists
-    if 'periodo' not in nominas_df.columns:
-        nominas_df['periodo'] = (
-            nominas_df['fecha'].dt.year.astype(str)
-            + "-Q"
-            + nominas_df['fecha'].dt.quarter.astype(str)
-        )
-
     # Get the latest nomination record for each local_id
     latest_nominas = (
         nominas_df.sort_values('fecha', ascending=False)
         .drop_duplicates('local_id')
     )
 
+    # Ensure periodo column exists (only the latest rows need it)
+    if 'periodo' not in latest_nominas.columns:
+        latest_nominas['periodo'] = (
+            latest_nominas['fecha'].dt.year.astype(str)
+            + "-Q"
+            + latest_nominas['fecha'].dt.quarter.astype(str)
+        )
+
     # Merge this latest info into contratos_df
     # We include 'periodo' to capture when the 'termino' occurred
     contratos_df = pd.merge(
@@ -182,68 +268,75 @@ def build_activos_trimestres(censos_df: pd.DataFrame,
     - schoperas_totales
     - salidas_totales
 
-    La lógica es secuencial y cronológica por local.
+    La base de cada nomina es el ultimo censo registrado antes de su fecha
+    (merge_asof por local_id); los deltas de las nominas 'variacion' se acumulan
+    desde ese censo. Todo el calculo es vectorizado sobre todos los locales.
+
+    Las nominas sin fecha no se pueden ubicar en un trimestre y quedan fuera.
+    Un delta faltante deja los totales en NaN hasta el siguiente censo, como
+    el calculo secuencial original (base + NaN = NaN).
     """
 
     # asegurar tipos y orden
-    censos_df = censos_df.copy()
+    censos_df = censos_df[["local_id", "fecha", "schoperas_total", "salidas_total"]].copy()
     nominas_df = nominas_df.copy()
 
     # Convert date columns to datetime objects for proper sorting and manipulation
     censos_df["fecha"] = pd.to_datetime(censos_df["fecha"])
     nominas_df["fecha"] = pd.to_datetime(nominas_df["fecha"])
 
+    # Nominas without fecha have no quarter (and merge_asof rejects null keys)
+    nominas_df = nominas_df.dropna(subset=["fecha"])
+
     # Sort nominas by local_id and date to ensure chronological processing
-    nominas_df = nominas_df.sort_values(["local_id", "fecha"])
-
-    rows = []
-
-    # Iterate over each venue (local_id)
-    for local_id, nom_local in nominas_df.groupby("local_id"):
-        nom_local = nom_local.sort_values("fecha")
-
-        # valores base iniciales desde censo
-        # We assume there is at least one census record per venue
-        censo_local = censos_df.loc[censos_df["local_id"] == local_id].iloc[0]
-
-        prev_schoperas = censo_local["schoperas_total"]
-        prev_salidas = censo_local["salidas_total"]
-
-        # Iterate through the payroll/changes (nominas) for this venue
-        for _, row in nom_local.iterrows():
-            fecha = row["fecha"]
-
-            # If the situation is a variation, we update the totals based on deltas
-            if row["situacion"] == "variacion":
-                schoperas_totales = prev_schoperas + row["delta_schoperas"]
-                salidas_totales = prev_salidas + row["delta_salidas"]
-                estado = "activo"
-                motivo = None
-
-                # actualizar bases para el siguiente trimestre
-                # Update base values for the next quarter/iteration
-                prev_schoperas = schoperas_totales
-                prev_salidas = salidas_totales
-
-            else:
-                schoperas_totales = None
-                salidas_totales = None
-                estado = "inactivo"
-                motivo = row["motivo"]
-
-                # las bases NO cambian si está inactivo
-                # Base values do NOT change if inactive (they persist for when it becomes active again or stay frozen)
-
-            rows.append({
-                "local_id": local_id,
-                "fecha": fecha,
-                "estado": estado,
-                "motivo": motivo,
-                "schoperas_totales": schoperas_totales,
-                "salidas_totales": salidas_totales,
-            })
-
-    activos_trimestrales = pd.DataFrame(rows)
+    nominas_df = nominas_df.sort_values(["local_id", "fecha"], kind="stable").reset_index(drop=True)
+
+    # valores base desde censo: ultimo censo con fecha <= fecha de la nomina
+    censos_df = (
+        censos_df.dropna(subset=["fecha"])
+        .rename(columns={"fecha": "fecha_censo"})
+        .sort_values("fecha_censo", kind="stable")
+    )
+    base = pd.merge_asof(
+        nominas_df[["local_id", "fecha"]].reset_index().sort_values("fecha", kind="stable"),
+        censos_df,
+        left_on="fecha",
+        right_on="fecha_censo",
+        by="local_id",
+        direction="backward",
+    ).set_index("index").sort_index()
+
+    # Nominas older than every census of the venue fall back to its earliest census
+    earliest = censos_df.drop_duplicates("local_id").set_index("local_id")
+    sin_censo_previo = base["fecha_censo"].isna()
+    base_cols = ["fecha_censo", "schoperas_total", "salidas_total"]
+    fallback = earliest.reindex(base["local_id"])[base_cols].set_axis(base.index)
+    base[base_cols] = base[base_cols].mask(sin_censo_previo, fallback)
+
+    # If the situation is a variation, totals are the census base plus the
+    # accumulated deltas since that census. Inactive quarters do not move the
+    # base (their deltas count as 0) and report no totals.
+    es_variacion = nominas_df["situacion"] == "variacion"
+    tramo = [nominas_df["local_id"], base["fecha_censo"]]
+    acum_schoperas = nominas_df["delta_schoperas"].where(es_variacion, 0).groupby(tramo, dropna=False).cumsum()
+    acum_salidas = nominas_df["delta_salidas"].where(es_variacion, 0).groupby(tramo, dropna=False).cumsum()
+
+    # cumsum skips missing deltas; the totals stay unknown from there until the next census
+    def sin_delta(column):
+        faltante = (nominas_df[column].isna() & es_variacion).astype("int8")
+        return faltante.groupby(tramo, dropna=False).cummax().astype(bool)
+
+    acum_schoperas = acum_schoperas.mask(sin_delta("delta_schoperas"))
+    acum_salidas = acum_salidas.mask(sin_delta("delta_salidas"))
+
+    activos_trimestrales = pd.DataFrame({
+        "local_id": nominas_df["local_id"],
+        "fecha": nominas_df["fecha"],
+        "estado": np.where(es_variacion, "activo", "inactivo"),
+        "motivo": nominas_df["motivo"].where(~es_variacion),
+        "schoperas_totales": (base["schoperas_total"] + acum_schoperas).where(es_variacion),
+        "salidas_totales": (base["salidas_total"] + acum_salidas).where(es_variacion),
+    })
     return activos_trimestrales
 
 # def create_revision_cumplimiento(activos_df):
@@ -274,19 +367,16 @@ def build_contratos_from_nominas(contratos_df, nominas_df):
 # =============================================================================
 # SECTION: MAIN EXECUTION
 # =============================================================================
-def get_generated_dataframes():
-    """Main function to load and prepare all dataframes. Adds a generated activos_df"""
-    # 1. Load Data - from CSV or Google Sheets
-    locales_df, censos_df, nominas_df, contratos_df = load_data_gsheets()
-    
-    # 2. Process Census Data
+def prepare_dataframes(locales_df, censos_df, nominas_df, contratos_df):
+    """Runs the processing pipeline over already loaded source DataFrames."""
+    # 1. Process Census Data
     censos_df = process_censos(censos_df)
     
-    # 3. Process Contratos Data
+    # 2. Process Contratos Data
     contratos_df = process_contratos(contratos_df)
     contratos_df = contratos_update_from_nominas(contratos_df, nominas_df)
 
-    # 4. Process Assets (Activos) Data
+    # 3. Process Assets (Activos) Data
     activos_df = process_activos(censos_df, nominas_df)
 
     # --- Data Merge ---
@@ -308,4 +398,12 @@ def get_generated_dataframes():
         how='left'
     )
     
-    return locales_df, censos_df, activos_df, nominas_df, contratos_df
\ No newline at end of file
+    return locales_df, censos_df, activos_df, nominas_df, contratos_df
+
+
+def get_generated_dataframes():
+    """Main function to load and prepare all dataframes. Adds a generated activos_df"""
+    # Load Data - from Google Sheets or the synthetic source (CCU_DATA_SOURCE)
+    locales_df, censos_df, nominas_df, contratos_df = load_source_data()
+
+    return prepare_dataframes(locales_df, censos_df, nominas_df, contratos_df)
@@ -0,0 +1,158 @@
+import hashlib
+from dataclasses import dataclass
+from functools import cached_property
+
+import pandas as pd
+import streamlit as st
+from src.bitmaps import CensosBitmapIndex
+from src.contratos_index import ContratosIndex
+from src.cube import build_activos_cube, build_censos_cube, build_contratos_cube
+from src.data_preparation import load_source_data
+from src.panel import build_activos_panel, build_censos_panel
+from src.parallel import prepare_dataframes_parallel
+from src.search import VenueSearchIndex
+from utils.config import PIPELINE_WORKERS, SNAPSHOT_DIR, TTL_VALUE
+
+
+# =============================================================================
+# SECTION: SHARED DATA STORE
+# =============================================================================
+# The prepared DataFrames live once per process and are shared by every
+# Streamlit session. Pages receive shallow views of them: pandas >= 3.0 always
+# uses copy-on-write, so a page that adds or modifies a column only copies that
+# column into its own view and never touches the shared frames.
+
+FRAME_NAMES = ("locales", "censos", "activos", "nominas", "contratos")
+
+
+def compute_data_version(*dataframes):
+    """Returns a short content hash identifying a set of source DataFrames."""
+    digest = hashlib.sha1()
+    for df in dataframes:
+        digest.update("|".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class DataStore:
+    """Read-only container for the prepared DataFrames of one data version."""
+    version: str
+    locales: pd.DataFrame
+    censos: pd.DataFrame
+    activos: pd.DataFrame
+    nominas: pd.DataFrame
+    contratos: pd.DataFrame
+
+    def frames(self):
+        """Returns copy-on-write views in the order of get_generated_dataframes."""
+        return tuple(getattr(self, name).copy(deep=False) for name in FRAME_NAMES)
+
+    # --- Derived structures, built lazily once per data version ---
+
+    @cached_property
+    def contratos_index(self):
+        return ContratosIndex(self.contratos)
+
+    @cached_property
+    def activos_panel(self):
+        return build_activos_panel(self.activos)
+
+    @cached_property
+    def censos_panel(self):
+        return build_censos_panel(self.censos)
+
+    @cached_property
+    def censos_cube(self):
+        return build_censos_cube(self.censos, self.contratos)
+
+    @cached_property
+    def activos_cube(self):
+        return build_activos_cube(self.activos)
+
+    @cached_property
+    def contratos_cube(self):
+        return build_contratos_cube(self.contratos, self.locales)
+
+    @cached_property
+    def venue_rows(self):
+        """Row positions per local_id in censos / activos / contratos ({frame: {local_id: positions}})."""
+        return {
+            name: getattr(self, name).groupby('local_id', sort=False).indices
+            for name in ("censos", "activos", "contratos")
+        }
+
+    def venue_frame(self, name, local_id):
+        """Rows of one venue in censos / activos / contratos without scanning the frame."""
+        frame = getattr(self, name)
+        return frame.iloc[self.venue_rows[name].get(local_id, [])]
+
+    @cached_property
+    def censos_bitmaps(self):
+        return CensosBitmapIndex(self.censos)
+
+    @cached_property
+    def search_index(self):
+        return VenueSearchIndex(self.locales)
+
+    @cached_property
+    def rollups(self):
+        """KPI rollups per region / ciudad / agencia, refreshed incrementally from the previous version."""
+        from src.rollups import materialize_rollups
+        return materialize_rollups(self)
+
+
+def build_data_store(locales_df, censos_df, nominas_df, contratos_df):
+    """Prepares the source DataFrames and wraps them in a DataStore."""
+    version = compute_data_version(locales_df, censos_df, nominas_df, contratos_df)
+    frames = prepare_dataframes_parallel(
+        locales_df, censos_df, nominas_df, contratos_df, workers=PIPELINE_WORKERS
+    )
+    return DataStore(version, *frames)
+
+
+@st.cache_resource(ttl=TTL_VALUE, show_spinner=False)
+def _source():
+    """(version, frames) of the configured source, reloaded every TTL_VALUE."""
+    frames = load_source_data()
+    return compute_data_version(*frames), frames
+
+
+@st.cache_resource(max_entries=2, show_spinner="Cargando datos...")
+def _build_local_store(version, _frames):
+    """Prepares the frames the version was computed from (one cache entry per version).
+
+    No ttl: the store and every structure built on it live as long as the source
+    content is unchanged; a new version builds a new store. Recording versions
+    in CCU_VERSIONS_DIR is left to the warmup thread and the refresher.
+    """
+    # The pipeline assigns columns to its inputs: keep the cached frames intact
+    return build_data_store(*(df.copy(deep=False) for df in _frames))
+
+
+@st.cache_resource(max_entries=2, show_spinner="Cargando datos...")
+def _open_snapshot_store(version):
+    """Memory-maps a published snapshot version (one cache entry per version)."""
+    from src.snapshot import open_snapshot
+    return open_snapshot(SNAPSHOT_DIR, version)
+
+
+def get_data_store():
+    """Returns the process-wide DataStore.
+
+    With CCU_SNAPSHOT_DIR set, workers follow the snapshot published by the
+    refresher and switch to a new version on the next rerun after it appears.
+    Otherwise the source is rechecked every TTL_VALUE and the store is only
+    rebuilt when its content changed.
+    """
+    if SNAPSHOT_DIR:
+        from src.snapshot import read_current_version
+        version = read_current_version(SNAPSHOT_DIR)
+        if version is not None:
+            return _open_snapshot_store(version)
+    return _build_local_store(*_source())
+
+
+def get_shared_dataframes():
+    """Drop-in replacement for get_generated_dataframes backed by the shared store."""
+    return get_data_store().frames()
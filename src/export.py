@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+from src.data_preparation import add_vencimiento
+from utils.config import EXPORT_DIR
+
+
+# =============================================================================
+# SECTION: EXPORTABLE TABLES
+# =============================================================================
+
+EXPORT_TABLES = {
+    "censos": "Censos con clasificación",
+    "activos": "Activos por trimestre",
+    "contratos": "Contratos con vencimiento",
+}
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+CHUNK_ROWS = 50_000
+
+
+def get_export_table(store, table, filters=None):
+    """Returns a prepared frame of the store, optionally filtered with {column: [values]}."""
+    if table == "censos":
+        df = store.censos
+    elif table == "activos":
+        df = store.activos
+    elif table == "contratos":
+        df = add_vencimiento(store.contratos)
+    else:
+        raise ValueError(f"Unknown export table: {table}")
+
+    for column, values in (filters or {}).items():
+        if values:
+            df = df[df[column].isin(values)]
+    return df
+
+
+def _flatten(chunk):
+    """Makes list cells (e.g. marcas) exportable as comma separated text."""
+    # Only object and Arrow list columns can hold lists: the other columns are skipped
+    for col, dtype in chunk.dtypes.items():
+        if isinstance(dtype, pd.ArrowDtype) and pa.types.is_list(dtype.pyarrow_dtype):
+            joined = pc.binary_join(pa.array(chunk[col]).cast(pa.list_(pa.string())), ", ")
+            chunk = chunk.assign(**{col: pd.Series(joined, index=chunk.index, dtype=pd.ArrowDtype(pa.string()))})
+        elif dtype == object:
+            is_list = chunk[col].map(type).isin((list, tuple))
+            if is_list.any():
+                joined = chunk.loc[is_list, col].map(lambda v: ", ".join(map(str, v)))
+                chunk = chunk.assign(**{col: chunk[col].mask(is_list, joined)})
+    return chunk
+
+
+# =============================================================================
+# SECTION: STREAMING WRITERS
+# =============================================================================
+
+def iter_csv(df, chunk_rows=CHUNK_ROWS):
+    """Yields the CSV encoding of df in chunks of chunk_rows rows (header first)."""
+    yield df.head(0).to_csv(index=False).encode("utf-8-sig")
+    for start in range(0, len(df), chunk_rows):
+        chunk = _flatten(df.iloc[start:start + chunk_rows])
+        yield chunk.to_csv(index=False, header=False).encode("utf-8")
+
+
+def iter_xlsx_rows(df, chunk_rows=CHUNK_ROWS):
+    """Yields worksheet rows (lists of plain Python values) chunk by chunk."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = _flatten(df.iloc[start:start + chunk_rows]).astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def write_csv(df, path):
+    with open(path, "wb") as f:
+        for block in iter_csv(df):
+            f.write(block)
+
+
+def write_xlsx(df, path):
+    """Writes df with a write-only (streaming) workbook: bold header, frozen first row, date formats."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("datos")
+    ws.freeze_panes = "A2"
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill("solid", fgColor="0C7779")
+    for i, col in enumerate(df.columns, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = max(12, len(str(col)) + 2)
+    header = []
+    for col in df.columns:
+        cell = WriteOnlyCell(ws, value=str(col))
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    ws.append(header)
+
+    date_columns = {i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_datetime64_any_dtype(dtype)}
+    for row in iter_xlsx_rows(df):
+        if date_columns:
+            row = [
+                _date_cell(ws, v) if i in date_columns and v is not None else v
+                for i, v in enumerate(row)
+            ]
+        ws.append(row)
+    wb.save(path)
+
+
+def _date_cell(ws, value):
+    cell = WriteOnlyCell(ws, value=pd.Timestamp(value).to_pydatetime())
+    cell.number_format = "DD-MM-YYYY"
+    return cell
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+# =============================================================================
+# SECTION: DISK CACHE
+# =============================================================================
+# Files are keyed by (table, filters, format) inside one directory per data
+# version and built at most once: concurrent sessions asking for the same key
+# wait on the same lock, other keys are built in parallel. A lock is dropped
+# once nobody is waiting on it, so _locks only holds the exports being built.
+# Only the newest KEEP_VERSIONS version directories are kept on disk.
+
+KEEP_VERSIONS = 2
+
+_locks = {}  # key -> [lock, sessions using it]
+_locks_guard = threading.Lock()
+
+
+def export_key(table, fmt, version, filters=None):
+    """Stable cache key of an export."""
+    payload = {
+        "table": table,
+        "fmt": fmt,
+        "version": version,
+        "filters": {k: sorted(map(str, v)) for k, v in sorted((filters or {}).items()) if v},
+    }
+    # Expiry columns depend on today's date
+    if table == "contratos":
+        payload["fecha"] = str(pd.Timestamp.today().date())
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def export_file(store, table, fmt, filters=None):
+    """Returns the path of the cached export, building it on first request."""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    directory = Path(EXPORT_DIR) / store.version
+    key = export_key(table, fmt, store.version, filters)
+    path = directory / f"{table}-{key}.{fmt}"
+
+    with _locks_guard:
+        entry = _locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            if not path.exists():
+                directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = directory / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    WRITERS[fmt](get_export_table(store, table, filters), tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+                _prune_versions(Path(EXPORT_DIR), keep=store.version)
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _locks[key]
+    return path
+
+
+def _prune_versions(directory, keep):
+    """Removes the export directories of old data versions."""
+    versions = sorted(
+        (p for p in directory.iterdir() if p.is_dir()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in versions[KEEP_VERSIONS:]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def export_bytes(store, table, fmt, filters=None):
+    """Contents of the cached export, for st.download_button."""
+    return export_file(store, table, fmt, filters).read_bytes()
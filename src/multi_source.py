@@ -0,0 +1,164 @@
+import argparse
+import multiprocessing
+import threading
+import time
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+from src.data_preparation import load_data_gsheets, prepare_dataframes
+from utils.config import MULTI_SOURCE_IN_FLIGHT, SOURCES_FILE
+
+OUTPUT_NAMES = ("locales", "censos", "activos", "nominas", "contratos")
+SOURCE_COLUMN = "fuente"
+
+
+# =============================================================================
+# SECTION: SOURCE CONFIGS
+# =============================================================================
+# sources.toml (CCU_SOURCES_FILE), one entry per spreadsheet:
+#
+#   [[sources]]
+#   name = "zona_sur"
+#   connection = "gsheets_sur"        # [connections.gsheets_sur] in secrets.toml
+#   worksheets = { censos = "censos_sur" }   # only the tabs with other names
+#
+#   [[sources]]
+#   name = "demo"
+#   kind = "synthetic"                # generated locally, no credentials
+#   n_locales = 5000
+
+@dataclass(frozen=True)
+class SourceConfig:
+    name: str
+    kind: str = "gsheets"
+    connection: str = "gsheets"
+    worksheets: dict = field(default_factory=dict)
+    n_locales: int = 1000
+    seed: int = 42
+    latency: float = 0.0      # synthetic only: simulated download time in seconds
+
+    def load(self):
+        """(locales, censos, nominas, contratos) of this source."""
+        if self.kind == "synthetic":
+            from src.synthetic_data import make_synthetic_sources
+            time.sleep(self.latency)
+            return make_synthetic_sources(self.n_locales, seed=self.seed)
+        if self.kind == "gsheets":
+            return load_data_gsheets(self.connection, self.worksheets or None)
+        raise ValueError(f"Unknown source kind for {self.name}: {self.kind}")
+
+
+def read_source_configs(path=SOURCES_FILE):
+    """SourceConfig list from a TOML file with [[sources]] tables."""
+    with open(path, "rb") as f:
+        entries = tomllib.load(f).get("sources", [])
+    configs = [SourceConfig(**entry) for entry in entries]
+    names = [c.name for c in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate source names in {path}")
+    return configs
+
+
+# =============================================================================
+# SECTION: PARALLEL RUN
+# =============================================================================
+# Loads are network-bound (Google Sheets), so they run in a thread pool; the
+# pandas pipeline is CPU-bound, so prepare_dataframes runs in a process pool.
+# A semaphore caps the sources between "load started" and "prepared frames
+# received", which bounds the raw + intermediate frames held at once.
+
+@dataclass
+class SourceResult:
+    name: str
+    frames: tuple = None          # (locales, censos, activos, nominas, contratos)
+    error: str = None
+    load_seconds: float = 0.0
+    prepare_seconds: float = 0.0
+
+
+def _run_source(config, pool, slots):
+    result = SourceResult(config.name)
+    with slots:
+        try:
+            start = time.perf_counter()
+            raw = config.load()
+            result.load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result.frames = pool.submit(prepare_dataframes, *raw).result()
+            result.prepare_seconds = time.perf_counter() - start
+        except Exception as e:  # one broken spreadsheet must not stop the others
+            result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_sources(configs, io_workers=None, cpu_workers=None, max_in_flight=MULTI_SOURCE_IN_FLIGHT):
+    """Runs load + prepare_dataframes for every source; returns {name: SourceResult} in config order."""
+    max_in_flight = max(1, min(max_in_flight, len(configs) or 1))
+    io_workers = io_workers or max_in_flight
+    cpu_workers = cpu_workers or min(max_in_flight, multiprocessing.cpu_count())
+    slots = threading.BoundedSemaphore(max_in_flight)
+
+    # spawn: the loader threads are already running when workers start
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=cpu_workers, mp_context=context) as pool, \
+            ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="source-load") as loaders:
+        futures = [loaders.submit(_run_source, config, pool, slots) for config in configs]
+        results = [future.result() for future in futures]
+    return {result.name: result for result in results}
+
+
+def combine_results(results):
+    """One frame per output with a 'fuente' column, over the sources without errors."""
+    ok = [r for r in results.values() if r.frames is not None]
+    combined = {}
+    for position, name in enumerate(OUTPUT_NAMES):
+        frames = [r.frames[position].assign(**{SOURCE_COLUMN: r.name}) for r in ok]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if SOURCE_COLUMN in df.columns:
+            df = df[[SOURCE_COLUMN] + [c for c in df.columns if c != SOURCE_COLUMN]]
+        combined[name] = df
+    return combined
+
+
+# =============================================================================
+# SECTION: CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline for several spreadsheets concurrently.")
+    parser.add_argument("--sources", default=SOURCES_FILE, help="TOML file with [[sources]] (default: $CCU_SOURCES_FILE)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Ignore --sources and run N synthetic sources")
+    parser.add_argument("--n-locales", type=int, default=20000, help="Venues per synthetic source")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated download seconds per synthetic source")
+    parser.add_argument("--max-in-flight", type=int, default=MULTI_SOURCE_IN_FLIGHT, help="Sources loaded or being prepared at once")
+    parser.add_argument("--serial", action="store_true", help="Also time a serial run for comparison")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        configs = [SourceConfig(f"sintetica_{i}", kind="synthetic", n_locales=args.n_locales, seed=i, latency=args.latency) for i in range(args.synthetic)]
+    else:
+        configs = read_source_configs(args.sources)
+
+    start = time.perf_counter()
+    results = run_sources(configs, max_in_flight=args.max_in_flight)
+    elapsed = time.perf_counter() - start
+
+    for r in results.values():
+        status = f"error: {r.error}" if r.error else f"{len(r.frames[1])} censos, {len(r.frames[2])} activos"
+        print(f"- {r.name}: load {r.load_seconds:.2f} s, prepare {r.prepare_seconds:.2f} s, {status}")
+    combined = combine_results(results)
+    print(f"{len(configs)} sources in {elapsed:.2f} s (max {args.max_in_flight} in flight); "
+          + ", ".join(f"{name} {len(df)}" for name, df in combined.items()))
+
+    if args.serial:
+        start = time.perf_counter()
+        for config in configs:
+            prepare_dataframes(*config.load())
+        print(f"Serial: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
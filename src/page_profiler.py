@@ -0,0 +1,216 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from utils.config import PROFILE_DIR, PROFILE_ENV, PROFILE_KEEP
+
+
+# =============================================================================
+# SECTION: SAMPLING PROFILER
+# =============================================================================
+# A background thread samples the stack of the script thread every few
+# milliseconds (sys._current_frames), so the page code runs unmodified. The
+# samples are stored as collapsed stacks ("a;b;c count"), the input format of
+# flamegraph.pl and speedscope.
+
+SAMPLE_INTERVAL = 0.005
+
+# First matching rule (searched from the leaf frame up) decides the category
+CATEGORIES = [
+    ("Carga de datos", ("streamlit_gsheets", "gspread", "src/data_store.py", "src/synthetic_data.py", "src/snapshot.py")),
+    ("Serialización", ("streamlit/dataframe_util.py", "pyarrow", "streamlit/elements/arrow.py")),
+    ("Gráficos (Altair/Plotly)", ("altair", "plotly", "vega_charts.py")),
+    ("Pandas", ("pandas", "numpy")),
+    ("Streamlit", ("streamlit",)),
+]
+
+
+# Frames of this repo (labels carry the path relative to the working directory)
+REPO_PREFIXES = ("(app.py", "(reports/", "(tools/", "(src/", "(utils/")
+
+# Page scripts run by st.navigation: the flame view starts at their frame
+PAGE_PREFIXES = ("(reports/", "(tools/")
+OUTSIDE_PAGE = "Fuera de la página (Streamlit)"
+
+
+def _is_repo_frame(label):
+    return any(prefix in label for prefix in REPO_PREFIXES)
+
+
+def profiling_enabled():
+    """True with CCU_PROFILE=1 in the server environment (never from the URL)."""
+    return PROFILE_ENV
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    path = code.co_filename.replace(os.sep, "/")
+    # Keep paths short: site-packages/<pkg>/..., or the path inside the repo
+    for marker in ("site-packages/", "lib/python"):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    else:
+        path = os.path.relpath(path) if os.path.isabs(path) else path
+    return f"{code.co_name} ({path}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread (the current one by default) while running."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.elapsed = 0.0
+        self.path = None  # set by profile_page once saved
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="page-profiler", daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._start
+        return self
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    # --- Summaries ---
+
+    def collapsed(self):
+        """Collapsed stacks text (flamegraph.pl / speedscope format)."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def by_category(self):
+        """Share of samples per category (data loading, pandas, charts, serialization...)."""
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            category = "Otros"
+            for frame in reversed(frames):
+                match = next((name for name, keys in CATEGORIES if any(k in frame for k in keys)), None)
+                if match is None and _is_repo_frame(frame):
+                    match = "Código de la página"
+                if match:
+                    category = match
+                    break
+            totals[category] += count
+        df = pd.DataFrame(totals.most_common(), columns=["categoria", "muestras"])
+        df["pct"] = (100 * df["muestras"] / max(self.samples, 1)).round(1)
+        df["segundos"] = (df["pct"] / 100 * self.elapsed).round(3)
+        return df
+
+    def top_functions(self, n=15):
+        """Functions by inclusive samples (time on the stack) and self samples (time at the leaf)."""
+        inclusive, own = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = [f.rsplit(":", 1)[0] + ")" for f in stack.split(";")]
+            for frame in set(frames):
+                inclusive[frame] += count
+            own[frames[-1]] += count
+        df = pd.DataFrame({"inclusivo": pd.Series(inclusive), "propio": pd.Series(own)}).fillna(0).astype(int)
+        df = df.sort_values("inclusivo", ascending=False).head(n)
+        df["inclusivo_pct"] = (100 * df["inclusivo"] / max(self.samples, 1)).round(1)
+        return df.rename_axis("funcion").reset_index()
+
+    def icicle(self, min_share=0.01, max_depth=30):
+        """
+        ids / parents / values of an icicle (flame) chart, pruning nodes under
+        min_share. Stacks start at the page script frame (the Streamlit runner
+        frames above it are dropped); samples outside the page share one node.
+        """
+        values = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            start = next((i for i, frame in enumerate(frames) if frame.startswith("<module>") and any(p in frame for p in PAGE_PREFIXES)), None)
+            frames = [OUTSIDE_PAGE] if start is None else frames[start:start + max_depth]
+            for depth in range(1, len(frames) + 1):
+                values[";".join(frames[:depth])] += count
+        threshold = min_share * max(self.samples, 1)
+        nodes = [(node, value) for node, value in values.items() if value >= threshold]
+        return pd.DataFrame({
+            "id": [node for node, _ in nodes],
+            "parent": [node.rsplit(";", 1)[0] if ";" in node else "" for node, _ in nodes],
+            "label": [node.rsplit(";", 1)[-1] for node, _ in nodes],
+            "value": [value for _, value in nodes],
+        })
+
+
+# =============================================================================
+# SECTION: PAGE INTEGRATION
+# =============================================================================
+
+def save_profile(profiler, page_name, directory=None, keep=PROFILE_KEEP):
+    """Writes the collapsed stacks to PROFILE_DIR, keeping only the newest `keep` files; returns the path."""
+    directory = Path(directory or PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = "".join(c if c.isalnum() else "_" for c in page_name).strip("_") or "page"
+    now = time.time_ns()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now // 10**9))
+    path = directory / f"{stamp}-{now % 10**9:09d}-{slug}.collapsed"
+    path.write_text(profiler.collapsed())
+
+    # Names start with the timestamp: sorted order is age order
+    for old in sorted(directory.glob("*.collapsed"))[:-max(keep, 1)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+@contextmanager
+def profile_page(page_name):
+    """Profiles the block and persists the result, also when the page calls st.stop()."""
+    profiler = SamplingProfiler().start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.path = save_profile(profiler, page_name)
+
+
+def render_profile(profiler, page_name):
+    """Collapsible summary and flame (icicle) view of a page run in the sidebar."""
+    import plotly.graph_objects as go
+
+    with st.sidebar.expander(f"⏱️ Perfil: {page_name}", expanded=False):
+        st.caption(f"{profiler.elapsed:.2f} s · {profiler.samples} muestras · guardado en `{profiler.path}`")
+        st.dataframe(profiler.by_category(), hide_index=True)
+        st.dataframe(profiler.top_functions(), hide_index=True)
+
+        nodes = profiler.icicle()
+        if not nodes.empty:
+            fig = go.Figure(go.Icicle(
+                ids=nodes["id"],
+                parents=nodes["parent"],
+                labels=nodes["label"],
+                values=nodes["value"],
+                branchvalues="total",
+                tiling=dict(orientation="v", flip="y"),
+                maxdepth=8,  # levels below the page script frame
+            ))
+            fig.update_layout(margin=dict(t=0, b=0, l=0, r=0), height=420)
+            st.plotly_chart(fig, use_container_width=True)
+        st.download_button("Descargar (collapsed)", profiler.collapsed(), file_name=profiler.path.name)
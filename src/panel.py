@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# SECTION: VENUE x PERIODO PANELS
+# =============================================================================
+
+def _as_float(series):
+    """Returns a float NumPy array (NaN for missing) for numeric, boolean or Arrow columns."""
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+class Panel:
+    """
+    Dense panel of metrics: one 2-D float array (venues x periodos) per metric.
+
+    Rows follow local_ids and columns follow periodos; both are looked up
+    through dicts, so slicing a venue or a periodo is O(1).
+    """
+
+    def __init__(self, local_ids, periodos, metrics):
+        self.local_ids = np.asarray(local_ids)
+        self.periodos = np.asarray(periodos)
+        self.metrics = metrics
+        self._row = {local_id: i for i, local_id in enumerate(self.local_ids)}
+        self._col = {periodo: j for j, periodo in enumerate(self.periodos)}
+
+    def venue(self, local_id):
+        """All metrics of one venue as a DataFrame indexed by periodo."""
+        i = self._row[local_id]
+        return pd.DataFrame({name: m[i] for name, m in self.metrics.items()}, index=self.periodos)
+
+    def periodo(self, periodo):
+        """All metrics of one periodo as a DataFrame indexed by local_id."""
+        j = self._col[periodo]
+        return pd.DataFrame({name: m[:, j] for name, m in self.metrics.items()}, index=self.local_ids)
+
+    def stats(self, metric):
+        """Cross-venue statistics of a metric for every periodo."""
+        m = self.metrics[metric]
+        observed = ~np.isnan(m)
+        count = observed.sum(axis=0)
+        with np.errstate(invalid='ignore'):
+            total = np.where(observed, m, 0).sum(axis=0)
+            mean = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        median = np.full(len(self.periodos), np.nan)
+        has_data = count > 0
+        if has_data.any():
+            median[has_data] = np.nanmedian(m[:, has_data], axis=0)
+        return pd.DataFrame(
+            {'venues': count, 'total': total, 'mean': mean, 'median': median},
+            index=pd.Index(self.periodos, name='periodo'),
+        )
+
+
+def _pivot(df, local_ids, periodos, columns):
+    """Scatters long-format rows into venues x periodos arrays (last row wins)."""
+    rows = pd.Index(local_ids).get_indexer(df['local_id'])
+    cols = pd.Index(periodos).get_indexer(df['periodo'])
+    shape = (len(local_ids), len(periodos))
+
+    observed = np.zeros(shape, dtype=bool)
+    observed[rows, cols] = True
+    matrices = {}
+    for name, col in columns.items():
+        m = np.full(shape, np.nan)
+        m[rows, cols] = _as_float(df[col])
+        matrices[name] = m
+    return observed, matrices
+
+
+ACTIVOS_METRICS = {'schoperas_totales': 'schoperas_totales', 'salidas_totales': 'salidas_totales', 'activo': 'activo'}
+
+
+def build_activos_panel(activos_df):
+    """
+    Builds the activos panel over every quarter between the first and last nomination.
+
+    Quarters without a nomination repeat the venue's last reported state, as
+    in the activos rules: an active venue keeps its totals and an inactive one
+    stays inactive (no totals) until a new nomination arrives.
+    """
+    if activos_df.empty:
+        return Panel([], [], {name: np.empty((0, 0)) for name in ACTIVOS_METRICS})
+
+    df = activos_df.assign(activo=activos_df['estado'] == 'activo')
+    quarters = pd.PeriodIndex(df['periodo'], freq='Q')
+    # Same "2025-Q1" labels as activos_df['periodo'], including quarters without nominas
+    periodos = [f"{q.year}-Q{q.quarter}" for q in pd.period_range(quarters.min(), quarters.max(), freq='Q')]
+    local_ids = np.sort(df['local_id'].unique())
+
+    # Sort by fecha so that the latest nomination of a quarter wins
+    df = df.sort_values('fecha', kind='stable')
+    observed, matrices = _pivot(df, local_ids, periodos, ACTIVOS_METRICS)
+
+    # Forward-fill: index of the last observed quarter for every cell
+    steps = np.arange(len(periodos))
+    last = np.maximum.accumulate(np.where(observed, steps, -1), axis=1)
+    rows = np.arange(len(local_ids))[:, None]
+    for name, m in matrices.items():
+        filled = m[rows, np.maximum(last, 0)]
+        filled[last < 0] = np.nan
+        matrices[name] = filled
+    return Panel(local_ids, periodos, matrices)
+
+
+def build_censos_panel(censos_df):
+    """Builds the censos panel (venues x census periodo) with infrastructure and compliance."""
+    periodos = np.sort(censos_df['periodo'].astype(str).unique())
+    local_ids = np.sort(censos_df['local_id'].unique())
+    df = censos_df.assign(periodo=censos_df['periodo'].astype(str))
+    if 'fecha' in df.columns:
+        df = df.sort_values('fecha', kind='stable')
+    _, matrices = _pivot(
+        df, local_ids, periodos,
+        {
+            'schoperas_total': 'schoperas_total',
+            'salidas_total': 'salidas_total',
+            'salidas_otras': 'salidas_otras',
+            # cumple: 1 en regla, 0 no en regla, NaN when the rule does not apply
+            'cumple': 'complies?',
+        },
+    )
+    return Panel(local_ids, periodos, matrices)
@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from src.data_preparation import (
+    contratos_update_from_nominas,
+    prepare_dataframes,
+    process_activos,
+    process_censos,
+    process_contratos,
+)
+
+
+# =============================================================================
+# SECTION: HASH PARTITIONING
+# =============================================================================
+# Everything before the final merge with locales is independent per local_id,
+# so censos, nominas and contratos can be split by local_id, processed in a
+# process pool and concatenated back in serial order.
+
+ORDER_COLUMN = "_orden"
+
+# Below this many source rows (censos + nominas + contratos) the process pool
+# costs more than it saves: starting workers and pickling the partitions
+# takes longer than the serial pipeline.
+PARALLEL_MIN_ROWS = 200_000
+
+
+def partition_keys(local_ids, n_partitions):
+    """
+    Maps local_id values to partition numbers.
+
+    Numeric ids are hashed by value, so 5, 5.0 and "5" land in the same
+    partition in every frame, the same way pd.merge would match them.
+    """
+    numeric = pd.to_numeric(pd.Series(local_ids), errors="coerce")
+    by_value = pd.util.hash_array(numeric.to_numpy(dtype=float, na_value=np.nan))
+    by_text = pd.util.hash_array(pd.Series(local_ids).astype(str).to_numpy(dtype=object))
+    hashes = np.where(numeric.notna().to_numpy(), by_value, by_text)
+    return (hashes % np.uint64(n_partitions)).astype(np.int64)
+
+
+def partition_by_local_id(df, n_partitions):
+    """Splits df into n_partitions frames by hashed local_id (original row order kept)."""
+    keys = partition_keys(df["local_id"], n_partitions)
+    return [df[keys == i] for i in range(n_partitions)]
+
+
+def _prepare_partition(censos_df, nominas_df, contratos_df):
+    """Runs the per-venue steps of prepare_dataframes on one partition."""
+    censos_df = process_censos(censos_df)
+    contratos_df = process_contratos(contratos_df)
+    contratos_df = contratos_update_from_nominas(contratos_df, nominas_df)
+    activos_df = process_activos(censos_df, nominas_df)
+    return censos_df, activos_df, contratos_df
+
+
+# =============================================================================
+# SECTION: PARALLEL PIPELINE
+# =============================================================================
+
+def prepare_dataframes_parallel(locales_df, censos_df, nominas_df, contratos_df, workers=None,
+                                min_rows=PARALLEL_MIN_ROWS):
+    """
+    Same output as prepare_dataframes, computed over local_id partitions in a process pool.
+
+    workers: processes to use (None = one per CPU, at most the CPU count).
+    Falls back to the serial pipeline with one worker or one CPU, an empty
+    source, or fewer than min_rows source rows.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be >= 1 (got {workers})")
+    cpus = os.cpu_count() or 1
+    workers = min(workers or cpus, cpus)
+    rows = len(censos_df) + len(nominas_df) + len(contratos_df)
+    if workers <= 1 or rows < min_rows or censos_df.empty or nominas_df.empty or contratos_df.empty:
+        return prepare_dataframes(locales_df, censos_df, nominas_df, contratos_df)
+
+    # contratos_update_from_nominas resets the index, so remember the row order explicitly
+    contratos_tagged = contratos_df.assign(**{ORDER_COLUMN: np.arange(len(contratos_df))})
+
+    parts = [
+        (c, n, k)
+        for c, n, k in zip(
+            partition_by_local_id(censos_df, workers),
+            partition_by_local_id(nominas_df, workers),
+            partition_by_local_id(contratos_tagged, workers),
+        )
+        if not (c.empty and n.empty and k.empty)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_prepare_partition, *zip(*parts)))
+
+    def combine(frames):
+        frames = [f for f in frames if not f.empty]
+        combined = pd.concat(frames)
+        # Partitions where a column is all-NA infer a different dtype than the
+        # full data would; use the dtype of the partitions that have values.
+        for col in combined.columns:
+            dtypes = {f[col].dtype for f in frames if f[col].notna().any()}
+            if len(dtypes) == 1 and combined[col].dtype not in dtypes:
+                combined[col] = combined[col].astype(dtypes.pop())
+        return combined
+
+    # Restore the serial row order of every frame
+    censos_out = combine(r[0] for r in results).sort_index(kind="stable")
+    activos_out = (
+        combine(r[1] for r in results)
+        .sort_values(["local_id", "fecha"], kind="stable")
+        .reset_index(drop=True)
+    )
+    contratos_out = (
+        combine(r[2] for r in results)
+        .sort_values(ORDER_COLUMN, kind="stable")
+        .drop(columns=ORDER_COLUMN)
+        .reset_index(drop=True)
+    )
+
+    # --- Data Merge --- (same as prepare_dataframes)
+    censos_out = pd.merge(censos_out, locales_df, left_on='local_id', right_on='id', how='left')
+    activos_out = pd.merge(activos_out, locales_df, left_on='local_id', right_on='id', how='left')
+
+    return locales_df, censos_out, activos_out, nominas_df, contratos_out
@@ -0,0 +1,162 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from src.compliance import compliance_gap
+from src.data_preparation import (
+    add_vencimiento,
+    clear_source_data,
+    contratos_update_from_nominas,
+    load_source_data,
+    process_censos,
+    process_contratos,
+)
+from utils.config import RISK_ALERTS_PATH
+
+
+# =============================================================================
+# SECTION: RISK SCORE
+# =============================================================================
+# One row per venue needing action, from the latest census and the current
+# contract of every venue:
+#   - 'No en regla' in the latest census: 3 points + 0.5 per missing tap (up to 5)
+#   - contract proximo_a_vencer: 2 points + up to 1 as the end date approaches
+#   - reportado_inactivo_ccu in the latest nomina: 2 points
+
+DIAS_AVISO = 30
+PESO_NO_EN_REGLA = 3.0
+PESO_BRECHA = 0.5
+BRECHA_MAXIMA = 5
+PESO_VENCIMIENTO = 2.0
+PESO_URGENCIA = 1.0
+PESO_INACTIVO = 2.0
+
+LOCAL_COLUMNS = ["nombre_fantasia", "razon_social", "ciudad", "region"]
+
+
+def latest_censos(censos_df):
+    """Last census row of each venue (highest periodo, then fecha)."""
+    return (
+        censos_df.sort_values(["periodo", "fecha"], kind="stable")
+        .drop_duplicates("local_id", keep="last")
+        .set_index("local_id")
+    )
+
+
+def current_contratos(contratos_df):
+    """Contract of each venue with the latest fecha_fin."""
+    return (
+        contratos_df.sort_values("fecha_fin", kind="stable", na_position="first")
+        .drop_duplicates("local_id", keep="last")
+        .set_index("local_id")
+    )
+
+
+def score_risks(locales_df, censos_df, contratos_df, reference_date=None, dias_aviso=DIAS_AVISO):
+    """
+    Ranked risk list over every venue, from prepared censos (process_censos) and
+    contratos (process_contratos + contratos_update_from_nominas).
+    """
+    if dias_aviso <= 0:
+        raise ValueError(f"dias_aviso must be positive, got {dias_aviso}")
+    censo = latest_censos(censos_df)
+    contrato = current_contratos(add_vencimiento(contratos_df, reference_date, dias_aviso))
+
+    venues = censo.index.union(contrato.index)
+    censo = censo.reindex(venues)
+    contrato = contrato.reindex(venues)
+
+    no_en_regla = censo["clasificacion"].eq("No en regla").to_numpy()
+    brecha = compliance_gap(censo).where(no_en_regla).clip(0, BRECHA_MAXIMA)
+    proximo = contrato["proximo_a_vencer"].eq(True).to_numpy()
+    dias = contrato["dias_restantes"]
+    inactivo = contrato["reportado_inactivo_ccu"].eq(True).to_numpy() if "reportado_inactivo_ccu" in contrato else np.zeros(len(venues), bool)
+
+    score = (
+        np.where(no_en_regla, PESO_NO_EN_REGLA + PESO_BRECHA * brecha.fillna(0), 0)
+        + np.where(proximo, PESO_VENCIMIENTO + PESO_URGENCIA * (1 - dias.fillna(dias_aviso) / dias_aviso), 0)
+        + np.where(inactivo, PESO_INACTIVO, 0)
+    )
+
+    risks = pd.DataFrame({
+        "local_id": venues,
+        "score": np.round(score, 2),
+        "no_en_regla": no_en_regla,
+        "periodo_censo": censo["periodo"].to_numpy(),
+        "brecha_salidas": brecha.to_numpy(),
+        "proximo_a_vencer": proximo,
+        "dias_restantes": dias.to_numpy(),
+        "fecha_fin": contrato["fecha_fin"].to_numpy(),
+        "reportado_inactivo_ccu": inactivo,
+        "motivo_termino": contrato["motivo_termino"].to_numpy() if "motivo_termino" in contrato else None,
+    })
+    risks = risks[risks["score"] > 0]
+
+    # alertas: readable summary, built from the flags column by column
+    alertas = pd.Series("", index=risks.index)
+    alertas = alertas.mask(risks["no_en_regla"], "No en regla (faltan " + risks["brecha_salidas"].fillna(0).astype(int).astype(str) + " salidas); ")
+    alertas += np.where(risks["proximo_a_vencer"], "Contrato vence en " + risks["dias_restantes"].fillna(0).astype(int).astype(str) + " días; ", "")
+    alertas += np.where(risks["reportado_inactivo_ccu"], "Reportado inactivo CCU; ", "")
+    risks["alertas"] = alertas.str.rstrip("; ")
+
+    locales = locales_df.drop_duplicates("id").set_index("id")
+    locales = locales[[c for c in LOCAL_COLUMNS if c in locales.columns]]
+    risks = risks.join(locales, on="local_id")
+
+    risks = risks.sort_values(["score", "dias_restantes"], ascending=[False, True], kind="stable")
+    risks.insert(0, "ranking", np.arange(1, len(risks) + 1))
+    return risks.reset_index(drop=True)
+
+
+def build_risk_alerts(reference_date=None, dias_aviso=DIAS_AVISO):
+    """Loads the configured source and runs only the pipeline steps the score needs."""
+    locales_df, censos_df, nominas_df, contratos_df = load_source_data()
+    censos_df = process_censos(censos_df.copy())
+    contratos_df = process_contratos(contratos_df.copy())
+    contratos_df = contratos_update_from_nominas(contratos_df, nominas_df)
+    return score_risks(locales_df, censos_df, contratos_df, reference_date, dias_aviso)
+
+
+def write_alerts(risks, path):
+    """Atomically writes the list (.parquet or .csv by extension), so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}-{os.getpid()}")
+    if path.suffix == ".parquet":
+        risks.to_parquet(tmp, index=False)
+    else:
+        risks.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+# =============================================================================
+# SECTION: CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranked compliance risk alerts for every venue.")
+    parser.add_argument("--output", default=RISK_ALERTS_PATH, help="Output file, .csv or .parquet (default: $CCU_RISK_ALERTS_PATH)")
+    parser.add_argument("--fecha", default=None, help="Reference date for contract expiry (default: today)")
+    parser.add_argument("--dias-aviso", type=int, default=DIAS_AVISO, help="Days before fecha_fin that count as proximo_a_vencer")
+    parser.add_argument("--every", type=int, default=0, help="Recompute every N seconds instead of once")
+    args = parser.parse_args()
+    if args.dias_aviso <= 0:
+        parser.error("--dias-aviso must be positive")
+
+    while True:
+        start = time.perf_counter()
+        risks = build_risk_alerts(args.fecha, args.dias_aviso)
+        path = write_alerts(risks, args.output)
+        print(f"{len(risks)} venues with alerts written to {path} in {time.perf_counter() - start:.2f} s")
+        if not args.every:
+            break
+        time.sleep(args.every)
+        clear_source_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from src.compliance import compliance_gap
+
+
+# =============================================================================
+# SECTION: MATERIALIZED ROLLUPS
+# =============================================================================
+# KPI tables per nivel (total / region / ciudad / agencia), grupo and periodo,
+# materialized once per data version and looked up in O(1) through a dict:
+#   censos:    registros, locales, en_regla, no_en_regla, no_aplica,
+#              sin_comodato, brecha_total          (per nivel, grupo, periodo)
+#   contratos: contratos, contratos_vigentes,
+#              locales_vigentes                     (per nivel, grupo)
+# Every KPI is a sum of per-venue contributions (a venue adds 1 to 'locales'
+# of each group and periodo it has rows in), so on a new data version the
+# tables are maintained as  previous - old rows of the changed venues + their
+# new rows, instead of being recomputed. A venue counts in every agencia that
+# censused it.
+
+NIVELES = ("total", "region", "ciudad", "agencia")
+TOTAL = "Todos"
+CLASIFICACIONES = {
+    "En regla": "en_regla",
+    "No en regla": "no_en_regla",
+    "No aplica": "no_aplica",
+    "Sin comodato o terminado": "sin_comodato",
+}
+CENSOS_KPIS = ["registros", "locales"] + list(CLASIFICACIONES.values()) + ["brecha_total"]
+CONTRATOS_KPIS = ["contratos", "contratos_vigentes", "locales_vigentes"]
+# Above this share of changed venues a full recompute is cheaper
+FULL_REFRESH_SHARE = 0.5
+
+
+def _facts(store):
+    """Census facts and contract facts with one column per nivel."""
+    censos = store.censos
+    censo_facts = pd.DataFrame({
+        "local_id": censos["local_id"],
+        "periodo": censos["periodo"].astype(str),
+        "total": TOTAL,
+        "region": censos["region"],
+        "ciudad": censos["ciudad"],
+        "agencia": censos["agencia"],
+        "clasificacion": censos["clasificacion"],
+        "brecha": compliance_gap(censos).where(censos["clasificacion"] == "No en regla", 0).fillna(0),
+    })
+    # Categories: few distinct labels, so hashing and grouping work on the codes
+    for column in ("periodo", "total", "region", "ciudad", "agencia", "clasificacion"):
+        censo_facts[column] = censo_facts[column].astype("category")
+
+    locales = store.locales.drop_duplicates("id").set_index("id")
+    contratos = store.contratos
+    contrato_facts = pd.DataFrame({
+        "local_id": contratos["local_id"],
+        "total": TOTAL,
+        "region": contratos["local_id"].map(locales["region"]),
+        "ciudad": contratos["local_id"].map(locales["ciudad"]),
+        "vigente": contratos["vigente"].eq(True),
+    })
+    return censo_facts, contrato_facts
+
+
+def _agencia_members(censo_facts):
+    """(local_id, grupo) pairs: the agencias that censused each venue."""
+    pairs = censo_facts[["local_id", "agencia"]].drop_duplicates().dropna()
+    return pd.DataFrame({"local_id": pairs["local_id"], "grupo": pairs["agencia"].astype(str)})
+
+
+def venue_signatures(censo_facts, contrato_facts):
+    """64-bit signature per local_id over all its fact rows (order independent)."""
+    hashes = np.concatenate([
+        pd.util.hash_pandas_object(censo_facts, index=False).to_numpy(),
+        pd.util.hash_pandas_object(contrato_facts, index=False).to_numpy(),
+    ])
+    ids = pd.concat([censo_facts["local_id"], contrato_facts["local_id"]], ignore_index=True)
+    codes, uniques = pd.factorize(ids)
+    signature = np.zeros(len(uniques), dtype=np.uint64)
+    np.add.at(signature, codes, hashes)  # wraps modulo 2^64
+    return pd.Series(signature, index=uniques)
+
+
+def _aggregate_censos(facts, nivel):
+    grouped = facts.groupby([nivel, "periodo"], dropna=True, observed=True)
+    table = grouped.agg(registros=("local_id", "size"), locales=("local_id", "nunique"), brecha_total=("brecha", "sum"))
+    counts = (
+        facts.groupby([nivel, "periodo", "clasificacion"], dropna=True, observed=True).size()
+        .unstack("clasificacion", fill_value=0)
+        .rename(columns=CLASIFICACIONES)
+        .reindex(columns=list(CLASIFICACIONES.values()), fill_value=0)
+    )
+    table = table.join(counts).fillna(0)
+    table.index = pd.MultiIndex.from_arrays(
+        [table.index.get_level_values(i).astype(str) for i in range(2)], names=["grupo", "periodo"]
+    )
+    return table[CENSOS_KPIS]
+
+
+def _aggregate_contratos(facts, nivel, censo_facts):
+    if nivel in facts.columns:
+        facts = facts.rename(columns={nivel: "grupo"})
+    else:
+        # agencia: contracts of the venues each agencia censused
+        facts = facts.merge(_agencia_members(censo_facts), on="local_id")
+    facts = facts.assign(local_vigente=facts["local_id"].where(facts["vigente"]))
+    table = facts.groupby("grupo", dropna=True, observed=True).agg(
+        contratos=("local_id", "size"),
+        contratos_vigentes=("vigente", "sum"),
+        locales_vigentes=("local_vigente", "nunique"),
+    )
+    table.index = table.index.astype(str).rename("grupo")
+    return table[CONTRATOS_KPIS]
+
+
+class Rollups:
+    """Materialized KPI tables of one data version with O(1) lookups."""
+
+    def __init__(self, version, signatures, facts, censos, contratos, refreshed):
+        self.version = version
+        self.signatures = signatures
+        self.facts = facts                # (censo_facts, contrato_facts), for the next refresh
+        self.censos = censos              # {nivel: DataFrame indexed by (grupo, periodo)}
+        self.contratos = contratos        # {nivel: DataFrame indexed by grupo}
+        self.refreshed = refreshed        # venues whose rows were reapplied, or "full"
+        self._censos_index = {
+            (nivel, grupo, periodo): row
+            for nivel, table in censos.items()
+            for (grupo, periodo), row in table.to_dict("index").items()
+        }
+        self._contratos_index = {
+            (nivel, grupo): row
+            for nivel, table in contratos.items()
+            for grupo, row in table.to_dict("index").items()
+        }
+
+    def get(self, nivel, grupo, periodo):
+        """Census KPIs of one group and periodo (zeros when the group has no rows)."""
+        return self._censos_index.get((nivel, grupo, str(periodo)), dict.fromkeys(CENSOS_KPIS, 0))
+
+    def get_contratos(self, nivel, grupo):
+        return self._contratos_index.get((nivel, grupo), dict.fromkeys(CONTRATOS_KPIS, 0))
+
+    def total(self, nivel, grupos, periodo):
+        """Census KPIs summed over several groups of a nivel (e.g. a multiselect)."""
+        rows = [self.get(nivel, grupo, periodo) for grupo in grupos]
+        return {kpi: sum(row[kpi] for row in rows) for kpi in CENSOS_KPIS}
+
+    def total_contratos(self, nivel, grupos):
+        rows = [self.get_contratos(nivel, grupo) for grupo in grupos]
+        return {kpi: sum(row[kpi] for row in rows) for kpi in CONTRATOS_KPIS}
+
+    def table(self, nivel):
+        """Census KPI table of a nivel, one row per (grupo, periodo)."""
+        return self.censos[nivel].reset_index()
+
+
+def _apply_delta(previous, removed, added):
+    """previous - removed + added, dropping groups left without rows."""
+    table = previous.sub(removed, fill_value=0).add(added, fill_value=0)
+    table = table[table.iloc[:, 0] > 0]
+    counts = [c for c in table.columns if c != "brecha_total"]
+    return table.astype(dict.fromkeys(counts, "int64")).sort_index()
+
+
+def build_rollups(store, previous=None):
+    """Rollups of store; with the previous version's rollups only the changed venues are reapplied."""
+    censo_facts, contrato_facts = _facts(store)
+    signatures = venue_signatures(censo_facts, contrato_facts)
+
+    if previous is not None:
+        both = pd.concat([previous.signatures.rename("old"), signatures.rename("new")], axis=1)
+        changed = both.index[both["old"].ne(both["new"])]
+        if len(changed) <= FULL_REFRESH_SHARE * len(both):
+            old_censos, old_contratos = (f[f["local_id"].isin(changed)] for f in previous.facts)
+            new_censos, new_contratos = censo_facts[censo_facts["local_id"].isin(changed)], contrato_facts[contrato_facts["local_id"].isin(changed)]
+            censos, contratos = {}, {}
+            for nivel in NIVELES:
+                censos[nivel] = _apply_delta(
+                    previous.censos[nivel], _aggregate_censos(old_censos, nivel), _aggregate_censos(new_censos, nivel)
+                )
+                contratos[nivel] = _apply_delta(
+                    previous.contratos[nivel],
+                    _aggregate_contratos(old_contratos, nivel, old_censos),
+                    _aggregate_contratos(new_contratos, nivel, new_censos),
+                )
+            return Rollups(store.version, signatures, (censo_facts, contrato_facts), censos, contratos, len(changed))
+
+    censos = {nivel: _aggregate_censos(censo_facts, nivel) for nivel in NIVELES}
+    contratos = {nivel: _aggregate_contratos(contrato_facts, nivel, censo_facts) for nivel in NIVELES}
+    return Rollups(store.version, signatures, (censo_facts, contrato_facts), censos, contratos, "full")
+
+
+def distinct_venues(store, periodo, region=(), ciudad=(), agencia=()):
+    """
+    (venues censused in periodo, venues with a vigente contract) for any
+    combination of filters, from the rows. For the selections the rollups
+    cannot answer: several filters at once, or several agencias (a venue
+    censused by two of them counts once). Contracts ignore agencia.
+    """
+    censos = store.censos
+    mask = censos["periodo"].astype(str).eq(str(periodo)).to_numpy(bool)
+    for column, values in (("region", region), ("ciudad", ciudad), ("agencia", agencia)):
+        if len(values):
+            mask = mask & censos[column].isin(values).to_numpy(bool)
+
+    locales = store.locales.drop_duplicates("id").set_index("id")
+    contratos = store.contratos[store.contratos["vigente"].eq(True).fillna(False).to_numpy(bool)]
+    vigentes = np.ones(len(contratos), bool)
+    for column, values in (("region", region), ("ciudad", ciudad)):
+        if len(values):
+            vigentes = vigentes & contratos["local_id"].map(locales[column]).isin(values).to_numpy(bool)
+    return censos.loc[mask, "local_id"].nunique(), contratos.loc[vigentes, "local_id"].nunique()
+
+
+# =============================================================================
+# SECTION: PROCESS-WIDE MATERIALIZATION
+# =============================================================================
+# The last materialized rollups are kept per process, so the DataStore of the
+# next data version refreshes incrementally from them.
+
+_lock = threading.Lock()
+_latest = None
+
+
+def materialize_rollups(store):
+    """Rollups for store, refreshed incrementally from the last materialized version."""
+    global _latest
+    with _lock:
+        if _latest is not None and _latest.version == store.version:
+            return _latest
+        rollups = build_rollups(store, previous=_latest)
+        _latest = rollups
+        return rollups
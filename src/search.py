@@ -0,0 +1,140 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# SECTION: TEXT NORMALIZATION
+# =============================================================================
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value):
+    """Lowercase, accent-free text with punctuation collapsed to single spaces."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    # NFKD splits "ñ" / "é" into base letter + accent; the ASCII encode drops the accent
+    text = unicodedata.normalize("NFKD", str(value)).encode("ascii", "ignore").decode().lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def exact_key(value, is_id=False):
+    """Key of the exact id / RUT lookups: normalized text without spaces.
+
+    Ids read as floats ("5.0") keep their integer form ("5"), not "50".
+    """
+    if is_id and value is not None:
+        value = str(value).strip().removesuffix(".0")
+    return normalize_text(value).replace(" ", "")
+
+
+# Trigrams are encoded as integers over the normalized alphabet (space, a-z, 0-9)
+_ALPHABET = " abcdefghijklmnopqrstuvwxyz0123456789"
+_CODE = np.zeros(256, dtype=np.int64)
+_CODE[np.frombuffer(_ALPHABET.encode(), dtype=np.uint8)] = np.arange(len(_ALPHABET))
+N_TRIGRAMS = len(_ALPHABET) ** 3
+
+
+def trigram_codes(texts):
+    """
+    Returns (text_position, trigram_code) arrays for normalized texts.
+
+    Every word is padded as "  word " so short words and prefixes match. All
+    texts are encoded in one NumPy pass over their concatenated bytes.
+    """
+    padded = ["".join(f"  {word} " for word in text.split()) for text in texts]
+    lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+    chars = _CODE[np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8)]
+    owner = np.repeat(np.arange(len(padded)), lengths)
+
+    base = len(_ALPHABET)
+    codes = chars[:-2] * base * base + chars[1:-1] * base + chars[2:]
+    # Keep trigrams fully inside one text; drop "x  " / "   " that only appear between words
+    valid = (owner[:-2] == owner[2:]) & ~((chars[1:-1] == 0) & (chars[2:] == 0))
+    return owner[:-2][valid], codes[valid]
+
+
+# =============================================================================
+# SECTION: VENUE SEARCH INDEX
+# =============================================================================
+
+SEARCH_FIELDS = ["razon_social", "nombre_fantasia", "direccion", "rut", "id"]
+
+
+class VenueSearchIndex:
+    """
+    Accent-insensitive trigram index over locales, built once per data version.
+
+    Postings are stored as one sorted NumPy array of venue positions per
+    trigram (CSR layout); a query only touches the postings of its own
+    trigrams and scores venues with np.bincount.
+    """
+
+    def __init__(self, locales_df):
+        self.ids = locales_df["id"].to_numpy()
+        self._position = {local_id: i for i, local_id in enumerate(self.ids)}
+        fields = [c for c in SEARCH_FIELDS if c in locales_df.columns]
+
+        # Labels shown in the selector
+        razon = locales_df["razon_social"].astype(str).to_numpy()
+        ciudad = locales_df["ciudad"].astype(str).to_numpy() if "ciudad" in locales_df else [""] * len(razon)
+        self._labels = [f"{r} · {c} (ID {i})" for r, c, i in zip(razon, ciudad, self.ids)]
+
+        # Exact lookups: id and RUT without dots/dash
+        self._exact = {}
+        for i, local_id in enumerate(self.ids):
+            self._exact.setdefault(exact_key(local_id, is_id=True), []).append(i)
+        if "rut" in locales_df.columns:
+            for i, rut in enumerate(locales_df["rut"]):
+                self._exact.setdefault(exact_key(rut), []).append(i)
+
+        # Trigram postings (CSR): venue positions sorted by trigram code
+        columns = [locales_df[c].astype(str).tolist() for c in fields]
+        documents = [normalize_text(" ".join(values)) for values in zip(*columns)]
+        owner, codes = trigram_codes(documents)
+        n_docs = max(len(self.ids), 1)  # no locales: empty postings
+        keys = np.sort(codes * n_docs + owner)
+        if len(keys):
+            keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        self._postings = keys % n_docs
+        self._offsets = np.searchsorted(keys // n_docs, np.arange(N_TRIGRAMS + 1))
+        self._doc_size = np.bincount(self._postings, minlength=len(self.ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def label(self, local_id):
+        """Display label of a venue id."""
+        return self._labels[self._position[local_id]]
+
+    def position(self, local_id):
+        """Row position of a venue id in the locales frame the index was built from."""
+        return self._position[local_id]
+
+    def search(self, query, k=20):
+        """Returns up to k venue ids ranked by trigram similarity to query."""
+        text = normalize_text(query)
+        if not text:
+            return self.ids[:k].tolist()
+
+        keys = {exact_key(query), exact_key(query, is_id=True)}
+        exact = sorted({i for key in keys for i in self._exact.get(key, [])})
+        grams = np.unique(trigram_codes([text])[1])
+        hits = np.bincount(
+            np.concatenate([self._postings[self._offsets[g]:self._offsets[g + 1]] for g in grams]),
+            minlength=len(self.ids),
+        )
+        n_grams = max(len(grams), 1)
+        # Share of the query trigrams found in the venue; among equal coverage,
+        # venues with shorter text (more specific matches) rank first.
+        scores = hits / n_grams + 0.01 * hits / np.maximum(self._doc_size, 1)
+        scores[exact] += 10
+
+        candidates = np.flatnonzero(hits > 0) if not exact else np.union1d(np.flatnonzero(hits > 0), exact)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return self.ids[ranked].tolist()
@@ -0,0 +1,133 @@
+import argparse
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+from src.data_store import FRAME_NAMES, DataStore, build_data_store
+from src.data_preparation import clear_source_data, load_source_data, record_source_version
+from utils.config import SNAPSHOT_DIR
+
+
+# =============================================================================
+# SECTION: ARROW SNAPSHOTS
+# =============================================================================
+# Layout of a snapshot directory:
+#   <dir>/CURRENT               -> name of the published version
+#   <dir>/<version>/<frame>.arrow
+# A refresher process writes a new version directory and then swaps CURRENT
+# with an atomic rename, so readers always see a complete version. Workers
+# memory-map the files read-only: the OS page cache holds one physical copy
+# that every worker process shares.
+
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 3
+
+
+def _to_arrow_table(df):
+    """Converts a DataFrame to an Arrow table, stringifying mixed object columns."""
+    columns = {}
+    for col in df.columns:
+        try:
+            columns[col] = pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[col] = pa.array(df[col].map(lambda v: v if pd.isna(v) else str(v)), from_pandas=True)
+    return pa.table(columns)
+
+
+def write_snapshot(store, directory):
+    """Writes every frame of a DataStore to <directory>/<version> and publishes it."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / store.version
+
+    if not target.exists():
+        tmp_dir = directory / f".tmp-{store.version}-{os.getpid()}"
+        tmp_dir.mkdir()
+        for name in FRAME_NAMES:
+            table = _to_arrow_table(getattr(store, name))
+            with pa.OSFile(str(tmp_dir / f"{name}.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        os.rename(tmp_dir, target)
+
+    # Atomic switch-over: readers see either the old or the new version.
+    tmp_pointer = directory / f".{CURRENT_FILE}-{os.getpid()}"
+    tmp_pointer.write_text(store.version)
+    os.replace(tmp_pointer, directory / CURRENT_FILE)
+
+    _prune_versions(directory, keep=store.version)
+    return target
+
+
+def _prune_versions(directory, keep):
+    """Removes old version directories. Workers that still map them keep their pages."""
+    versions = sorted(
+        (p for p in directory.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in versions[KEEP_VERSIONS:]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def read_current_version(directory):
+    """Returns the published snapshot version, or None if nothing was published yet."""
+    try:
+        return (Path(directory) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_snapshot(directory, version):
+    """Memory-maps a published version and returns it as a DataStore.
+
+    Columns are exposed through pd.ArrowDtype so the DataFrames point straight
+    into the mapped buffers instead of copying them into NumPy arrays.
+    """
+    frames = []
+    for name in FRAME_NAMES:
+        source = pa.memory_map(str(Path(directory) / version / f"{name}.arrow"), "r")
+        table = pa.ipc.open_file(source).read_all()
+        frames.append(table.to_pandas(types_mapper=pd.ArrowDtype))
+    return DataStore(version, *frames)
+
+
+# =============================================================================
+# SECTION: REFRESHER
+# =============================================================================
+
+def publish_from_source(directory):
+    """Loads the sources, records them (CCU_VERSIONS_DIR), prepares them and publishes a snapshot if the data changed."""
+    clear_source_data()
+    record_source_version()
+    store = build_data_store(*load_source_data())
+    if read_current_version(directory) == store.version:
+        return store.version, False
+    write_snapshot(store, directory)
+    return store.version, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish prepared data as a memory-mapped Arrow snapshot.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshot directory (default: $CCU_SNAPSHOT_DIR)")
+    parser.add_argument("--every", type=int, default=0, help="Republish every N seconds instead of once")
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("--dir is required when CCU_SNAPSHOT_DIR is not set")
+
+    while True:
+        version, published = publish_from_source(args.dir)
+        print(f"Snapshot {version} {'published' if published else 'unchanged'} in {args.dir}")
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# SECTION: SYNTHETIC SOURCES
+# =============================================================================
+# Stand-in for the Google Sheets worksheets with the same raw columns, used for
+# benchmarks and local runs without credentials.
+
+CIUDADES = {
+    "Santiago": "Metropolitana",
+    "Valparaíso": "Valparaíso",
+    "Viña Del Mar": "Valparaíso",
+    "Concepción": "Biobío",
+    "Temuco": "Araucanía",
+    "Puerto Montt": "Los Lagos",
+}
+AGENCIAS = ["Santiago Centro", "Santiago Oriente", "Valparaíso", "Concepción", "Temuco"]
+NOMINA_FECHAS = ["2024-06-30", "2024-09-30", "2024-12-31", "2025-03-31", "2025-06-30", "2025-09-30"]
+
+
+def _rut(numbers):
+    """Formats integers as Chilean RUTs (12.345.678-5)."""
+    def dv(n):
+        total, factor = 0, 2
+        while n:
+            total += (n % 10) * factor
+            n //= 10
+            factor = 2 if factor == 7 else factor + 1
+        rest = 11 - total % 11
+        return {11: "0", 10: "K"}.get(rest, str(rest))
+    return [f"{n:,}".replace(",", ".") + f"-{dv(n)}" for n in numbers]
+
+
+def make_synthetic_sources(n_locales=1000, seed=42):
+    """Returns (locales, censos, nominas, contratos) shaped like load_data_gsheets()."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_locales + 1)
+
+    ciudades = rng.choice(list(CIUDADES), n_locales)
+    locales_df = pd.DataFrame({
+        "id": ids,
+        "razon_social": [f"Comercial {name} {i} Spa" for i, name in zip(ids, rng.choice(["El Roble", "Los Andes", "La Esquina", "Don Pepe", "Austral"], n_locales))],
+        "rut": _rut(rng.integers(5_000_000, 30_000_000, n_locales)),
+        "direccion": [f"Av. Principal {n}" for n in rng.integers(1, 9999, n_locales)],
+        "ciudad": ciudades,
+        "region": [CIUDADES[c] for c in ciudades],
+        "comuna": ciudades,
+        "nombre_fantasia": [f"Bar {i}" for i in ids],
+        "nota_interna": np.where(rng.random(n_locales) < 0.05, "Local de prueba", None),
+    })
+
+    # One census per year for ~90% of the venues
+    censos = []
+    for year in (2023, 2024, 2025):
+        sample = ids[rng.random(n_locales) < 0.9]
+        salidas_total = rng.integers(0, 13, len(sample))
+        censos.append(pd.DataFrame({
+            "local_id": sample,
+            "fecha": f"{year}-03-15",
+            "periodo": year,
+            "agencia": rng.choice(AGENCIAS, len(sample)),
+            "schoperas_total": rng.integers(0, 6, len(sample)),
+            "salidas_total": salidas_total,
+            "salidas_otras": rng.binomial(salidas_total, 0.25),
+            "marcas_abenv": rng.integers(0, 2, len(sample)),
+            "marcas_kross": rng.integers(0, 2, len(sample)),
+            "marcas_otras": rng.integers(0, 2, len(sample)),
+            "disponibilizo": rng.integers(0, 2, len(sample)),
+            "instalo": rng.integers(0, 2, len(sample)),
+        }))
+    censos_df = pd.concat(censos, ignore_index=True)
+
+    # Quarterly nominations; ~10% of rows report a 'termino'
+    nominas = []
+    for fecha in NOMINA_FECHAS:
+        sample = ids[rng.random(n_locales) < 0.8]
+        situacion = np.where(rng.random(len(sample)) < 0.1, "termino", "variacion")
+        nominas.append(pd.DataFrame({
+            "local_id": sample,
+            "fecha": fecha,
+            "situacion": situacion,
+            "motivo": np.where(situacion == "termino", rng.choice(["Cierre", "Cambio de dueño", "Retiro"], len(sample)), None),
+            "delta_schoperas": np.where(situacion == "variacion", rng.integers(-1, 2, len(sample)), 0),
+            "delta_salidas": np.where(situacion == "variacion", rng.integers(-2, 3, len(sample)), 0),
+        }))
+    nominas_df = pd.concat(nominas, ignore_index=True)
+
+    inicio = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 1500, n_locales), unit="D")
+    fin = inicio + pd.to_timedelta(rng.integers(365, 1825, n_locales), unit="D")
+    contratos_df = pd.DataFrame({
+        "local_id": ids,
+        "fecha_inicio": inicio.strftime("%Y-%m-%d"),
+        "fecha_fin": fin.strftime("%Y-%m-%d"),
+        "vigente": (fin > pd.Timestamp("2025-10-01")).astype(int),
+        "folio": [f"C-{i:06d}" for i in ids],
+    })
+
+    return locales_df, censos_df, nominas_df, contratos_df
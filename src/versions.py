@@ -0,0 +1,290 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.config import VERSIONS_DIR
+
+
+# =============================================================================
+# SECTION: VERSIONED SOURCES
+# =============================================================================
+# Every load of the worksheets can be recorded as a version that stores only
+# the row-level changes against the previous one:
+#   <dir>/<version>/manifest.json
+#   <dir>/<version>/<sheet>.upserts.parquet   -> new or modified rows (full rows)
+#   <dir>/<version>/<sheet>.deletes.parquet   -> keys of removed rows
+# Rows are identified by SHEET_KEYS plus an occurrence number (_dup) for
+# repeated keys. Every CHECKPOINT_EVERY versions (and when the columns of a
+# sheet change) the full sheet is stored instead, so rebuilding any version
+# replays at most CHECKPOINT_EVERY - 1 deltas.
+
+SHEETS = ("locales", "censos", "nominas", "contratos")
+SHEET_KEYS = {
+    "locales": ["id"],
+    "censos": ["local_id", "fecha"],
+    "nominas": ["local_id", "fecha"],
+    "contratos": ["local_id", "fecha_inicio"],
+}
+DUP_COLUMN = "_dup"
+CHECKPOINT_EVERY = 10
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+
+
+@contextmanager
+def _locked(directory):
+    """Exclusive lock so concurrent processes do not record sibling versions."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / LOCK_FILE, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _keyed(df, sheet):
+    """Adds the occurrence number of repeated keys; returns (df, key columns)."""
+    keys = [k for k in SHEET_KEYS[sheet] if k in df.columns]
+    df = df.reset_index(drop=True)
+    df[DUP_COLUMN] = df.groupby(keys, dropna=False, sort=False).cumcount() if keys else np.arange(len(df))
+    return df, keys + [DUP_COLUMN]
+
+
+def _hash_rows(df, columns):
+    """64-bit hash per row over a canonical form: numbers as float64, everything else as
+    nullable strings, so 1 / 1.0 and None / NaN hash the same after a parquet round trip."""
+    canonical = pd.DataFrame({
+        c: df[c].astype("float64") if pd.api.types.is_numeric_dtype(df[c]) else df[c].astype("string")
+        for c in columns
+    })
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def _to_table(df):
+    """Arrow table of a DataFrame, stringifying columns with mixed Python types."""
+    columns = {}
+    for col in df.columns:
+        try:
+            columns[col] = pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns[col] = pa.array(df[col].map(lambda v: v if pd.isna(v) else str(v)), from_pandas=True)
+    return pa.table(columns)
+
+
+def compute_delta(old_df, new_df, sheet):
+    """Rows of new_df that are new or changed (upserts) and keys of old_df that disappeared (deletes)."""
+    old_df, keys = _keyed(old_df, sheet)
+    new_df, _ = _keyed(new_df, sheet)
+    values = [c for c in new_df.columns if c not in keys]
+
+    old_keys, new_keys = _hash_rows(old_df, keys), _hash_rows(new_df, keys)
+    position = pd.Index(old_keys).get_indexer(new_keys)
+    changed = position == -1
+    matched = ~changed
+    changed[matched] = _hash_rows(old_df, values)[position[matched]] != _hash_rows(new_df, values)[matched]
+
+    upserts = new_df[changed]
+    deletes = old_df.loc[~np.isin(old_keys, new_keys), keys]
+    return upserts.reset_index(drop=True), deletes.reset_index(drop=True)
+
+
+# =============================================================================
+# SECTION: VERSION LOG
+# =============================================================================
+
+def list_versions(directory=VERSIONS_DIR):
+    """Manifests of every recorded version, oldest first."""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    manifests = [
+        json.loads((path / MANIFEST).read_text())
+        for path in sorted(directory.iterdir())
+        if path.is_dir() and (path / MANIFEST).exists()
+    ]
+    return manifests
+
+
+def resolve_version(ref, directory=VERSIONS_DIR):
+    """Version id for a ref: None (latest), a version id, or a date/time (last version created by then)."""
+    versions = list_versions(directory)
+    if not versions:
+        raise FileNotFoundError(f"No versions recorded in {directory}")
+    if ref is None:
+        return versions[-1]["version"]
+    ids = [v["version"] for v in versions]
+    if ref in ids:
+        return ref
+    as_of = pd.Timestamp(ref)
+    if len(ref) <= 10:
+        as_of += pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)  # a date means end of that day
+    candidates = [v["version"] for v in versions if pd.Timestamp(v["created"]) <= as_of]
+    if not candidates:
+        raise KeyError(f"No version recorded at or before {ref}")
+    return candidates[-1]
+
+
+def _read_delta(directory, version, sheet):
+    base = Path(directory) / version
+    upserts = pq.read_table(base / f"{sheet}.upserts.parquet").to_pandas()
+    deletes = pq.read_table(base / f"{sheet}.deletes.parquet").to_pandas()
+    return upserts, deletes
+
+
+def read_sheet(sheet, version=None, directory=VERSIONS_DIR):
+    """Rebuilds one worksheet as of a version, rows sorted by key."""
+    versions = list_versions(directory)
+    target = resolve_version(version, directory)
+    chain = versions[: [v["version"] for v in versions].index(target) + 1]
+    start = max(i for i, v in enumerate(chain) if v["sheets"][sheet]["checkpoint"])
+
+    # Checkpoint plus deltas in order: a row survives if it is the last upsert
+    # of its key and no later version deleted the key
+    upserts, deletes = [], []
+    for seq, manifest in enumerate(chain[start:]):
+        version_upserts, version_deletes = _read_delta(directory, manifest["version"], sheet)
+        upserts.append(version_upserts.assign(_seq=seq))
+        deletes.append(version_deletes.assign(_seq=seq))
+    upserts = pd.concat(upserts, ignore_index=True)
+    deletes = pd.concat(deletes, ignore_index=True)
+
+    keys = [k for k in SHEET_KEYS[sheet] if k in upserts.columns] + [DUP_COLUMN]
+    upsert_keys = _hash_rows(upserts, keys)
+    last = ~pd.Series(upsert_keys).duplicated(keep="last").to_numpy()
+    deleted_at = pd.Series(deletes["_seq"].to_numpy(), index=_hash_rows(deletes, keys)).groupby(level=0).max()
+    deleted_at = deleted_at.reindex(upsert_keys).fillna(-1).to_numpy()
+    state = upserts[last & (upserts["_seq"].to_numpy() > deleted_at)].drop(columns="_seq")
+    return state.sort_values(keys, kind="stable").drop(columns=DUP_COLUMN).reset_index(drop=True)
+
+
+def read_version(version=None, directory=VERSIONS_DIR):
+    """(locales, censos, nominas, contratos) as of a version, like load_data_gsheets()."""
+    version = resolve_version(version, directory)
+    return tuple(read_sheet(sheet, version, directory) for sheet in SHEETS)
+
+
+def _content_hash(frames):
+    digest = hashlib.sha1()
+    for sheet, df in zip(SHEETS, frames):
+        df, _ = _keyed(df, sheet)
+        digest.update("|".join(map(str, df.columns)).encode())
+        # Sorted row hashes: the row order of the sheet does not create a version
+        digest.update(np.sort(_hash_rows(df, list(df.columns))).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def record_version(frames, directory=VERSIONS_DIR, created=None):
+    """Stores (locales, censos, nominas, contratos) as a new version if anything changed.
+
+    Returns (version id, True if a new version was written).
+    """
+    directory = Path(directory)
+    with _locked(directory):
+        versions = list_versions(directory)
+        content = _content_hash(frames)
+        if versions and versions[-1]["content"] == content:
+            return versions[-1]["version"], False
+
+        number = int(versions[-1]["version"]) + 1 if versions else 1
+        version = f"{number:06d}"
+        full = not versions or number % CHECKPOINT_EVERY == 1
+        tmp_dir = directory / f".tmp-{version}-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        sheets = {}
+        for sheet, df in zip(SHEETS, frames):
+            previous = None if full else read_sheet(sheet, versions[-1]["version"], directory)
+            checkpoint = previous is None or list(previous.columns) != list(df.columns)
+            if checkpoint:
+                upserts, keys = _keyed(df, sheet)
+                deletes = upserts[keys].iloc[:0]
+            else:
+                upserts, deletes = compute_delta(previous, df, sheet)
+            pq.write_table(_to_table(upserts), tmp_dir / f"{sheet}.upserts.parquet")
+            pq.write_table(_to_table(deletes), tmp_dir / f"{sheet}.deletes.parquet")
+            sheets[sheet] = {
+                "rows": len(df),
+                "upserts": len(upserts),
+                "deletes": len(deletes),
+                "checkpoint": checkpoint,
+            }
+
+        manifest = {
+            "version": version,
+            "parent": versions[-1]["version"] if versions else None,
+            "created": created or time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "content": content,
+            "sheets": sheets,
+        }
+        (tmp_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        os.rename(tmp_dir, directory / version)
+    return version, True
+
+
+def version_size(version, directory=VERSIONS_DIR):
+    """Bytes on disk of one version."""
+    return sum(p.stat().st_size for p in (Path(directory) / version).iterdir())
+
+
+def diff_versions(sheet, old=None, new=None, directory=VERSIONS_DIR):
+    """Rows added or modified (upserts) and removed (deletes) in a sheet between two versions."""
+    return compute_delta(read_sheet(sheet, old, directory), read_sheet(sheet, new, directory), sheet)
+
+
+# =============================================================================
+# SECTION: CLI
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned snapshots of the source worksheets.")
+    parser.add_argument("--dir", default=VERSIONS_DIR, help="Versions directory (default: $CCU_VERSIONS_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("record", help="Load the configured source and record a version if it changed")
+    commands.add_parser("list", help="List recorded versions")
+    diff = commands.add_parser("diff", help="Row changes of a sheet between two versions")
+    diff.add_argument("sheet", choices=SHEETS)
+    diff.add_argument("old", help="Version id or date")
+    diff.add_argument("new", nargs="?", help="Version id or date (default: latest)")
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("--dir is required when CCU_VERSIONS_DIR is not set")
+
+    if args.command == "record":
+        from src.data_preparation import load_data_gsheets, load_data_synthetic
+        from utils.config import DATA_SOURCE
+        frames = load_data_synthetic() if DATA_SOURCE == "synthetic" else load_data_gsheets()
+        version, written = record_version(frames, args.dir)
+        print(f"Version {version} {'recorded' if written else 'unchanged'} in {args.dir}")
+
+    elif args.command == "list":
+        for manifest in list_versions(args.dir):
+            changes = ", ".join(
+                f"{sheet} full {s['upserts']}" if s["checkpoint"] else f"{sheet} +{s['upserts']}/-{s['deletes']}"
+                for sheet, s in manifest["sheets"].items()
+            )
+            size_kib = version_size(manifest["version"], args.dir) / 1024
+            print(f"{manifest['version']}  {manifest['created']}  {size_kib:8.1f} KiB  {changes}")
+
+    elif args.command == "diff":
+        upserts, deletes = diff_versions(args.sheet, args.old, args.new, args.dir)
+        print(f"{len(upserts)} rows added or modified, {len(deletes)} removed")
+        print(upserts.drop(columns=DUP_COLUMN).to_string(index=False, max_rows=50))
+        if len(deletes):
+            print(deletes.drop(columns=DUP_COLUMN).to_string(index=False, max_rows=50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+from pathlib import Path
+
+
+# =============================================================================
+# SECTION: BOOT WARMUP
+# =============================================================================
+# Entry point of the web process: Streamlit binds its port right away (Heroku
+# fails a dyno that has not bound within 60 s, error R10) while a background
+# thread loads the data and builds the DataStore with every derived structure,
+# so the first user after a deploy or dyno restart hits a warm
+# st.cache_resource. A visitor arriving during warmup waits on the same cache
+# entry instead of starting a second build. Readiness:
+#   - READY_FILE (CCU_READY_FILE): status "warming", then "ready" with the
+#     version and timings (or "cold" with the error)
+# With CCU_VERSIONS_DIR (and no snapshot refresher) the same thread then
+# records the source version every TTL_VALUE, off the request path.
+# Usage: python -m src.warmup [streamlit run options]   (Procfile)
+#        python -m src.warmup --check                   (synthetic data, no server)
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+# Derived structures of DataStore built at boot (cached_property names)
+WARM_PROPERTIES = (
+    "contratos_index",
+    "activos_panel",
+    "censos_panel",
+    "censos_cube",
+    "activos_cube",
+    "contratos_cube",
+    "venue_rows",
+    "censos_bitmaps",
+    "search_index",
+    "rollups",
+)
+
+
+def warm_up():
+    """Builds the shared DataStore and its derived structures; returns (store, timings)."""
+    from src.data_store import get_data_store
+
+    timings = {}
+    start = time.perf_counter()
+    store = get_data_store()
+    timings["data_store"] = time.perf_counter() - start
+    for name in WARM_PROPERTIES:
+        start = time.perf_counter()
+        getattr(store, name)
+        timings[name] = time.perf_counter() - start
+    return store, timings
+
+
+def write_ready_file(path, status, store=None, timings=None, error=None):
+    """Atomically writes the readiness file read by health checks."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "status": status,
+        "pid": os.getpid(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "version": store.version if store is not None else None,
+        "seconds": round(sum((timings or {}).values()), 3),
+        "timings": {name: round(seconds, 3) for name, seconds in (timings or {}).items()},
+        "error": error,
+    }
+    tmp = path.with_name(f".{path.name}-{os.getpid()}")
+    tmp.write_text(json.dumps(payload, indent=2))
+    os.replace(tmp, path)
+
+
+def boot(ready_file, record_every=None):
+    """Warms the caches and records the outcome. A failed warmup does not stop
+    the server: the first request then loads the data as before.
+
+    record_every: seconds between source version records (None: no recording).
+    """
+    try:
+        store, timings = warm_up()
+    except Exception as e:
+        traceback.print_exc()
+        write_ready_file(ready_file, "cold", error=f"{type(e).__name__}: {e}")
+        print(f"Warmup failed, starting cold: {e}", flush=True)
+    else:
+        write_ready_file(ready_file, "ready", store, timings)
+        print(f"Warmup done: version {store.version} in {sum(timings.values()):.2f} s", flush=True)
+    if record_every:
+        record_versions(record_every)
+
+
+def record_versions(interval, stop=None):
+    """Records the source in CCU_VERSIONS_DIR now and every interval seconds, until stop is set."""
+    from src.data_preparation import record_source_version
+
+    stop = stop or threading.Event()
+    while True:
+        record_source_version()
+        if stop.wait(interval):
+            return
+
+
+def boot_in_background(ready_file, record_every=None):
+    """Runs boot in a daemon thread, so the server can bind its port meanwhile."""
+    # Finish the imports first: importing pandas / streamlit from two threads at
+    # once can see partially initialized modules
+    import src.data_store  # noqa: F401
+    import streamlit.web.cli  # noqa: F401
+    write_ready_file(ready_file, "warming")
+    thread = threading.Thread(target=boot, args=(ready_file, record_every), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def run_streamlit(streamlit_args):
+    """Starts the Streamlit server in this process, so it reuses the warm caches."""
+    from streamlit.web import cli as stcli
+    stcli.main(args=["run", APP_PATH, *streamlit_args], prog_name="streamlit")
+
+
+# =============================================================================
+# SECTION: CHECK
+# =============================================================================
+
+def _first_request():
+    """Seconds of the first run of a new AppTest session (default page)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    assert not len(at.exception), at.exception[0].value
+    return time.perf_counter() - start
+
+
+def _clear_caches():
+    import streamlit as st
+    from src.data_preparation import clear_source_data
+
+    st.cache_resource.clear()
+    clear_source_data()
+
+
+def check(ready_file):
+    """Warms with synthetic data and verifies that the first AppTest request reuses it."""
+    from src.data_store import get_data_store
+
+    # Imports of the pages would otherwise be charged to whichever run comes first
+    _first_request()
+    _clear_caches()
+    cold_seconds = _first_request()
+    _clear_caches()
+
+    boot_in_background(ready_file).join()
+    ready = json.loads(Path(ready_file).read_text())
+    assert ready["status"] == "ready", ready
+    warm_store = get_data_store()
+    warm_seconds = _first_request()
+    assert get_data_store() is warm_store, "first request rebuilt the DataStore"
+    assert all(name in warm_store.__dict__ for name in WARM_PROPERTIES)
+
+    print(f"Warmup {ready['seconds']:.2f} s (version {ready['version']})")
+    print(f"First request: warm {warm_seconds:.2f} s, cold {cold_seconds:.2f} s")
+    print("OK: first request served from the warm cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Warm the data caches, then start the Streamlit server (extra options go to `streamlit run`)."
+    )
+    parser.add_argument("--check", action="store_true",
+                        help="Warm with synthetic data and check the first AppTest request; no server")
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.check:
+        # Must be set before utils.config is imported
+        os.environ["CCU_DATA_SOURCE"] = "synthetic"
+
+    from utils.config import READY_FILE, SNAPSHOT_DIR, SOURCE_VERSION, TTL_VALUE, VERSIONS_DIR
+
+    if args.check:
+        check(READY_FILE)
+        return
+    # The snapshot refresher records versions itself; a pinned version has nothing new
+    record_every = None
+    if VERSIONS_DIR and not SOURCE_VERSION and not SNAPSHOT_DIR:
+        import pandas as pd
+        record_every = pd.Timedelta(TTL_VALUE).total_seconds()
+    boot_in_background(READY_FILE, record_every)
+    run_streamlit(streamlit_args)
+
+
+if __name__ == "__main__":
+    main()
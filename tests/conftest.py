@@ -0,0 +1,27 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# utils.config reads the environment at import time: use the local synthetic source
+os.environ.setdefault("CCU_DATA_SOURCE", "synthetic")
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "data_scripts")]
+
+N_LOCALES = 300
+
+
+@pytest.fixture
+def sources():
+    """Fresh (locales, censos, nominas, contratos): the pipeline mutates its inputs."""
+    from src.synthetic_data import make_synthetic_sources
+    return make_synthetic_sources(N_LOCALES)
+
+
+@pytest.fixture(scope="session")
+def store():
+    from src.data_store import build_data_store
+    from src.synthetic_data import make_synthetic_sources
+    return build_data_store(*make_synthetic_sources(N_LOCALES))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preparation import build_activos_trimestres
+
+
+def censos(*rows):
+    return pd.DataFrame(rows, columns=["local_id", "fecha", "schoperas_total", "salidas_total"])
+
+
+def nominas(*rows):
+    return pd.DataFrame(rows, columns=["local_id", "fecha", "situacion", "motivo", "delta_schoperas", "delta_salidas"])
+
+
+def test_nominas_accumulate_from_the_latest_census():
+    result = build_activos_trimestres(
+        censos((1, "2024-01-01", 2, 4), (1, "2025-01-01", 5, 10)),
+        nominas(
+            (1, "2024-06-30", "variacion", None, 1, 2),
+            (1, "2024-09-30", "variacion", None, 1, 2),
+            (1, "2025-03-31", "variacion", None, 0, 1),
+        ),
+    )
+    assert result["salidas_totales"].tolist() == [6, 8, 11]
+    assert result["schoperas_totales"].tolist() == [3, 4, 5]
+
+
+def test_missing_fecha_is_left_out():
+    result = build_activos_trimestres(
+        censos((1, "2024-01-01", 2, 4)),
+        nominas((1, "2024-06-30", "variacion", None, 1, 2), (1, None, "variacion", None, 1, 2)),
+    )
+    assert len(result) == 1 and result["fecha"].notna().all()
+
+
+def test_missing_delta_propagates_until_the_next_census():
+    result = build_activos_trimestres(
+        censos((1, "2024-01-01", 2, 4), (1, "2025-01-01", 5, 10)),
+        nominas(
+            (1, "2024-03-31", "variacion", None, 1, 1),
+            (1, "2024-06-30", "variacion", None, 1, np.nan),
+            (1, "2024-09-30", "termino", "cierre", np.nan, np.nan),
+            (1, "2024-12-31", "variacion", None, 1, 1),
+            (1, "2025-03-31", "variacion", None, 1, 1),
+        ),
+    )
+    salidas = result["salidas_totales"].tolist()
+    assert salidas[0] == 5 and all(pd.isna(v) for v in salidas[1:4]) and salidas[4] == 11
+    # Missing deltas of inactive quarters do not count
+    assert result["schoperas_totales"].tolist()[3] == 5
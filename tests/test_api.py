@@ -0,0 +1,61 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pandas as pd
+import pytest
+
+from src import api
+
+
+@pytest.fixture
+def base_url(store, monkeypatch):
+    monkeypatch.setattr(api, "current_store", lambda: store)
+    api._responses.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), api.ApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def get(url, **headers):
+    try:
+        with urlopen(Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_etag_revalidation_returns_304(base_url, store):
+    status, headers, body = get(f"{base_url}/censos?page_size=5")
+    assert status == 200 and json.loads(body)["version"] == store.version
+    status, _, body = get(f"{base_url}/censos?page_size=5", **{"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+    status, other, _ = get(f"{base_url}/censos?page_size=5&page=2", **{"If-None-Match": headers["ETag"]})
+    assert status == 200 and other["ETag"] != headers["ETag"]
+
+
+def test_response_is_rendered_from_the_given_store(store, monkeypatch):
+    monkeypatch.setattr(api, "current_store", lambda: pytest.fail("second store lookup"))
+    api._responses.clear()
+    body, _ = api.cached_response(store, '"etag"', "/agregados/censos", "by=periodo")
+    assert json.loads(body)["version"] == store.version
+
+
+def test_bodies_are_valid_json(store):
+    local_id = str(store.locales["id"].iloc[0])
+    venue = json.loads(api.render(store, f"/locales/{local_id}", ""))
+    assert str(venue["local"]["id"]) == local_id and set(venue) >= {"censos", "activos", "contratos"}
+    totals = json.loads(api.render(store, "/agregados/censos", ""))["data"]
+    assert totals["registros"] == len(store.censos)
+
+
+def test_contratos_active_on_a_date_use_the_interval_index(store):
+    fecha = pd.Timestamp("2025-06-30")
+    inicio, fin = pd.to_datetime(store.contratos["fecha_inicio"]), pd.to_datetime(store.contratos["fecha_fin"])
+    expected = int(((inicio <= fecha) & (fin >= fecha)).sum())
+    assert json.loads(api.render(store, "/contratos", "vigente_en=2025-06-30"))["total"] == expected
+    with pytest.raises(api.ApiError):
+        api.render(store, "/contratos", "vigente_periodo=nope")
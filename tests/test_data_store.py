@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+import src.data_preparation as data_preparation
+import src.data_store as data_store
+from src.synthetic_data import make_synthetic_sources
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """Replaceable source behind get_data_store; caches are cleared around each test."""
+    current = {"seed": 1, "loads": 0}
+
+    def load_source_data():
+        current["loads"] += 1
+        return make_synthetic_sources(200, seed=current["seed"])
+
+    monkeypatch.setattr(data_store, "load_source_data", load_source_data)
+    monkeypatch.setattr(data_store, "SNAPSHOT_DIR", None)
+    data_store._source.clear()
+    data_store._build_local_store.clear()
+    yield current
+    data_store._source.clear()
+    data_store._build_local_store.clear()
+
+
+def test_store_survives_source_recheck_when_content_is_unchanged(source):
+    store = data_store.get_data_store()
+    store.censos_cube  # derived structures live on the store
+    data_store._source.clear()  # what the TTL expiry does
+    assert data_store.get_data_store() is store
+    assert "censos_cube" in data_store.get_data_store().__dict__
+
+
+def test_new_source_content_builds_a_new_store(source):
+    store = data_store.get_data_store()
+    source["seed"] = 2
+    data_store._source.clear()
+    fresh = data_store.get_data_store()
+    assert fresh is not store and fresh.version != store.version
+
+
+def test_store_is_built_from_the_frames_its_version_hashes(source):
+    store = data_store.get_data_store()
+    assert source["loads"] == 1
+    assert store.version == data_store.compute_data_version(*make_synthetic_sources(200, seed=1))
+    # The cached source frames are not modified by the build
+    _, frames = data_store._source()
+    assert data_store.compute_data_version(*frames) == store.version
+
+
+def test_record_source_version_logs_failures(monkeypatch, tmp_path, caplog):
+    not_a_directory = tmp_path / "versions"
+    not_a_directory.write_text("")
+    monkeypatch.setattr(data_preparation, "VERSIONS_DIR", str(not_a_directory))
+    monkeypatch.setattr(data_preparation, "SOURCE_VERSION", None)
+    monkeypatch.setattr(data_preparation, "load_full_source_data", lambda: make_synthetic_sources(50))
+    with caplog.at_level(logging.ERROR):
+        assert data_preparation.record_source_version() is None
+    assert "Could not record" in caplog.text
+
+
+def test_frames_are_views_of_the_shared_store(store):
+    locales, *_ = store.frames()
+    locales["nueva"] = 1
+    assert "nueva" not in store.locales.columns
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from dedup import (
+    _connected_components, build_canonical_ids, dedupe_censos, dedupe_contratos, jaccard, trigram_signatures,
+)
+
+
+def test_trigram_signatures_rank_similar_names_higher():
+    signatures = trigram_signatures(["bar el pirata", "bar el pirata", "bar el pirataa", "restaurant costanera", ""])
+    assert signatures.shape == (5, 32)
+    sims = jaccard(signatures, np.array([0, 0, 0]), np.array([1, 2, 3]))
+    assert sims[0] == 1.0 and sims[1] > 0.7 > sims[2]
+
+
+def test_connected_components_label_with_the_lowest_row():
+    # Chain 5-4-3-2 plus 0-6, 1 alone
+    left, right = np.array([5, 4, 3, 6]), np.array([4, 3, 2, 0])
+    assert _connected_components(7, left, right).tolist() == [0, 1, 2, 2, 2, 2, 0]
+
+
+def test_build_canonical_ids_merges_duplicates():
+    locales = pd.DataFrame({
+        "local_id": ["10", "11", "12", "13"],
+        "rut": ["12.345.678-9", "012345678-9", "", "7654321-K"],
+        "razon_social": ["Bar El Pirata SpA", "Bar El Pirata Ltda", "Bar El Pirata", "Restaurant Costanera"],
+        "direccion": ["Av. Peru 100", "Avenida Peru 100", "Av Peru 100", "Costanera 5"],
+        "ciudad": ["Viña del Mar", "Viña del Mar", "Viña del Mar", "Valparaíso"],
+    })
+    id_map = build_canonical_ids(locales)
+    assert id_map["canonical_id"].tolist() == ["10", "10", "10", "13"]
+
+
+def test_remapped_rows_are_deduplicated():
+    censos = pd.DataFrame({
+        "local_id": ["10", "10", "10", "13"],
+        "periodo": ["2024", "2024", "2025", "2024"],
+        "fecha": pd.to_datetime(["2024-05-01", "2024-03-01", "2025-01-01", "2024-01-01"]),
+        "salidas_total": [4, 6, 5, 2],
+    })
+    assert dedupe_censos(censos)["salidas_total"].tolist() == [4, 5, 2]
+
+    contratos = pd.DataFrame({
+        "local_id": ["10", "10", "10", "10"],
+        "folio": ["A1", "A1", None, None],
+        "fecha_inicio": pd.to_datetime(["2020-01-01", "2020-01-01", "2022-01-01", "2022-01-01"]),
+        "fecha_fin": pd.to_datetime(["2026-01-01", "2026-01-01", "2027-01-01", "2027-01-01"]),
+        "vigente": [False, True, True, True],
+    })
+    kept = dedupe_contratos(contratos)
+    assert len(kept) == 2 and kept["vigente"].all() and list(kept.columns) == list(contratos.columns)
@@ -0,0 +1,69 @@
+import dataclasses
+import io
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src import export
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_flatten_joins_object_and_arrow_lists():
+    chunk = pd.DataFrame({
+        "marcas": [["ABInBev", "Kross"], [], None],
+        "arrow": pd.Series([["a"], ["b", "c"], None], dtype=pd.ArrowDtype(pa.list_(pa.string()))),
+        "salidas": [1, 2, 3],
+    })
+    flat = export._flatten(chunk)
+    assert flat["marcas"].tolist() == ["ABInBev, Kross", "", None]
+    assert flat["arrow"].iloc[:2].tolist() == ["a", "b, c"] and pd.isna(flat["arrow"].iloc[2])
+    assert flat["salidas"].tolist() == [1, 2, 3]
+
+
+def test_concurrent_exports_build_once_and_release_their_lock(store, export_dir, monkeypatch):
+    writes = []
+    write_csv = export.WRITERS["csv"]
+    monkeypatch.setitem(export.WRITERS, "csv", lambda df, path: (writes.append(path), write_csv(df, path)))
+
+    paths = []
+    threads = [
+        threading.Thread(target=lambda: paths.append(export.export_file(store, "censos", "csv")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(writes) == 1 and len(set(paths)) == 1
+    assert export._locks == {}
+    assert len(pd.read_csv(io.BytesIO(export.export_bytes(store, "censos", "csv")))) == len(store.censos)
+
+
+def test_failed_write_leaves_no_tmp_file(store, export_dir, monkeypatch):
+    def failing_writer(df, path):
+        path.write_bytes(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setitem(export.WRITERS, "csv", failing_writer)
+    with pytest.raises(OSError):
+        export.export_file(store, "censos", "csv")
+    assert list(export_dir.rglob("*.*")) == []
+    assert export._locks == {}
+
+
+def test_old_versions_are_pruned(store, export_dir, monkeypatch):
+    monkeypatch.setattr(export, "KEEP_VERSIONS", 2)
+    for i, version in enumerate(["v1", "v2", "v3"]):
+        path = export.export_file(dataclasses.replace(store, version=version), "censos", "csv")
+        os.utime(path.parent, (i, i))
+
+    assert sorted(p.name for p in export_dir.iterdir()) == ["v2", "v3"]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.search import VenueSearchIndex
+
+
+def venues(rows):
+    return sorted(set(rows["local_id"]))
+
+
+@pytest.mark.parametrize("periodo", ["2023", "2024", "2025"])
+def test_bitmap_queries_match_row_filters(store, periodo):
+    index, censos = store.censos_bitmaps, store.censos
+    in_periodo = censos[censos["periodo"].astype(str) == periodo]
+    kross = in_periodo[in_periodo["marcas_kross"].fillna(False).astype(bool)]
+    abinbev = in_periodo[in_periodo["marcas_abenv"].fillna(False).astype(bool)]
+    no_en_regla = in_periodo[in_periodo["clasificacion"] == "No en regla"]
+
+    assert index.censados(periodo).ids() == venues(in_periodo)
+    query = index.marca("Kross", periodo) - index.marca("ABInBev", periodo) & index.clasificacion("No en regla", periodo)
+    expected = (set(kross["local_id"]) - set(abinbev["local_id"])) & set(no_en_regla["local_id"])
+    assert query.ids() == sorted(expected)
+    assert len(~index.censados(periodo)) == censos["local_id"].nunique() - len(venues(in_periodo))
+
+
+def test_contratos_index_matches_row_filters(store):
+    index, contratos = store.contratos_index, store.contratos
+    inicio, fin = pd.to_datetime(contratos["fecha_inicio"]), pd.to_datetime(contratos["fecha_fin"])
+    for fecha in pd.date_range("2022-01-01", "2026-12-31", freq="97D"):
+        expected = contratos.index[(inicio <= fecha) & (fin >= fecha)]
+        assert sorted(index.vigentes_en(fecha).index) == sorted(expected)
+
+    quarter = pd.Period("2025-Q3", freq="Q")
+    expected = contratos.index[(inicio <= quarter.end_time) & (fin >= quarter.start_time)]
+    assert sorted(index.vigentes_en_periodo("2025-Q3").index) == sorted(expected)
+
+    desde = pd.Timestamp("2025-06-01")
+    expected = contratos.index[(fin >= desde) & (fin <= desde + pd.Timedelta(days=90))]
+    assert sorted(index.por_vencer(desde, 90).index) == sorted(expected)
+
+
+def test_search_finds_names_ids_and_ruts(store):
+    index, locales = store.search_index, store.locales.drop_duplicates("id")
+    venue = locales.iloc[len(locales) // 2]
+
+    assert index.search(str(venue["id"]))[0] == venue["id"]
+    assert index.search(venue["rut"])[0] == venue["id"]
+    # Accent / case insensitive, and a typo still ranks the venue among the first results
+    name = venue["razon_social"]
+    assert venue["id"] in index.search(name.upper(), k=5)
+    typo = name[:-1] if len(name) > 6 else name
+    assert venue["id"] in index.search(typo, k=20)
+
+
+def test_search_ranks_by_query_coverage(store):
+    index = store.search_index
+    results = index.search("bar", k=10)
+    assert len(results) == 10 and len(set(results)) == 10
+    assert index.search("", k=3) == list(np.asarray(index.ids[:3]))
+
+
+def test_float_ids_match_their_integer_form():
+    index = VenueSearchIndex(pd.DataFrame({"id": [5.0, 50.0], "razon_social": ["Bar Uno", "Bar Dos"]}))
+    assert index.search("5")[0] == 5.0 and index.search("5.0")[0] == 5.0
+    assert index.search("50")[0] == 50.0
+
+
+def test_search_on_no_locales_is_empty():
+    index = VenueSearchIndex(pd.DataFrame({"id": pd.Series([], dtype=int), "razon_social": pd.Series([], dtype=str)}))
+    assert len(index) == 0
+    assert index.search("bar") == [] and index.search("") == []
+
+
+def test_inverted_contract_is_left_off_the_timeline():
+    from src.contratos_index import ContratosIndex
+
+    contratos = pd.DataFrame({
+        "local_id": [1, 2, 3],
+        "fecha_inicio": pd.to_datetime(["2024-01-01", "2025-06-01", None]),
+        "fecha_fin": pd.to_datetime(["2025-12-31", "2025-01-01", "2025-12-31"]),
+    })
+    index = ContratosIndex(contratos)
+    assert index.invalidos["local_id"].tolist() == [2, 3]
+    assert index.vigentes_en("2025-03-01")["local_id"].tolist() == [1]
+    assert index.vigentes_en_periodo("2025-Q1")["local_id"].tolist() == [1]
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.multi_source import SOURCE_COLUMN, SourceConfig, combine_results, run_sources
+
+
+@dataclass(frozen=True)
+class MissingColumns:
+    """Loads fine, but its frames break prepare_dataframes in the worker process."""
+    name: str
+
+    def load(self):
+        return tuple(pd.DataFrame({"x": [1]}) for _ in range(4))
+
+
+def test_failing_sources_do_not_sink_the_others():
+    configs = [
+        SourceConfig("norte", kind="synthetic", n_locales=60, seed=1),
+        SourceConfig("rota", kind="desconocida"),
+        MissingColumns("sin_columnas"),
+        SourceConfig("sur", kind="synthetic", n_locales=40, seed=2),
+    ]
+    results = run_sources(configs, max_in_flight=2)
+
+    assert list(results) == ["norte", "rota", "sin_columnas", "sur"]
+    assert "Unknown source kind" in results["rota"].error and results["rota"].frames is None
+    assert results["sin_columnas"].error and results["sin_columnas"].frames is None
+    for name in ("norte", "sur"):
+        assert results[name].error is None and len(results[name].frames) == 5
+
+    locales = combine_results(results)["locales"]
+    assert set(locales[SOURCE_COLUMN]) == {"norte", "sur"}
+    assert len(locales) == len(results["norte"].frames[0]) + len(results["sur"].frames[0])
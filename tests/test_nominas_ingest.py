@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+import nominas_ingest
+from nominas_ingest import export_nominas_csv, ingest_nominas, read_nominas
+
+
+def write_quarter(input_dir, year, quarter, ids):
+    rows = pd.DataFrame({
+        "id": ids,
+        "fecha": f"{year}-{3 * quarter:02d}-15",
+        "situacion": "Alta",
+        "motivo": "nuevo",
+        "schoperas_delta": 1,
+        "salidas_delta": 2,
+    })
+    rows.to_csv(input_dir / f"nominas_{year}_q{quarter}.csv", index=False)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    input_dir, output_dir = tmp_path / "inputs", tmp_path / "outputs"
+    input_dir.mkdir()
+    write_quarter(input_dir, 2024, 1, ["1", "2", "3"])
+    write_quarter(input_dir, 2024, 2, ["2", "3", "4"])
+    return input_dir, output_dir
+
+
+def id_map(pairs):
+    return pd.DataFrame(pairs, columns=["local_id", "canonical_id"])
+
+
+def test_rerun_skips_by_stat_without_hashing(dirs, monkeypatch):
+    input_dir, output_dir = dirs
+    assert ingest_nominas(input_dir, output_dir) == ["2024-Q1", "2024-Q2"]
+
+    def fail(path, *args):
+        raise AssertionError(f"{path} was read")
+
+    monkeypatch.setattr(nominas_ingest, "file_sha1", fail)
+    assert ingest_nominas(input_dir, output_dir) == []
+
+
+def test_unrelated_id_map_change_keeps_partitions(dirs):
+    input_dir, output_dir = dirs
+    ingest_nominas(input_dir, output_dir, id_map=id_map([("1", "1"), ("4", "4")]))
+
+    # Only venue 4 is remapped: just the quarter that contains it is rewritten
+    assert ingest_nominas(input_dir, output_dir, id_map=id_map([("1", "1"), ("4", "2")])) == ["2024-Q2"]
+    assert set(read_nominas(output_dir, ["2024-Q2"])["local_id"]) == {"2", "3"}
+
+    # A venue of no partition changes nothing
+    assert ingest_nominas(input_dir, output_dir, id_map=id_map([("1", "1"), ("4", "2"), ("9", "1")])) == []
+
+
+def test_new_quarter_is_appended_like_a_full_export(dirs, tmp_path):
+    input_dir, output_dir = dirs
+    ingest_nominas(input_dir, output_dir)
+    csv_path = tmp_path / "nominas.csv"
+    assert export_nominas_csv(output_dir, csv_path) == ["2024-Q1", "2024-Q2"]
+    assert export_nominas_csv(output_dir, csv_path) == []
+
+    write_quarter(input_dir, 2024, 3, ["5"])
+    assert ingest_nominas(input_dir, output_dir) == ["2024-Q3"]
+    assert export_nominas_csv(output_dir, csv_path) == ["2024-Q3"]
+
+    full_path = tmp_path / "full.csv"
+    export_nominas_csv(output_dir, full_path)
+    assert csv_path.read_text() == full_path.read_text()
+
+
+def test_changed_quarter_rewrites_the_export(dirs, tmp_path):
+    input_dir, output_dir = dirs
+    ingest_nominas(input_dir, output_dir)
+    csv_path = tmp_path / "nominas.csv"
+    export_nominas_csv(output_dir, csv_path)
+
+    write_quarter(input_dir, 2024, 1, ["1", "7"])
+    assert ingest_nominas(input_dir, output_dir) == ["2024-Q1"]
+    assert export_nominas_csv(output_dir, csv_path) == ["2024-Q1", "2024-Q2"]
+    assert set(pd.read_csv(csv_path, dtype={"local_id": str})["local_id"]) == {"1", "7", "2", "3", "4"}
+
+
+def test_read_nominas_of_some_venues(dirs):
+    input_dir, output_dir = dirs
+    ingest_nominas(input_dir, output_dir)
+    assert set(read_nominas(output_dir, local_ids=["3", "4"])["local_id"]) == {"3", "4"}
@@ -0,0 +1,63 @@
+import runpy
+from collections import Counter
+from pathlib import Path
+
+from src import page_profiler
+from src.page_profiler import OUTSIDE_PAGE, SamplingProfiler, save_profile
+
+ROOT = Path(__file__).resolve().parents[1]
+RUNNER = "_run_script (streamlit/runtime/scriptrunner/script_runner.py:1);<module> (app.py:30);run (streamlit/navigation/page.py:2)"
+PAGE = "<module> (reports/1_general.py:10)"
+
+
+def profiler_with(stacks):
+    profiler = SamplingProfiler()
+    profiler.stacks = Counter(stacks)
+    return profiler
+
+
+def run_app(monkeypatch, tmp_path, enabled):
+    from streamlit.testing.v1 import AppTest
+    monkeypatch.setattr(page_profiler, "PROFILE_ENV", enabled)
+    monkeypatch.setattr(page_profiler, "PROFILE_DIR", str(tmp_path))
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120).run()
+    assert not at.exception
+    return [e.label for e in at.sidebar.expander]
+
+
+def test_profiling_is_off_unless_the_environment_enables_it(monkeypatch):
+    monkeypatch.delenv("CCU_PROFILE", raising=False)
+    assert runpy.run_path(str(ROOT / "utils" / "config.py"))["PROFILE_ENV"] is False
+    monkeypatch.setenv("CCU_PROFILE", "1")
+    assert runpy.run_path(str(ROOT / "utils" / "config.py"))["PROFILE_ENV"] is True
+
+
+def test_pages_are_not_profiled_by_default(monkeypatch, tmp_path):
+    assert not any(label.startswith("⏱️ Perfil") for label in run_app(monkeypatch, tmp_path, enabled=False))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_enabled_profiling_records_and_renders_the_page_timings(monkeypatch, tmp_path):
+    assert "⏱️ Perfil: General" in run_app(monkeypatch, tmp_path, enabled=True)
+    saved = list(tmp_path.glob("*-General.collapsed"))
+    assert len(saved) == 1 and saved[0].read_text()
+
+
+def test_icicle_starts_at_the_page_script():
+    profiler = profiler_with({
+        f"{RUNNER};{PAGE};kpis (reports/1_general.py:40)": 6,
+        f"{RUNNER};{PAGE}": 2,
+        RUNNER: 2,
+    })
+    nodes = profiler.icicle(min_share=0).set_index("id")
+    roots = nodes[nodes["parent"] == ""]
+    assert set(roots.index) == {PAGE, OUTSIDE_PAGE}
+    assert roots.loc[PAGE, "value"] == 8 and roots.loc[OUTSIDE_PAGE, "value"] == 2
+    assert nodes.loc[f"{PAGE};kpis (reports/1_general.py:40)", "parent"] == PAGE
+
+
+def test_saved_profiles_are_capped(tmp_path):
+    profiler = profiler_with({RUNNER: 1})
+    assert profiler.path is None
+    paths = [save_profile(profiler, "General", tmp_path, keep=3) for _ in range(5)]
+    assert sorted(tmp_path.glob("*.collapsed")) == paths[-3:]
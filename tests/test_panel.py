@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.data_preparation import process_activos
+from src.panel import build_activos_panel
+
+
+def test_activos_panel_carries_the_last_nomination_forward():
+    censos = pd.DataFrame(
+        [(1, "2024-01-01", 2, 4), (2, "2024-01-01", 1, 2)],
+        columns=["local_id", "fecha", "schoperas_total", "salidas_total"],
+    )
+    nominas = pd.DataFrame(
+        [
+            (1, "2024-02-15", "variacion", None, 0, 0),
+            (1, "2024-03-31", "variacion", None, 1, 2),  # latest of Q1 wins
+            (1, "2024-09-30", "termino", "cierre", np.nan, np.nan),
+            (2, "2024-09-30", "variacion", None, 0, 1),
+            (2, "2025-03-31", "variacion", None, 1, 1),
+        ],
+        columns=["local_id", "fecha", "situacion", "motivo", "delta_schoperas", "delta_salidas"],
+    )
+    panel = build_activos_panel(process_activos(censos, nominas))
+    assert panel.periodos.tolist() == ["2024-Q1", "2024-Q2", "2024-Q3", "2024-Q4", "2025-Q1"]
+
+    # Active in Q1, repeated through Q2; inactive from Q3 on, without totals
+    venue = panel.venue(1)
+    assert venue["activo"].tolist() == [1, 1, 0, 0, 0]
+    assert venue["salidas_totales"].iloc[:2].tolist() == [6, 6] and venue["salidas_totales"].iloc[2:].isna().all()
+    assert venue["schoperas_totales"].iloc[:2].tolist() == [3, 3]
+
+    # Nothing before the first nomination; the last state is carried until the next one
+    venue = panel.venue(2)
+    assert venue["activo"].iloc[:2].isna().all() and venue["salidas_totales"].iloc[:2].isna().all()
+    assert venue["activo"].iloc[2:].tolist() == [1, 1, 1]
+    assert venue["salidas_totales"].iloc[2:].tolist() == [3, 3, 4]
+
+    stats = panel.stats("salidas_totales")
+    assert stats["venues"].tolist() == [1, 1, 1, 1, 1]
+    assert stats.loc["2024-Q2", "total"] == 6 and stats.loc["2025-Q1", "total"] == 4
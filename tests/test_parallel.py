@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import parallel
+from src.data_preparation import prepare_dataframes
+
+FRAMES = ["locales", "censos", "activos", "nominas", "contratos"]
+
+
+@pytest.mark.parametrize("workers", [0, -2])
+def test_workers_must_be_positive(sources, workers):
+    with pytest.raises(ValueError, match="workers"):
+        parallel.prepare_dataframes_parallel(*sources, workers=workers)
+
+
+@pytest.mark.parametrize("cpus, min_rows", [(1, 0), (4, 10**9)])
+def test_one_cpu_or_small_sources_run_serially(sources, monkeypatch, cpus, min_rows):
+    monkeypatch.setattr(os, "cpu_count", lambda: cpus)
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", lambda **_: pytest.fail("process pool started"))
+    parallel.prepare_dataframes_parallel(*sources, workers=4, min_rows=min_rows)
+
+
+def test_partitioned_pipeline_matches_serial(sources, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    expected = prepare_dataframes(*(df.copy() for df in sources))
+    result = parallel.prepare_dataframes_parallel(*(df.copy() for df in sources), workers=2, min_rows=0)
+    for name, left, right in zip(FRAMES, expected, result):
+        pd.testing.assert_frame_equal(left, right, obj=name)
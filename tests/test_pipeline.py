@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.compliance import compliance_gap, simulate_rules
+from src.data_preparation import prepare_dataframes
+from src.data_store import build_data_store
+from src.synthetic_data import make_synthetic_sources
+from utils.config import SALIDAS_MINIMAS, SALIDAS_RATIO
+
+
+def clasificacion_row(row):
+    """Row-by-row reading of the compliance rule, as the sheets describe it."""
+    if pd.isna(row["salidas_total"]) or not row["salidas_total"] > SALIDAS_MINIMAS:
+        return "No aplica"
+    if pd.isna(row["salidas_otras"]):
+        return "No en regla"
+    return "En regla" if row["salidas_otras"] >= row["salidas_total"] // SALIDAS_RATIO else "No en regla"
+
+
+def test_vectorized_censos_steps_match_row_by_row(sources):
+    # Missing tap counts, as blank cells in the sheets
+    sources[1].loc[sources[1].index[:5], "salidas_otras"] = np.nan
+    sources[1].loc[sources[1].index[5:8], "salidas_total"] = np.nan
+    _, censos, *_ = prepare_dataframes(*sources)
+    expected = censos.apply(clasificacion_row, axis=1)
+    assert (censos["clasificacion"] == expected).all()
+
+    marcas = censos.apply(
+        lambda row: [label for column, label in (("marcas_abenv", "ABInBev"), ("marcas_kross", "Kross"), ("marcas_otras", "Otros")) if row[column]],
+        axis=1,
+    )
+    assert censos["marcas"].tolist() == marcas.tolist()
+
+
+def test_shared_store_frames_match_the_per_session_pipeline():
+    store = build_data_store(*make_synthetic_sources(200))
+    expected = prepare_dataframes(*make_synthetic_sources(200))
+    for name, left, shared in zip(["locales", "censos", "activos", "nominas", "contratos"], expected, store.frames()):
+        pd.testing.assert_frame_equal(shared, left, obj=name)
+
+
+def test_simulate_rules_matches_process_censos_for_the_current_rule(store):
+    result = simulate_rules(store.censos).set_index("periodo")
+    counts = store.censos.groupby(store.censos["periodo"].astype(str))["clasificacion"].value_counts().unstack(fill_value=0)
+    for column, clasificacion in (("en_regla", "En regla"), ("no_en_regla", "No en regla"), ("no_aplica", "No aplica")):
+        assert result[column].to_dict() == counts.get(clasificacion, 0).to_dict(), column
+    gap = compliance_gap(store.censos).where(store.censos["clasificacion"] == "No en regla")
+    assert result["brecha_total"].to_dict() == pytest.approx(gap.groupby(store.censos["periodo"].astype(str)).sum().to_dict())
+
+
+def test_changing_the_rule_moves_venues_between_classes():
+    censos = pd.DataFrame({
+        "periodo": "2024",
+        "salidas_total": [3, 4, 8, 8, 8, 12],
+        "salidas_otras": [0, 1, 1, 2, 4, 2],
+    })
+    scenarios = simulate_rules(censos, umbrales=(SALIDAS_MINIMAS, SALIDAS_MINIMAS + 1), ratios=(SALIDAS_RATIO, 2))
+    counts = scenarios.set_index(["umbral", "ratio"])[["aplica", "en_regla", "no_en_regla", "no_aplica"]]
+    # Current rule (3, 4): 3 taps does not apply; targets 1, 2, 2, 2, 3
+    assert counts.loc[(SALIDAS_MINIMAS, SALIDAS_RATIO)].tolist() == [5, 3, 2, 1]
+    # A higher umbral drops the 4-tap venue out of the rule
+    assert counts.loc[(SALIDAS_MINIMAS + 1, SALIDAS_RATIO)].tolist() == [4, 2, 2, 2]
+    # A stricter ratio (targets 2, 4, 4, 4, 6) leaves only the 8 taps / 4 others venue in rule
+    assert counts.loc[(SALIDAS_MINIMAS, 2)].tolist() == [5, 1, 4, 1]
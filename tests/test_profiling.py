@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from profiling import HLL_PRECISION, QUANTILES, HyperLogLog, KLLSketch, MisraGries, hash_values
+
+# HyperLogLog standard error is 1.04 / sqrt(2^p): allow three of them
+HLL_TOLERANCE = 3 * 1.04 / np.sqrt(1 << HLL_PRECISION)
+
+
+def batches(values, size=5_000):
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+@pytest.mark.parametrize("distinct", [300, 50_000])
+def test_hyperloglog_is_close_to_exact_nunique(distinct):
+    rng = np.random.default_rng(distinct)
+    values = pd.Series(rng.integers(0, distinct, 200_000)).map("local-{}".format)
+    sketch = HyperLogLog()
+    for batch in batches(values.to_numpy()):
+        sketch.add(hash_values(batch))
+    exact = values.nunique()
+    assert abs(sketch.count() - exact) <= HLL_TOLERANCE * exact
+
+
+def test_kll_quantiles_are_within_rank_error():
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.lognormal(2, 1, 80_000), rng.integers(0, 12, 20_000).astype(float)])
+    rng.shuffle(values)
+    values[::97] = np.nan
+    sketch = KLLSketch(seed=3)
+    for batch in batches(values):
+        sketch.add(batch)
+
+    observed = np.sort(values[~np.isnan(values)])
+    assert sketch.n == len(observed)
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        # Rank of the estimate in the exact data must be close to q
+        low = np.searchsorted(observed, estimate, side="left") / len(observed)
+        high = np.searchsorted(observed, estimate, side="right") / len(observed)
+        assert low - 0.02 <= q <= high + 0.02, (q, estimate, low, high)
+
+
+def test_misra_gries_counts_are_lower_bounds_within_n_over_k():
+    rng = np.random.default_rng(11)
+    values = pd.Series(rng.zipf(1.5, 100_000) % 5_000).map("marca-{}".format)
+    sketch = MisraGries()
+    for batch in batches(values):
+        counts = batch.value_counts()
+        sketch.add_counts(counts.index.to_numpy(dtype=object), counts.to_numpy())
+
+    exact = values.value_counts()
+    bound = len(values) / (sketch.counters + 1)
+    estimates = dict(sketch.top(sketch.counters))
+    for value, estimate in estimates.items():
+        assert exact[value] - bound <= estimate <= exact[value]
+    # Every value above the bound is kept, and the heaviest ones keep their order
+    assert set(exact[exact > bound].index) <= set(estimates)
+    assert [value for value, _ in sketch.top(3)] == exact.index[:3].tolist()
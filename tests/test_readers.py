@@ -0,0 +1,44 @@
+import pandas as pd
+
+from readers import read_source
+
+
+def write_csv(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_malformed_dates_become_nat(tmp_path):
+    path = write_csv(tmp_path / "nominas.csv", (
+        "id,Fecha,Salidas Delta\n"
+        "1,2/28/2026,1\n"
+        "2,2025-03-31,2\n"
+        "3,31/31/2025,3\n"
+        "4,,4\n"
+    ))
+    df = read_source(path, "nominas")
+    assert df["fecha"].dtype == "datetime64[us]"
+    assert df["fecha"].tolist()[:2] == [pd.Timestamp("2026-02-28"), pd.Timestamp("2025-03-31")]
+    assert df["fecha"].iloc[2:].isna().all()
+    assert df["delta_salidas"].tolist() == [1, 2, 3, 4]
+
+
+def test_only_mapped_and_kept_columns_are_read(tmp_path, monkeypatch):
+    import readers
+
+    path = write_csv(tmp_path / "contratos.csv", (
+        "id,Fecha Inicio,Fecha Fin,VIGENTE/NO VIGENTE,Folio,Observación Agencia\n"
+        "1,2/28/2024,2/28/2026,VIGENTE,A1,revisar\n"
+    ))
+    read_columns = []
+    read_csv = readers.pa_csv.read_csv
+
+    def spy(path, convert_options):
+        read_columns.extend(convert_options.include_columns)
+        return read_csv(path, convert_options=convert_options)
+
+    monkeypatch.setattr(readers.pa_csv, "read_csv", spy)
+    df = read_source(path, "contratos")
+    assert "Observación Agencia" not in read_columns
+    assert list(df.columns) == ["local_id", "fecha_inicio", "fecha_fin", "vigente_sn", "folio"]
+    assert df.loc[0, "vigente_sn"] == "VIGENTE"
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from src.risk_alerts import score_risks
+
+FECHA = pd.Timestamp("2024-06-01")
+
+
+@pytest.fixture
+def frames():
+    locales = pd.DataFrame({"id": [1, 2, 3, 4, 5, 6, 7], "nombre_fantasia": list("ABCDEFG")})
+    # Venue 3 has no census
+    censos = pd.DataFrame({
+        "local_id": [1, 1, 2, 4, 5, 6, 7],
+        "periodo": ["2023", "2024", "2024", "2024", "2024", "2024", "2024"],
+        "fecha": pd.to_datetime(["2023-05-01", "2024-05-01", "2024-05-01", "2024-05-01", "2024-05-01", "2024-05-01", "2024-05-01"]),
+        "clasificacion": ["En regla", "No en regla", "No en regla", "En regla", "En regla", "En regla", "En regla"],
+        "salidas_target": [2.0, 2.0, 2.0, 1.0, 1.0, 1.0, 1.0],
+        "salidas_otras": [2, 0, 1, 1, 1, 1, 1],
+    })
+    dias = {1: 10, 2: -5, 3: 30, 4: 31, 5: -1, 6: 100, 7: 0}
+    contratos = pd.DataFrame({
+        "local_id": list(dias),
+        "fecha_fin": [FECHA + pd.Timedelta(days=d) for d in dias.values()],
+        "reportado_inactivo_ccu": [False, False, False, False, False, True, False],
+    })
+    return locales, censos, contratos
+
+
+def test_venues_are_ranked_by_score_then_days_left(frames):
+    risks = score_risks(*frames, reference_date=FECHA, dias_aviso=30)
+    assert risks["local_id"].tolist() == [1, 2, 7, 3, 6]
+    assert risks["ranking"].tolist() == [1, 2, 3, 4, 5]
+    # 3 + 0.5 * 2 missing taps, plus 2 + 1 * (1 - 10 / 30) for the contract
+    assert risks["score"].tolist() == [6.67, 3.5, 3.0, 2.0, 2.0]
+    assert risks.loc[0, "nombre_fantasia"] == "A"
+
+
+def test_only_the_latest_census_counts(frames):
+    risks = score_risks(*frames, reference_date=FECHA).set_index("local_id")
+    assert risks.loc[1, "periodo_censo"] == "2024" and risks.loc[1, "brecha_salidas"] == 2
+
+
+def test_expired_contract_is_not_an_expiry_alert(frames):
+    risks = score_risks(*frames, reference_date=FECHA).set_index("local_id")
+    assert not risks.loc[2, "proximo_a_vencer"]
+    assert risks.loc[2, "alertas"] == "No en regla (faltan 1 salidas)"
+    assert 5 not in risks.index
+
+
+def test_venue_without_census_is_scored_on_its_contract(frames):
+    risks = score_risks(*frames, reference_date=FECHA).set_index("local_id")
+    assert not risks.loc[3, "no_en_regla"] and pd.isna(risks.loc[3, "periodo_censo"])
+    assert risks.loc[3, "alertas"] == "Contrato vence en 30 días"
+
+
+def test_dias_aviso_boundary_is_inclusive(frames):
+    risks = score_risks(*frames, reference_date=FECHA, dias_aviso=30)
+    assert 3 in risks["local_id"].tolist() and 4 not in risks["local_id"].tolist()
+    wider = score_risks(*frames, reference_date=FECHA, dias_aviso=31)
+    assert 4 in wider["local_id"].tolist()
+
+
+@pytest.mark.parametrize("dias_aviso", [0, -1])
+def test_dias_aviso_must_be_positive(frames, dias_aviso):
+    with pytest.raises(ValueError, match="dias_aviso"):
+        score_risks(*frames, reference_date=FECHA, dias_aviso=dias_aviso)
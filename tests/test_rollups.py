@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from src.data_store import build_data_store
+from src.rollups import TOTAL, build_rollups, distinct_venues
+from src.synthetic_data import make_synthetic_sources
+
+from conftest import N_LOCALES
+
+
+@pytest.fixture
+def store_with_repeats(sources):
+    """Some venues censused twice in a periodo and holding two vigente contracts."""
+    locales, censos, nominas, contratos = sources
+    repeated = censos["local_id"].drop_duplicates().head(20)
+    censos = pd.concat([censos, censos[censos["local_id"].isin(repeated)].assign(fecha="2025-09-01")], ignore_index=True)
+    contratos = pd.concat([contratos, contratos[contratos["local_id"].isin(repeated)].assign(fecha_inicio="2020-01-01")], ignore_index=True)
+    return build_data_store(locales, censos, nominas, contratos)
+
+
+def test_venue_kpis_count_distinct_venues(store_with_repeats):
+    store = store_with_repeats
+    rollups = build_rollups(store)
+    kpis = rollups.get("total", TOTAL, "2025")
+    censos_2025 = store.censos[store.censos["periodo"] == "2025"]
+    assert kpis["registros"] == len(censos_2025) > kpis["locales"] == censos_2025["local_id"].nunique()
+
+    vigentes = store.contratos[store.contratos["vigente"] == True]
+    contratos = rollups.get_contratos("total", TOTAL)
+    assert contratos["contratos_vigentes"] == len(vigentes) > contratos["locales_vigentes"] == vigentes["local_id"].nunique()
+
+
+@pytest.mark.parametrize("nivel", ["region", "ciudad", "agencia"])
+def test_rollups_and_row_fallback_agree(store_with_repeats, nivel):
+    store = store_with_repeats
+    rollups = build_rollups(store)
+    for grupo in store.censos[nivel].dropna().unique():
+        locales, locales_vigentes = distinct_venues(store, "2025", **{nivel: [grupo]})
+        assert rollups.get(nivel, str(grupo), "2025")["locales"] == locales
+        if nivel != "agencia":
+            assert rollups.get_contratos(nivel, str(grupo))["locales_vigentes"] == locales_vigentes
+
+
+def test_incremental_refresh_matches_full_rebuild():
+    previous = build_rollups(build_data_store(*make_synthetic_sources(N_LOCALES)))
+    locales, censos, nominas, contratos = make_synthetic_sources(N_LOCALES)
+    changed = censos["local_id"].drop_duplicates().sample(15, random_state=3)
+    rows = censos["local_id"].isin(changed)
+    censos.loc[rows, "salidas_total"] = censos.loc[rows, "salidas_total"].fillna(0) + 2
+    censos.loc[rows & (censos["periodo"].astype(str) == "2024"), "agencia"] = "Agencia Nueva"
+    contratos = contratos[~contratos["local_id"].isin(changed.head(5))]
+    store = build_data_store(locales, censos, nominas, contratos)
+
+    incremental = build_rollups(store, previous=previous)
+    full = build_rollups(store)
+    assert incremental.refreshed == len(changed) and full.refreshed == "full"
+    for nivel in ("total", "region", "ciudad", "agencia"):
+        pd.testing.assert_frame_equal(incremental.censos[nivel], full.censos[nivel], check_like=True, obj=nivel)
+        pd.testing.assert_frame_equal(incremental.contratos[nivel], full.contratos[nivel], check_like=True, obj=nivel)
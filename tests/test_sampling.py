@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sampling import _clasificacion, allocate, compliance_rule, sample_venues, stratified_sample, venue_strata
+from src.data_preparation import process_censos
+from utils.config import SALIDAS_MINIMAS, SALIDAS_RATIO
+
+RULE = {"umbral": SALIDAS_MINIMAS, "ratio": SALIDAS_RATIO}
+
+
+@pytest.fixture
+def strata(sources):
+    locales, censos, _, contratos = sources
+    return venue_strata(locales, censos, contratos, **RULE)
+
+
+def test_rule_comes_from_the_app_config(sources):
+    assert compliance_rule() == RULE
+    censos = sources[1].drop(columns="clasificacion", errors="ignore")
+    strict = _clasificacion(censos, umbral=0, ratio=1)
+    assert not strict.equals(_clasificacion(censos, **RULE))
+
+
+def test_clasificacion_matches_process_censos_with_missing_counts():
+    censos = pd.DataFrame({
+        "salidas_total": [2, 8, 8, 8, np.nan, 12],
+        "salidas_otras": [0, 2, 1, np.nan, 1, np.nan],
+    })
+    expected = ["No aplica", "En regla", "No en regla", "No en regla", "No aplica", "No en regla"]
+    assert _clasificacion(censos, **RULE).tolist() == expected
+
+    processed = process_censos(censos.assign(
+        periodo="2024", **{c: 0 for c in ["marcas_abenv", "marcas_kross", "marcas_otras", "disponibilizo", "instalo"]}
+    ))
+    assert processed["clasificacion"].tolist() == expected
+
+
+def test_same_seed_picks_same_venues(strata):
+    assert list(sample_venues(strata, 50, seed=3)) == list(sample_venues(strata, 50, seed=3))
+
+
+def test_different_seeds_pick_different_venues(strata):
+    picks = [set(sample_venues(strata, 50, seed=seed)) for seed in (1, 7, 99)]
+    assert picks[0] != picks[1] and picks[1] != picks[2]
+
+
+def test_sample_has_requested_size_and_covers_strata(strata):
+    size = strata["estrato"].nunique() + 10
+    ids = sample_venues(strata, size)
+    assert len(ids) == size
+    assert strata.loc[ids, "estrato"].nunique() == strata["estrato"].nunique()
+
+
+def test_allocate_is_proportional_and_sums_to_size():
+    counts = pd.Series({"a": 600, "b": 300, "c": 100})
+    take = allocate(counts, 100)
+    assert take.sum() == 100 and (abs(take - counts / 10) <= 2).all()
+    # At least one per stratum when size allows it, never more than the stratum
+    assert list(allocate(counts, 3)) == [1, 1, 1]
+    assert list(allocate(counts, 2000)) == [600, 300, 100]
+
+
+def test_sample_is_referentially_consistent(sources):
+    locales, censos, nominas, contratos = stratified_sample(*sources, size=40, **RULE)
+    ids = set(locales["id"])
+    assert len(ids) == 40
+    for sample, full in ((censos, sources[1]), (nominas, sources[2]), (contratos, sources[3])):
+        assert set(sample["local_id"]) <= ids
+        # Every row of a sampled venue comes along
+        assert len(sample) == full["local_id"].isin(ids).sum()
+
+
+def test_int_and_text_ids_give_the_same_sample(sources):
+    locales, censos, nominas, contratos = sources
+    as_text = (
+        locales.rename(columns={"id": "local_id"}).astype({"local_id": "string"}),
+        censos.astype({"local_id": "string"}),
+        nominas.astype({"local_id": "string"}),
+        contratos.astype({"local_id": "string"}),
+    )
+    a = stratified_sample(*sources, size=30, **RULE)
+    b = stratified_sample(*as_text, size=30, **RULE)
+    assert list(a[0]["id"]) == [int(i) for i in b[0]["local_id"]]
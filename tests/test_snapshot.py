@@ -0,0 +1,31 @@
+from functools import cached_property
+
+import pandas as pd
+import pytest
+from src.data_store import DataStore
+from src.snapshot import open_snapshot, read_current_version, write_snapshot
+
+DERIVED = [name for name, attr in vars(DataStore).items() if isinstance(attr, cached_property)]
+
+
+@pytest.fixture(scope="module")
+def snapshot_store(store, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("snapshots")
+    write_snapshot(store, directory)
+    assert read_current_version(directory) == store.version
+    return open_snapshot(directory, store.version)
+
+
+@pytest.mark.parametrize("name", DERIVED)
+def test_derived_structures_build_from_snapshot(snapshot_store, name):
+    assert getattr(snapshot_store, name) is not None
+
+
+@pytest.mark.parametrize("cube", ["censos_cube", "activos_cube", "contratos_cube"])
+def test_snapshot_cubes_match_in_memory_store(store, snapshot_store, cube):
+    by = [d for d in getattr(store, cube).dims if d not in ("local_id",)][:2]
+    expected = getattr(store, cube).rollup(by=by)
+    result = getattr(snapshot_store, cube).rollup(by=by)
+    pd.testing.assert_frame_equal(
+        result.astype(str).reset_index(drop=True), expected.astype(str).reset_index(drop=True)
+    )
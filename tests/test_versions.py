@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src import versions
+from src.synthetic_data import make_synthetic_sources
+
+
+def edit(frames, rng):
+    """Next load of the sheets: a few changed values, removed and added rows."""
+    locales, censos, nominas, contratos = (df.copy() for df in frames)
+    rows = rng.choice(len(censos), 5, replace=False)
+    censos.loc[censos.index[rows], "salidas_total"] = rng.integers(0, 12, 5)
+    nominas = nominas.drop(nominas.index[rng.choice(len(nominas), 3, replace=False)])
+    nuevos = contratos.sample(2, random_state=int(rng.integers(1 << 30))).assign(
+        fecha_inicio=pd.Timestamp("2026-01-01") + pd.Timedelta(days=int(rng.integers(365)))
+    )
+    contratos = pd.concat([contratos, nuevos], ignore_index=True)
+    return locales, censos, nominas, contratos
+
+
+def test_every_version_rebuilds_like_a_full_copy(tmp_path):
+    rng = np.random.default_rng(0)
+    frames = make_synthetic_sources(80)
+    history = []
+    # More versions than CHECKPOINT_EVERY: reads replay a checkpoint plus deltas
+    for _ in range(versions.CHECKPOINT_EVERY + 3):
+        version, written = versions.record_version(frames, tmp_path)
+        assert written
+        history.append((version, versions._content_hash(frames)))
+        frames = edit(frames, rng)
+
+    for version, content in history:
+        assert versions._content_hash(versions.read_version(version, tmp_path)) == content
+
+    manifests = versions.list_versions(tmp_path)
+    deltas = [m["sheets"]["censos"] for m in manifests if not m["sheets"]["censos"]["checkpoint"]]
+    assert deltas and all(d["upserts"] <= 5 for d in deltas)
+    assert [m["sheets"]["censos"]["checkpoint"] for m in manifests].count(True) == 2
+
+
+def test_unchanged_load_does_not_record_a_version(tmp_path):
+    frames = make_synthetic_sources(50)
+    first, _ = versions.record_version(frames, tmp_path)
+    shuffled = tuple(df.sample(frac=1, random_state=1) for df in frames)
+    assert versions.record_version(shuffled, tmp_path) == (first, False)
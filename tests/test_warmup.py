@@ -0,0 +1,72 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import src.warmup as warmup
+
+
+def _status(path):
+    return json.loads(path.read_text())["status"]
+
+
+def test_background_warmup_does_not_block_and_reports_ready(tmp_path, monkeypatch):
+    ready_file = tmp_path / "ready.json"
+    release = threading.Event()
+
+    def slow_warm_up():
+        release.wait(5)
+        return SimpleNamespace(version="v1"), {"data_store": 0.1}
+
+    monkeypatch.setattr(warmup, "warm_up", slow_warm_up)
+    thread = warmup.boot_in_background(ready_file)
+    # The caller (the Streamlit server) continues while the data loads
+    assert thread.is_alive() and _status(ready_file) == "warming"
+    release.set()
+    thread.join(5)
+    ready = json.loads(ready_file.read_text())
+    assert ready["status"] == "ready" and ready["version"] == "v1"
+
+
+def test_failed_warmup_reports_cold(tmp_path, monkeypatch):
+    ready_file = tmp_path / "ready.json"
+
+    def broken():
+        raise RuntimeError("sin credenciales")
+
+    monkeypatch.setattr(warmup, "warm_up", broken)
+    warmup.boot_in_background(ready_file).join(5)
+    ready = json.loads(ready_file.read_text())
+    assert ready["status"] == "cold" and "sin credenciales" in ready["error"]
+
+
+def test_warm_up_builds_every_derived_structure(store, monkeypatch):
+    import src.data_store as data_store
+    monkeypatch.setattr(data_store, "get_data_store", lambda: store)
+    warmed, timings = warmup.warm_up()
+    assert warmed is store
+    assert all(name in store.__dict__ for name in warmup.WARM_PROPERTIES)
+    assert set(warmup.WARM_PROPERTIES) <= set(timings)
+
+
+
+def test_record_versions_runs_until_stopped(monkeypatch):
+    import src.data_preparation as data_preparation
+    stop = threading.Event()
+    recorded = []
+
+    def record_source_version():
+        recorded.append(1)
+        if len(recorded) == 3:
+            stop.set()
+
+    monkeypatch.setattr(data_preparation, "record_source_version", record_source_version)
+    warmup.record_versions(0.01, stop)
+    assert len(recorded) == 3
+
+
+def test_versions_are_recorded_after_warming(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr(warmup, "warm_up", lambda: (events.append("warm"), (SimpleNamespace(version="v1"), {}))[1])
+    monkeypatch.setattr(warmup, "record_versions", lambda interval: events.append(("record", interval)))
+    warmup.boot_in_background(tmp_path / "ready.json", record_every=60).join(5)
+    assert events == ["warm", ("record", 60)]
@@ -1,8 +1,9 @@
 import streamlit as st
-from src.data_preparation import get_generated_dataframes
+from src.data_store import get_data_store, get_shared_dataframes
+from src.export import EXPORT_FORMATS, EXPORT_TABLES, export_bytes
 
 try:
-    locales_df, censos_df, activos_df, nominas_df, contratos_df = get_generated_dataframes()
+    locales_df, censos_df, activos_df, nominas_df, contratos_df = get_shared_dataframes()
 except FileNotFoundError as e:
     st.error(f"Error loading data file: {e}. Please make sure the files are in the 'data/raw/' directory.")
     st.stop()
@@ -24,3 +25,30 @@ st.dataframe(activos_df)
 
 st.subheader("Contratos Data")
 st.dataframe(contratos_df)
+
+
+st.subheader("Exportar")
+st.markdown("Descarga de tablas preparadas (completas o filtradas). Los archivos se generan una vez por version de datos y filtro.")
+
+export_col1, export_col2, export_col3 = st.columns(3)
+with export_col1:
+    export_table = st.selectbox("Tabla", list(EXPORT_TABLES), format_func=EXPORT_TABLES.get)
+with export_col2:
+    export_format = st.selectbox("Formato", list(EXPORT_FORMATS), format_func=str.upper)
+with export_col3:
+    if export_table == "contratos":
+        export_filters = {}
+    else:
+        export_periodos = st.multiselect("Periodo", sorted((censos_df if export_table == "censos" else activos_df)['periodo'].dropna().unique()))
+        export_filters = {"periodo": export_periodos}
+
+store = get_data_store()
+st.download_button(
+    f"Descargar {EXPORT_TABLES[export_table]}",
+    # Built on click, outside the script run; cached on disk for other sessions
+    data=lambda: export_bytes(store, export_table, export_format, export_filters),
+    file_name=f"{export_table}.{export_format}",
+    mime=EXPORT_FORMATS[export_format],
+    on_click="ignore",
+    icon=":material/download:",
+)
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 CLASIFICACION_COLORS = {
     "En regla": "#83c9ff", 
     "No en regla": "#ffabab",
@@ -5,3 +8,56 @@ CLASIFICACION_COLORS = {
 }
 
 TTL_VALUE = "5m" # 5 minutes 
+
+# Source of the raw data: "gsheets" (default) or "synthetic" (generated locally,
+# for load tests and demos without Google Sheets credentials)
+DATA_SOURCE = os.environ.get("CCU_DATA_SOURCE", "gsheets")
+SYNTHETIC_LOCALES = int(os.environ.get("CCU_SYNTHETIC_LOCALES", "1000"))
+
+# Development runs: with CCU_SAMPLE_LOCALES=N the app works on a stratified,
+# consistent sample of N venues of the source (data_scripts/sampling.py). 0 = all.
+SAMPLE_LOCALES = int(os.environ.get("CCU_SAMPLE_LOCALES", "0"))
+
+# Directory with memory-mapped Arrow snapshots published by `python -m src.snapshot`.
+# When unset, each process loads and prepares the data itself.
+SNAPSHOT_DIR = os.environ.get("CCU_SNAPSHOT_DIR")
+
+# Worker processes for the hash-partitioned pipeline (src/parallel.py). 1 = serial;
+# capped at the CPU count, and small sources always run serially.
+PIPELINE_WORKERS = int(os.environ.get("CCU_PIPELINE_WORKERS", "1"))
+
+# Compliance rule: a venue applies with more than SALIDAS_MINIMAS taps and must
+# offer at least floor(salidas_total / SALIDAS_RATIO) taps of other brands.
+SALIDAS_MINIMAS = 3
+SALIDAS_RATIO = 4
+
+# Disk cache for table downloads (src/export.py)
+EXPORT_DIR = os.environ.get("CCU_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "ccu-exports"))
+
+# Page profiling (src/page_profiler.py): only with CCU_PROFILE=1 on the server.
+# PROFILE_KEEP newest profiles are kept in PROFILE_DIR, older ones are deleted.
+PROFILE_ENV = os.environ.get("CCU_PROFILE", "").lower() in ("1", "true")
+PROFILE_DIR = os.environ.get("CCU_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("CCU_PROFILE_KEEP", "50"))
+
+# Readiness file written by the boot warmup (src/warmup.py)
+READY_FILE = os.environ.get("CCU_READY_FILE", os.path.join(tempfile.gettempdir(), "ccu-ready.json"))
+
+# Versioned source snapshots (src/versions.py). With CCU_VERSIONS_DIR set every
+# new data version of the sources is recorded as a delta version (by the warmup
+# thread every TTL_VALUE or the snapshot refresher); CCU_SOURCE_VERSION (version id or date)
+# runs the app on that past version instead of the live sheets.
+VERSIONS_DIR = os.environ.get("CCU_VERSIONS_DIR")
+SOURCE_VERSION = os.environ.get("CCU_SOURCE_VERSION")
+
+# Output of the risk alerts batch job (python -m src.risk_alerts)
+RISK_ALERTS_PATH = os.environ.get("CCU_RISK_ALERTS_PATH", os.path.join(tempfile.gettempdir(), "ccu-risk-alerts.csv"))
+
+# Read-only JSON API (python -m src.api); localhost only by default
+API_HOST = os.environ.get("CCU_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("CCU_API_PORT", "8502"))
+
+# Multi-spreadsheet runs (python -m src.multi_source): source list and how many
+# sources may be loaded or prepared at the same time (bounds memory)
+SOURCES_FILE = os.environ.get("CCU_SOURCES_FILE", "sources.toml")
+MULTI_SOURCE_IN_FLIGHT = int(os.environ.get("CCU_MULTI_SOURCE_IN_FLIGHT", "2"))